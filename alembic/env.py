@@ -8,7 +8,14 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.core.config import settings
 from app.db.base import Base
-from app.models import Mission, Robot, User  # noqa: F401
+from app.models import (  # noqa: F401
+    FleetHealth,
+    Mission,
+    Robot,
+    RobotApiKey,
+    RobotTelemetry,
+    User,
+)
 
 config = context.config
 config.set_main_option("sqlalchemy.url", settings.database_url)
@@ -0,0 +1,37 @@
+"""fleet health history
+
+Revision ID: 0ce1754222b0
+Revises: cb2331aeb8ff
+Create Date: 2026-10-17 02:53:21.938946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0ce1754222b0'
+down_revision: Union[str, None] = 'cb2331aeb8ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('fleet_health',
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('idle', sa.Integer(), nullable=False),
+    sa.Column('active', sa.Integer(), nullable=False),
+    sa.Column('charging', sa.Integer(), nullable=False),
+    sa.Column('maintenance', sa.Integer(), nullable=False),
+    sa.Column('offline', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Integer(), nullable=False),
+    sa.Column('low_battery', sa.Integer(), nullable=False),
+    sa.Column('marked_offline', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('recorded_at')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('fleet_health')
@@ -0,0 +1,40 @@
+"""robot telemetry history
+
+Revision ID: 4aea29718074
+Revises: 99820e7ed332
+Create Date: 2026-10-17 09:12:31.402518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4aea29718074'
+down_revision: Union[str, None] = '99820e7ed332'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('robot_telemetry',
+    sa.Column('robot_id', sa.UUID(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('status', postgresql.ENUM('IDLE', 'ACTIVE', 'CHARGING', 'MAINTENANCE', 'OFFLINE', 'ERROR', name='robotstatus', create_type=False), nullable=True),
+    sa.Column('location_x', sa.Float(), nullable=True),
+    sa.Column('location_y', sa.Float(), nullable=True),
+    sa.Column('location_z', sa.Float(), nullable=True),
+    sa.Column('heading', sa.Float(), nullable=True),
+    sa.Column('battery_level', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('robot_id', 'recorded_at'),
+    postgresql_partition_by='RANGE (recorded_at)'
+    )
+    # Catch-all for days whose partition hasn't been created yet
+    op.execute('CREATE TABLE robot_telemetry_default PARTITION OF robot_telemetry DEFAULT')
+
+
+def downgrade() -> None:
+    op.drop_table('robot_telemetry')
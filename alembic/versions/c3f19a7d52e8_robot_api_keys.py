@@ -0,0 +1,41 @@
+"""robot api keys
+
+Revision ID: c3f19a7d52e8
+Revises: 4aea29718074
+Create Date: 2026-10-17 14:05:12.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f19a7d52e8'
+down_revision: Union[str, None] = '4aea29718074'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('robot_api_keys',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('robot_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('prefix', sa.String(length=16), nullable=False),
+    sa.Column('key_hash', sa.String(length=64), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['robot_id'], ['robots.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_robot_api_keys_prefix'), 'robot_api_keys', ['prefix'], unique=True)
+    op.create_index(op.f('ix_robot_api_keys_robot_id'), 'robot_api_keys', ['robot_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_robot_api_keys_robot_id'), table_name='robot_api_keys')
+    op.drop_index(op.f('ix_robot_api_keys_prefix'), table_name='robot_api_keys')
+    op.drop_table('robot_api_keys')
@@ -0,0 +1,29 @@
+"""robot last seen at
+
+Revision ID: cb2331aeb8ff
+Revises: e2a7e53a0734
+Create Date: 2026-10-17 02:48:44.744387
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'cb2331aeb8ff'
+down_revision: Union[str, None] = 'e2a7e53a0734'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('robots', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+    # Best guess for robots that have reported before
+    op.execute('UPDATE robots SET last_seen_at = updated_at')
+    op.create_index('ix_robots_last_seen_at_live', 'robots', ['last_seen_at'], unique=False, postgresql_where=sa.text("status NOT IN ('OFFLINE', 'MAINTENANCE')"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_robots_last_seen_at_live', table_name='robots', postgresql_where=sa.text("status NOT IN ('OFFLINE', 'MAINTENANCE')"))
+    op.drop_column('robots', 'last_seen_at')
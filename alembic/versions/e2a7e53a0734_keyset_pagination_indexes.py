@@ -0,0 +1,31 @@
+"""keyset pagination indexes
+
+Revision ID: e2a7e53a0734
+Revises: c3f19a7d52e8
+Create Date: 2026-10-17 15:24:30.509080
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7e53a0734'
+down_revision: Union[str, None] = 'c3f19a7d52e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_missions_created_at_id', 'missions', ['created_at', 'id'], unique=False)
+    op.create_index('ix_missions_robot_id_created_at_id', 'missions', ['robot_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_missions_status_created_at_id', 'missions', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_robots_created_at_id', 'robots', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_robots_created_at_id', table_name='robots')
+    op.drop_index('ix_missions_status_created_at_id', table_name='missions')
+    op.drop_index('ix_missions_robot_id_created_at_id', table_name='missions')
+    op.drop_index('ix_missions_created_at_id', table_name='missions')
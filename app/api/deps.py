@@ -1,22 +1,28 @@
 from typing import Annotated
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.api_keys import RobotAgent, api_key_cache
+from app.core.principals import Principal, principal_cache
 from app.core.security import decode_token
 from app.db.session import get_session
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="/api/v1/auth/login", auto_error=False
+)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
 async def get_current_user(
     session: Annotated[AsyncSession, Depends(get_session)],
     token: Annotated[str, Depends(oauth2_scheme)],
-) -> User:
-    """Get the current authenticated user."""
+) -> Principal:
+    """Get the current authenticated user (served from the principal cache)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -27,12 +33,12 @@ async def get_current_user(
     if payload is None:
         raise credentials_exception
 
-    user_id = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    try:
+        user_id = UUID(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise credentials_exception from None
 
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await principal_cache.get(user_id, session)
 
     if user is None:
         raise credentials_exception
@@ -47,8 +53,8 @@ async def get_current_user(
 
 
 async def require_admin(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)],
+) -> Principal:
     """Require admin role."""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -59,8 +65,8 @@ async def require_admin(
 
 
 async def require_operator(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)],
+) -> Principal:
     """Require operator or admin role."""
     if current_user.role not in (UserRole.OPERATOR, UserRole.ADMIN):
         raise HTTPException(
@@ -70,8 +76,46 @@ async def require_operator(
     return current_user
 
 
+async def require_status_writer(
+    session: Annotated[AsyncSession, Depends(get_session)],
+    token: Annotated[str | None, Depends(optional_oauth2_scheme)],
+    api_key: Annotated[str | None, Depends(api_key_header)],
+) -> Principal | RobotAgent:
+    """
+    Require an operator/admin token or a robot API key (``X-API-Key``).
+
+    API keys are verified from cache without touching the users table.
+    """
+    if api_key:
+        agent = await api_key_cache.verify(api_key, session)
+        if agent is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key",
+            )
+        return agent
+
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await require_operator(await get_current_user(session, token))
+
+
+def check_robot_access(writer: Principal | RobotAgent, robot_id: UUID) -> None:
+    """Reject robot API keys used for any robot other than their own."""
+    if isinstance(writer, RobotAgent) and writer.robot_id != robot_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API key is not valid for this robot",
+        )
+
+
 # Type aliases for cleaner route signatures
-CurrentUser = Annotated[User, Depends(get_current_user)]
-AdminUser = Annotated[User, Depends(require_admin)]
-OperatorUser = Annotated[User, Depends(require_operator)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+AdminUser = Annotated[Principal, Depends(require_admin)]
+OperatorUser = Annotated[Principal, Depends(require_operator)]
+StatusWriter = Annotated[Principal | RobotAgent, Depends(require_status_writer)]
 DBSession = Annotated[AsyncSession, Depends(get_session)]
@@ -1,16 +1,28 @@
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 
-from app.api.deps import DBSession
-from app.core.security import create_access_token, hash_password, verify_password
+from app.api.deps import AdminUser, DBSession
+from app.core.security import (
+    HashingPoolBusyError,
+    create_access_token,
+    hash_password_async,
+    hashing_pool,
+    verify_password_async,
+)
 from app.models.user import User
 from app.schemas.user import Token, UserCreate, UserRead
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+hashing_busy_exception = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many concurrent password checks, retry shortly",
+    headers={"Retry-After": "1"},
+)
+
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 async def register(
@@ -26,10 +38,15 @@ async def register(
             detail="Email already registered",
         )
 
+    try:
+        hashed_password = await hash_password_async(user_in.password)
+    except HashingPoolBusyError:
+        raise hashing_busy_exception from None
+
     # Create user
     user = User(
         email=user_in.email,
-        hashed_password=hash_password(user_in.password),
+        hashed_password=hashed_password,
         full_name=user_in.full_name,
     )
     session.add(user)
@@ -47,7 +64,14 @@ async def login(
     result = await session.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    try:
+        verified = user is not None and await verify_password_async(
+            form_data.password, user.hashed_password
+        )
+    except HashingPoolBusyError:
+        raise hashing_busy_exception from None
+
+    if user is None or not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -62,3 +86,9 @@ async def login(
 
     access_token = create_access_token(subject=str(user.id))
     return Token(access_token=access_token)
+
+
+@router.get("/hashing/stats")
+async def hashing_stats(current_user: AdminUser) -> dict[str, Any]:
+    """Password hashing pool saturation and queue-time metrics."""
+    return hashing_pool.get_stats()
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.api.deps import CurrentUser, DBSession
+from app.schemas.fleet import FleetHealthPoint
+from app.services.fleet_health import fleet_health_history
+
+router = APIRouter(prefix="/fleet", tags=["fleet"])
+
+
+@router.get("/health", response_model=list[FleetHealthPoint])
+async def get_fleet_health(
+    session: DBSession,
+    current_user: CurrentUser,
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    max_points: int = Query(500, ge=1, le=5000),
+) -> list[dict[str, Any]]:
+    """
+    Get the fleet health trend recorded by ``check_fleet_health``.
+
+    Runs between ``from`` and ``to`` (default: the last 24 hours) are
+    averaged into at most ``max_points`` equal time buckets.
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=24)
+    # Treat naive timestamps as UTC
+    start, end = (
+        ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc) for ts in (start, end)
+    )
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be before 'to'",
+        )
+    return await fleet_health_history(session, start, end, max_points)
@@ -1,13 +1,18 @@
 from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Response, status
+from sqlalchemy import func, select
 
 from app.api.deps import CurrentUser, DBSession, OperatorUser
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_page, next_cursor
+from app.core.pubsub import event_bus
 from app.models.mission import Mission, MissionStatus
 from app.models.robot import Robot
 from app.schemas.mission import MissionAssign, MissionCreate, MissionRead, MissionUpdate
+from app.services.missions import TRANSITIONS, transition_mission
+from app.services.robots import robot_state
+from app.services.updates import update_returning
 
 router = APIRouter(prefix="/missions", tags=["missions"])
 
@@ -16,12 +21,19 @@ router = APIRouter(prefix="/missions", tags=["missions"])
 async def list_missions(
     session: DBSession,
     current_user: CurrentUser,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
+    cursor: str | None = None,
     status_filter: MissionStatus | None = Query(None, alias="status"),
     robot_id: UUID | None = None,
 ) -> list[Mission]:
-    """List all missions with optional filtering."""
+    """
+    List all missions with optional filtering, oldest first.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch
+    the next page; ``skip`` still works but gets slower on deep pages.
+    """
     query = select(Mission)
 
     if status_filter:
@@ -29,8 +41,17 @@ async def list_missions(
     if robot_id:
         query = query.where(Mission.robot_id == robot_id)
 
-    result = await session.execute(query.offset(skip).limit(limit))
-    return list(result.scalars().all())
+    try:
+        query = keyset_page(query, Mission, cursor, skip, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from None
+    missions = list((await session.execute(query)).scalars().all())
+    if (token := next_cursor(missions, limit)) is not None:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return missions
 
 
 @router.post("", response_model=MissionRead, status_code=status.HTTP_201_CREATED)
@@ -72,29 +93,23 @@ async def update_mission(
     current_user: OperatorUser,
 ) -> Mission:
     """Update mission details."""
-    result = await session.execute(select(Mission).where(Mission.id == mission_id))
-    mission = result.scalar_one_or_none()
-    if not mission:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Mission not found",
-        )
-
     update_data = mission_in.model_dump(exclude_unset=True)
 
     # Handle status transitions
     if "status" in update_data:
         new_status = update_data["status"]
-        if new_status == MissionStatus.IN_PROGRESS and not mission.started_at:
-            mission.started_at = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        if new_status == MissionStatus.IN_PROGRESS:
+            update_data["started_at"] = func.coalesce(Mission.started_at, now)
         elif new_status in (MissionStatus.COMPLETED, MissionStatus.FAILED):
-            mission.completed_at = datetime.now(timezone.utc)
-
-    for field, value in update_data.items():
-        setattr(mission, field, value)
+            update_data["completed_at"] = now
 
-    await session.flush()
-    await session.refresh(mission)
+    mission = await update_returning(session, Mission, mission_id, update_data)
+    if not mission:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Mission not found",
+        )
     return mission
 
 
@@ -106,39 +121,126 @@ async def assign_mission(
     current_user: OperatorUser,
 ) -> Mission:
     """Assign a robot to a mission."""
-    # Get mission
-    result = await session.execute(select(Mission).where(Mission.id == mission_id))
-    mission = result.scalar_one_or_none()
-    if not mission:
+    assignable = (MissionStatus.PENDING, MissionStatus.ASSIGNED)
+    robot_exists = select(Robot.id).where(Robot.id == assign_in.robot_id).exists()
+    mission = await update_returning(
+        session,
+        Mission,
+        mission_id,
+        {"robot_id": assign_in.robot_id, "status": MissionStatus.ASSIGNED},
+        Mission.status.in_(assignable),
+        robot_exists,
+    )
+    if mission:
+        return mission
+
+    # Nothing was updated; look up why
+    result = await session.execute(
+        select(Mission.status).where(Mission.id == mission_id)
+    )
+    mission_status = result.scalar_one_or_none()
+    if mission_status is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Mission not found",
         )
-
-    # Verify mission can be assigned
-    if mission.status not in (MissionStatus.PENDING, MissionStatus.ASSIGNED):
+    if mission_status not in assignable:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot assign mission with status {mission.status.value}",
+            detail=f"Cannot assign mission with status {mission_status.value}",
         )
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Robot not found",
+    )
 
-    # Verify robot exists
-    result = await session.execute(select(Robot).where(Robot.id == assign_in.robot_id))
-    robot = result.scalar_one_or_none()
-    if not robot:
+
+async def _transition(
+    session: DBSession,
+    mission_id: UUID,
+    action: str,
+    background_tasks: BackgroundTasks,
+) -> Mission:
+    """Run a lifecycle action, mapping a no-op to 404 or 409."""
+    transitioned = await transition_mission(session, mission_id, action)
+    if transitioned is None:
+        result = await session.execute(
+            select(Mission.status).where(Mission.id == mission_id)
+        )
+        mission_status = result.scalar_one_or_none()
+        if mission_status is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Mission not found",
+            )
+        if mission_status in TRANSITIONS[action].sources:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Cannot {action} mission: robot is not available",
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Robot not found",
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot {action} mission with status {mission_status.value}",
         )
 
-    mission.robot_id = assign_in.robot_id
-    mission.status = MissionStatus.ASSIGNED
-
-    await session.flush()
-    await session.refresh(mission)
+    mission, robot = transitioned
+    if robot is not None:
+        background_tasks.add_task(
+            event_bus.broadcast_robot_update,
+            robot.id,
+            {
+                "event": "status_update",
+                "robot_id": str(robot.id),
+                "robot": robot_state(robot),
+            },
+        )
     return mission
 
 
+@router.post("/{mission_id}/start", response_model=MissionRead)
+async def start_mission(
+    mission_id: UUID,
+    session: DBSession,
+    current_user: OperatorUser,
+    background_tasks: BackgroundTasks,
+) -> Mission:
+    """Start an assigned mission and mark its robot active."""
+    return await _transition(session, mission_id, "start", background_tasks)
+
+
+@router.post("/{mission_id}/complete", response_model=MissionRead)
+async def complete_mission(
+    mission_id: UUID,
+    session: DBSession,
+    current_user: OperatorUser,
+    background_tasks: BackgroundTasks,
+) -> Mission:
+    """Complete an in-progress mission and free its robot."""
+    return await _transition(session, mission_id, "complete", background_tasks)
+
+
+@router.post("/{mission_id}/fail", response_model=MissionRead)
+async def fail_mission(
+    mission_id: UUID,
+    session: DBSession,
+    current_user: OperatorUser,
+    background_tasks: BackgroundTasks,
+) -> Mission:
+    """Mark an assigned or in-progress mission as failed and free its robot."""
+    return await _transition(session, mission_id, "fail", background_tasks)
+
+
+@router.post("/{mission_id}/cancel", response_model=MissionRead)
+async def cancel_mission(
+    mission_id: UUID,
+    session: DBSession,
+    current_user: OperatorUser,
+    background_tasks: BackgroundTasks,
+) -> Mission:
+    """Cancel a mission that hasn't finished and free its robot."""
+    return await _transition(session, mission_id, "cancel", background_tasks)
+
+
 @router.delete("/{mission_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_mission(
     mission_id: UUID,
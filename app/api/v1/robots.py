@@ -1,26 +1,110 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Response, status
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
-from app.api.deps import CurrentUser, DBSession, OperatorUser
-from app.core.websocket import manager
-from app.models.robot import Robot
-from app.schemas.robot import RobotCreate, RobotRead, RobotStatusUpdate, RobotUpdate
+from app.api.deps import (
+    AdminUser,
+    CurrentUser,
+    DBSession,
+    OperatorUser,
+    StatusWriter,
+    check_robot_access,
+)
+from app.core.api_keys import api_key_cache, generate_api_key, hash_api_key
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER, keyset_page, next_cursor
+from app.core.pubsub import event_bus
+from app.models.api_key import RobotApiKey
+from app.models.mission import Mission, MissionStatus
+from app.models.robot import Robot, RobotStatus
+from app.schemas.mission import MissionRead
+from app.schemas.robot import (
+    RobotApiKeyCreate,
+    RobotApiKeyCreated,
+    RobotApiKeyRead,
+    RobotCreate,
+    RobotDetail,
+    RobotNearby,
+    RobotRead,
+    RobotStatusBatchResult,
+    RobotStatusUpdate,
+    RobotUpdate,
+    TelemetryPoint,
+)
+from app.services.heartbeats import heartbeat_tracker
+from app.services.ingest import ingest_status_updates
+from app.services.robots import robot_state
+from app.services.spatial import spatial_index
+from app.services.status_buffer import status_buffer
+from app.services.telemetry import downsample_telemetry
+from app.services.updates import update_returning
 
 router = APIRouter(prefix="/robots", tags=["robots"])
 
+# Above this many bbox matches, filter in SQL instead of by id list
+BBOX_MAX_IDS = 10_000
+
+
+def parse_bbox(raw: str) -> tuple[float, float, float, float]:
+    """Parse ``min_x,min_y,max_x,max_y`` or raise a 400."""
+    try:
+        min_x, min_y, max_x, max_y = (float(part) for part in raw.split(","))
+    except ValueError:
+        min_x = min_y = max_x = max_y = float("nan")
+    # NaN fails both comparisons, so this also rejects unparsable input
+    if not (min_x <= max_x and min_y <= max_y):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox must be min_x,min_y,max_x,max_y",
+        )
+    return min_x, min_y, max_x, max_y
+
 
 @router.get("", response_model=list[RobotRead])
 async def list_robots(
     session: DBSession,
     current_user: CurrentUser,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-) -> list[Robot]:
-    """List all robots in the fleet."""
-    result = await session.execute(select(Robot).offset(skip).limit(limit))
-    return list(result.scalars().all())
+    limit: int = Query(100, ge=1),
+    cursor: str | None = None,
+    bbox: str | None = Query(None, description="min_x,min_y,max_x,max_y"),
+) -> list[Robot | RobotRead]:
+    """
+    List all robots in the fleet, oldest first.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch
+    the next page; ``skip`` still works but gets slower on deep pages.
+    ``bbox`` keeps only robots inside the box, looked up in the in-memory
+    spatial index.
+    """
+    query = select(Robot)
+    if bbox is not None:
+        min_x, min_y, max_x, max_y = parse_bbox(bbox)
+        index = await spatial_index.ensure_loaded(session)
+        ids = index.within(min_x, min_y, max_x, max_y)
+        if len(ids) <= BBOX_MAX_IDS:
+            query = query.where(Robot.id.in_(ids))
+        else:
+            query = query.where(
+                Robot.location_x.between(min_x, max_x),
+                Robot.location_y.between(min_y, max_y),
+            )
+    try:
+        stmt = keyset_page(query, Robot, cursor, skip, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from None
+    robots = list((await session.execute(stmt)).scalars().all())
+    if (token := next_cursor(robots, limit)) is not None:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return [status_buffer.apply(robot) for robot in robots]
 
 
 @router.post("", response_model=RobotRead, status_code=status.HTTP_201_CREATED)
@@ -47,21 +131,163 @@ async def create_robot(
     return robot
 
 
-@router.get("/{robot_id}", response_model=RobotRead)
+@router.patch("/status", response_model=list[RobotStatusBatchResult])
+async def update_robot_status_batch(
+    updates: dict[UUID, RobotStatusUpdate],
+    session: DBSession,
+    writer: StatusWriter,
+    background_tasks: BackgroundTasks,
+) -> list[RobotStatusBatchResult]:
+    """
+    Update status and telemetry for many robots in one request.
+
+    The body maps robot IDs to status payloads. All updates are applied in a
+    single statement; fields that are omitted or null keep their stored value.
+    Payloads that set nothing are skipped and reported as not updated.
+    Accepts an operator token or a robot API key (for its own robot only).
+    """
+    if len(updates) > settings.status_batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch exceeds {settings.status_batch_max_size} robots",
+        )
+    for robot_id in updates:
+        check_robot_access(writer, robot_id)
+
+    update_data = {
+        robot_id: data
+        for robot_id, status_in in updates.items()
+        if (data := status_in.model_dump(exclude_none=True))
+    }
+
+    rows = await ingest_status_updates(session, update_data)
+    updated = {row.id: row for row in rows}
+
+    # Broadcast each changed robot to its WebSocket subscribers
+    for row in rows:
+        background_tasks.add_task(
+            event_bus.broadcast_robot_update,
+            row.id,
+            {
+                "event": "status_update",
+                "robot_id": str(row.id),
+                "robot": robot_state(row),
+            },
+        )
+
+    return [
+        RobotStatusBatchResult(
+            robot_id=robot_id,
+            updated=robot_id in updated,
+            robot=(
+                RobotRead.model_validate(updated[robot_id])
+                if robot_id in updated
+                else None
+            ),
+        )
+        for robot_id in updates
+    ]
+
+
+@router.get("/nearest", response_model=list[RobotNearby])
+async def nearest_robots(
+    session: DBSession,
+    current_user: CurrentUser,
+    x: float,
+    y: float,
+    k: int = Query(10, ge=1, le=1000),
+    status_filter: RobotStatus | None = Query(None, alias="status"),
+) -> list[RobotNearby]:
+    """
+    Get the ``k`` robots closest to ``(x, y)``, closest first.
+
+    Positions come from the in-memory spatial index, which follows every
+    status update; robots without a known location are never returned.
+    """
+    index = await spatial_index.ensure_loaded(session)
+    statuses = None if status_filter is None else [status_filter]
+    nearest = index.nearest(x, y, k, statuses)
+    if not nearest:
+        return []
+    result = await session.execute(
+        select(Robot).where(Robot.id.in_([robot_id for robot_id, _ in nearest]))
+    )
+    robots = {robot.id: robot for robot in result.scalars()}
+    nearby = []
+    for robot_id, distance in nearest:
+        # Deleted by another worker since the index last heard of it
+        if robot_id not in robots:
+            continue
+        robot = RobotRead.model_validate(status_buffer.apply(robots[robot_id]))
+        nearby.append(RobotNearby(**robot.model_dump(), distance=distance))
+    return nearby
+
+
+@router.get("/{robot_id}", response_model=RobotRead | RobotDetail)
 async def get_robot(
     robot_id: UUID,
     session: DBSession,
     current_user: CurrentUser,
-) -> Robot:
-    """Get a specific robot by ID."""
-    result = await session.execute(select(Robot).where(Robot.id == robot_id))
+    include: Literal["missions"] | None = None,
+) -> RobotRead:
+    """
+    Get a specific robot by ID.
+
+    ``?include=missions`` embeds the robot's full mission history; use
+    ``/robots/{robot_id}/missions`` to page through long histories.
+    """
+    query = select(Robot).where(Robot.id == robot_id)
+    if include == "missions":
+        query = query.options(selectinload(Robot.missions))
+    result = await session.execute(query)
     robot = result.scalar_one_or_none()
     if not robot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Robot not found",
         )
-    return robot
+    if include != "missions":
+        return RobotRead.model_validate(status_buffer.apply(robot))
+    detail = RobotDetail.model_validate(robot)
+    return detail.model_copy(update=status_buffer.pending(robot.id) or {})
+
+
+@router.get("/{robot_id}/missions", response_model=list[MissionRead])
+async def list_robot_missions(
+    robot_id: UUID,
+    session: DBSession,
+    current_user: CurrentUser,
+    response: Response,
+    limit: int = Query(100, ge=1),
+    cursor: str | None = None,
+    status_filter: MissionStatus | None = Query(None, alias="status"),
+) -> list[Mission]:
+    """
+    List a robot's missions, oldest first.
+
+    Paginated like ``/missions``: pass ``X-Next-Cursor`` back as ``cursor``.
+    """
+    result = await session.execute(select(Robot.id).where(Robot.id == robot_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Robot not found",
+        )
+
+    query = select(Mission).where(Mission.robot_id == robot_id)
+    if status_filter:
+        query = query.where(Mission.status == status_filter)
+    try:
+        query = keyset_page(query, Mission, cursor, 0, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from None
+    missions = list((await session.execute(query)).scalars().all())
+    if (token := next_cursor(missions, limit)) is not None:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return missions
 
 
 @router.patch("/{robot_id}", response_model=RobotRead)
@@ -72,20 +298,13 @@ async def update_robot(
     current_user: OperatorUser,
 ) -> Robot:
     """Update robot details."""
-    result = await session.execute(select(Robot).where(Robot.id == robot_id))
-    robot = result.scalar_one_or_none()
+    update_data = robot_in.model_dump(exclude_unset=True)
+    robot = await update_returning(session, Robot, robot_id, update_data)
     if not robot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Robot not found",
         )
-
-    update_data = robot_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(robot, field, value)
-
-    await session.flush()
-    await session.refresh(robot)
     return robot
 
 
@@ -94,47 +313,201 @@ async def update_robot_status(
     robot_id: UUID,
     status_in: RobotStatusUpdate,
     session: DBSession,
-    current_user: OperatorUser,
+    writer: StatusWriter,
     background_tasks: BackgroundTasks,
-) -> Robot:
-    """Update robot status and telemetry."""
-    result = await session.execute(select(Robot).where(Robot.id == robot_id))
-    robot = result.scalar_one_or_none()
-    if not robot:
+) -> RobotRead:
+    """
+    Update robot status and telemetry.
+
+    Accepts an operator token or the robot's own API key. With write-behind
+    enabled the update is buffered and written back in a later batch; the
+    response already reflects the new values. Fields that are omitted or
+    null keep their stored value. Also counts as a heartbeat.
+    """
+    check_robot_access(writer, robot_id)
+    update_data = status_in.model_dump(exclude_none=True)
+    rows = await ingest_status_updates(session, {robot_id: update_data})
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Robot not found",
         )
-
-    update_data = status_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(robot, field, value)
-
-    await session.flush()
-    await session.refresh(robot)
+    robot = rows[0]
 
     # Broadcast update to WebSocket subscribers
     background_tasks.add_task(
-        manager.broadcast_robot_update,
+        event_bus.broadcast_robot_update,
         robot_id,
         {
             "event": "status_update",
             "robot_id": str(robot_id),
-            "robot": {
-                "id": str(robot.id),
-                "name": robot.name,
-                "serial_number": robot.serial_number,
-                "status": robot.status.value,
-                "location_x": robot.location_x,
-                "location_y": robot.location_y,
-                "location_z": robot.location_z,
-                "heading": robot.heading,
-                "battery_level": robot.battery_level,
-            },
+            "robot": robot_state(robot),
         },
     )
 
-    return robot
+    return RobotRead.model_validate(robot)
+
+
+@router.post("/{robot_id}/heartbeat", status_code=status.HTTP_204_NO_CONTENT)
+async def robot_heartbeat(
+    robot_id: UUID,
+    session: DBSession,
+    writer: StatusWriter,
+    background_tasks: BackgroundTasks,
+) -> None:
+    """
+    Record that a robot is alive.
+
+    Robots that send neither heartbeats nor status updates for
+    ``robot_offline_timeout_seconds`` are marked offline; a heartbeat from
+    an offline robot brings it back as idle (as does a status update).
+    Accepts an operator token or the robot's own API key.
+    """
+    check_robot_access(writer, robot_id)
+    now = datetime.now(timezone.utc)
+    robot = await update_returning(
+        session,
+        Robot,
+        robot_id,
+        {"last_seen_at": now},
+        Robot.status != RobotStatus.OFFLINE,
+    )
+    if robot is None:
+        robot = await update_returning(
+            session,
+            Robot,
+            robot_id,
+            {"last_seen_at": now, "status": RobotStatus.IDLE},
+            Robot.status == RobotStatus.OFFLINE,
+        )
+        if robot is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Robot not found",
+            )
+        background_tasks.add_task(
+            event_bus.broadcast_robot_update,
+            robot_id,
+            {
+                "event": "status_update",
+                "robot_id": str(robot_id),
+                "robot": robot_state(robot),
+            },
+        )
+    await heartbeat_tracker.beat([robot_id], now)
+
+
+@router.get("/{robot_id}/telemetry", response_model=list[TelemetryPoint])
+async def get_robot_telemetry(
+    robot_id: UUID,
+    session: DBSession,
+    current_user: CurrentUser,
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    max_points: int = Query(500, ge=1, le=5000),
+) -> list[dict[str, Any]]:
+    """
+    Get downsampled telemetry history for a robot.
+
+    Samples between ``from`` and ``to`` (default: the last hour) are averaged
+    into at most ``max_points`` equal time buckets.
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=1)
+    # Treat naive timestamps as UTC
+    start, end = (
+        ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc) for ts in (start, end)
+    )
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be before 'to'",
+        )
+
+    points = await downsample_telemetry(session, robot_id, start, end, max_points)
+    if not points and await session.get(Robot, robot_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Robot not found",
+        )
+    return points
+
+
+@router.post(
+    "/{robot_id}/api-keys",
+    response_model=RobotApiKeyCreated,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_robot_api_key(
+    robot_id: UUID,
+    key_in: RobotApiKeyCreate,
+    session: DBSession,
+    current_user: AdminUser,
+) -> RobotApiKeyCreated:
+    """
+    Issue an API key for a robot agent.
+
+    The key is only returned in this response; store it on the robot and
+    send it as ``X-API-Key``.
+    """
+    if await session.get(Robot, robot_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Robot not found",
+        )
+
+    key, prefix = generate_api_key()
+    api_key = RobotApiKey(
+        robot_id=robot_id,
+        name=key_in.name,
+        prefix=prefix,
+        key_hash=hash_api_key(key),
+    )
+    session.add(api_key)
+    await session.flush()
+    await session.refresh(api_key)
+    return RobotApiKeyCreated(
+        **RobotApiKeyRead.model_validate(api_key).model_dump(), key=key
+    )
+
+
+@router.get("/{robot_id}/api-keys", response_model=list[RobotApiKeyRead])
+async def list_robot_api_keys(
+    robot_id: UUID,
+    session: DBSession,
+    current_user: AdminUser,
+) -> list[RobotApiKey]:
+    """List a robot's API keys, including revoked ones."""
+    result = await session.execute(
+        select(RobotApiKey)
+        .where(RobotApiKey.robot_id == robot_id)
+        .order_by(RobotApiKey.created_at)
+    )
+    return list(result.scalars().all())
+
+
+@router.delete(
+    "/{robot_id}/api-keys/{key_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def revoke_robot_api_key(
+    robot_id: UUID,
+    key_id: UUID,
+    session: DBSession,
+    current_user: AdminUser,
+) -> None:
+    """Revoke a robot API key in every worker."""
+    api_key = await session.get(RobotApiKey, key_id)
+    if api_key is None or api_key.robot_id != robot_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key not found",
+        )
+
+    if api_key.revoked_at is None:
+        api_key.revoked_at = datetime.now(timezone.utc)
+    # Commit before dropping cached copies so none can be re-verified
+    await session.commit()
+    await api_key_cache.revoke(key_id)
 
 
 @router.delete("/{robot_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -151,4 +524,15 @@ async def delete_robot(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Robot not found",
         )
+    key_ids = (
+        await session.scalars(
+            select(RobotApiKey.id).where(RobotApiKey.robot_id == robot_id)
+        )
+    ).all()
     await session.delete(robot)
+    # Commit before dropping cached copies of its (cascade-deleted) keys
+    await session.commit()
+    for key_id in key_ids:
+        await api_key_cache.revoke(key_id)
+    spatial_index.remove(robot_id)
+    await heartbeat_tracker.forget(robot_id)
@@ -0,0 +1,52 @@
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
+
+from app.api.deps import AdminUser, DBSession
+from app.core.principals import principal_cache
+from app.models.user import User
+from app.schemas.user import UserRead, UserUpdate
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("", response_model=list[UserRead])
+async def list_users(
+    session: DBSession,
+    current_user: AdminUser,
+    skip: int = 0,
+    limit: int = 100,
+) -> list[User]:
+    """List all users (admin only)."""
+    result = await session.execute(
+        select(User).order_by(User.created_at).offset(skip).limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+@router.patch("/{user_id}", response_model=UserRead)
+async def update_user(
+    user_id: UUID,
+    user_in: UserUpdate,
+    session: DBSession,
+    current_user: AdminUser,
+) -> User:
+    """Update a user's name, role or active flag (admin only)."""
+    result = await session.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+
+    update_data = user_in.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(user, field, value)
+
+    # Commit before invalidating so no request can re-cache the old role
+    await session.commit()
+    await session.refresh(user)
+    await principal_cache.invalidate(user.id)
+    return user
@@ -1,112 +1,435 @@
+import asyncio
+import contextlib
+from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 from sqlalchemy import select
 
+from app.api.deps import AdminUser
+from app.core.api_keys import RobotAgent, api_key_cache
+from app.core.config import settings
+from app.core.principals import Principal, principal_cache
+from app.core.pubsub import event_bus
+from app.core.security import decode_token
 from app.core.websocket import manager
 from app.db.session import async_session_maker
-from app.models.robot import Robot
+from app.models.robot import Robot, RobotStatus
+from app.models.user import UserRole
+from app.schemas.robot import StreamCommand, TelemetryFrame
+from app.services.ingest import collect_batch, ingest_status_updates, merge_frames
+from app.services.robots import fleet_snapshot_page, robot_state
+from app.services.status_buffer import status_buffer
 
 router = APIRouter(tags=["websocket"])
 
 
+def _snapshot_entry(row: Any) -> dict[str, Any]:
+    """Serialize a snapshot row, including not-yet-written status updates."""
+    pending = status_buffer.pending(row.id) or {}
+    return {
+        "id": str(row.id),
+        "name": row.name,
+        "status": RobotStatus(pending.get("status", row.status)).value,
+        "battery_level": pending.get("battery_level", row.battery_level),
+    }
+
+
+async def _receive_pings(websocket: WebSocket) -> None:
+    """Answer client pings until the connection closes."""
+    try:
+        while True:
+            data = await websocket.receive_json()
+            manager.touch(websocket)
+            if data.get("type") == "ping":
+                manager.send_personal(websocket, {"type": "pong"})
+    except WebSocketDisconnect:
+        manager.disconnect(websocket)
+
+
 @router.websocket("/ws/robots/{robot_id}")
-async def robot_status_stream(websocket: WebSocket, robot_id: UUID) -> None:
+async def robot_status_stream(
+    websocket: WebSocket,
+    robot_id: UUID,
+    since: int | None = Query(default=None, ge=0),
+) -> None:
     """
     WebSocket endpoint for real-time robot status updates.
     
-    Connect to receive live updates for a specific robot.
+    Connect to receive live updates for a specific robot. Every event
+    carries a ``seq``; reconnect with ``?since=<last seq>`` to receive only
+    the missed events instead of a fresh snapshot, while still buffered.
     
     Messages sent to client:
-    - {"event": "connected", "robot_id": "...", "robot": {...}}
-    - {"event": "status_update", "robot_id": "...", "robot": {...}}
+    - {"event": "connected", "seq": ..., "robot_id": "...", "robot": {...}}
+    - {"event": "resumed", "seq": ..., "robot_id": "...", "missed": ...}
+    - {"seq": ..., "event": "status_update", "robot_id": "...", "robot": {...}}
     - {"event": "error", "message": "..."}
+    - {"type": "ping"}: sent to idle connections; if neither a client
+      message nor the ping itself gets through within the ping timeout,
+      the server closes the connection (code 4408)
     """
-    # Verify robot exists before accepting connection
+    # Verify robot exists before accepting connection (resuming too)
     async with async_session_maker() as session:
         result = await session.execute(select(Robot).where(Robot.id == robot_id))
         robot = result.scalar_one_or_none()
 
-        if not robot:
-            await websocket.close(code=4004, reason="Robot not found")
-            return
-
-        # Accept and register connection
-        await manager.connect(websocket, robot_id)
+    if not robot:
+        await websocket.close(code=4004, reason="Robot not found")
+        return
 
-        # Send initial state
-        await websocket.send_json({
+    await websocket.accept()
+    # Replay and subscribe without yielding, so no event slips between
+    resumed = since is not None and manager.resume(websocket, robot_id, since)
+    manager.subscribe(websocket, robot_id)
+    if not resumed:
+        # Queue initial state ahead of any update
+        manager.send_personal(websocket, {
             "event": "connected",
+            "seq": manager.history.seq,
             "robot_id": str(robot_id),
-            "robot": {
-                "id": str(robot.id),
-                "name": robot.name,
-                "serial_number": robot.serial_number,
-                "status": robot.status.value,
-                "location_x": robot.location_x,
-                "location_y": robot.location_y,
-                "location_z": robot.location_z,
-                "heading": robot.heading,
-                "battery_level": robot.battery_level,
-            },
+            "robot": robot_state(status_buffer.apply(robot)),
             "subscribers": manager.get_connection_count(robot_id),
         })
 
+    await _receive_pings(websocket)
+
+
+@router.websocket("/ws/fleet")
+async def fleet_status_stream(
+    websocket: WebSocket,
+    max_hz: float = Query(
+        default=settings.ws_fleet_default_hz, gt=0, le=settings.ws_fleet_max_hz
+    ),
+    since: int | None = Query(default=None, ge=0),
+) -> None:
+    """
+    WebSocket endpoint for fleet-wide updates.
+    
+    Connect to receive updates for ALL robots in the fleet. The current
+    state is streamed first in pages:
+    - {"event": "snapshot_chunk", "robots": [{"id", "name", "status", "battery_level"}]}
+    - {"event": "snapshot_end", "seq": ..., "fleet_size": ...}
+
+    Changes made while the snapshot was paged follow as a fleet_delta.
+
+    Reconnect with ``?since=<last seq>`` to skip the snapshot while the
+    missed events are still buffered; they arrive after
+    {"event": "resumed", ...}, robot updates conflated into one fleet_delta.
+
+    After that, robot updates are conflated to the latest state per robot
+    and sent at most ``max_hz`` times per second:
+    - {"event": "fleet_delta", "updates": [{"event": "status_update", ...}]}
+    """
+    await websocket.accept()
+    if since is not None and manager.resume(websocket, None, since):
+        manager.subscribe_fleet(websocket, max_hz)
+        await _receive_pings(websocket)
+        return
+
+    # Events after this seq may not be reflected in the snapshot
+    seq = manager.history.seq
+
+    # Stream the snapshot page by page so memory stays flat; each page uses
+    # a short-lived session so a slow client never holds a DB connection.
+    fleet_size = 0
+    after = None
+    while True:
+        async with async_session_maker() as session:
+            rows = await fleet_snapshot_page(
+                session, after, settings.ws_snapshot_chunk_size
+            )
+        if not rows:
+            break
+
+        await websocket.send_json({
+            "event": "snapshot_chunk",
+            "robots": [_snapshot_entry(row) for row in rows],
+        })
+        fleet_size += len(rows)
+        after = rows[-1].id
+        if len(rows) < settings.ws_snapshot_chunk_size:
+            break
+
+    await websocket.send_json({
+        "event": "snapshot_end",
+        "seq": seq,
+        "fleet_size": fleet_size,
+    })
+
+    # For fleet-wide, we subscribe to a special "fleet" channel, then replay
+    # whatever changed while the snapshot was being paged
+    manager.subscribe_fleet(websocket, max_hz)
+    manager.catch_up(websocket, seq)
+    await _receive_pings(websocket)
+
+
+def _describe_filters(command: StreamCommand) -> list[dict[str, Any]]:
+    """Echo a command's filters back to the client."""
+    return [f.model_dump(mode="json", exclude_none=True) for f in command.filters]
+
+
+async def _subscribe_stream(websocket: WebSocket, command: StreamCommand) -> None:
+    """Add a stream's subscriptions, replying with the robots' current state."""
+    requested = len(set(command.robot_ids)) + len(command.filters)
+    limit = settings.ws_stream_max_subscriptions
+    if manager.subscription_count(websocket) + requested > limit:
+        manager.send_personal(websocket, {
+            "type": "error",
+            "message": f"At most {limit} subscriptions per connection",
+        })
+        return
+
+    robots = []
+    if command.robot_ids:
+        # One lookup for every requested robot
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Robot).where(Robot.id.in_(command.robot_ids))
+            )
+            robots = [status_buffer.apply(r) for r in result.scalars().all()]
+
+    for robot in robots:
+        manager.subscribe(websocket, robot.id)
+    for stream_filter in command.filters:
+        manager.subscribe_filter(websocket, stream_filter.key)
+
+    found = {robot.id for robot in robots}
+    manager.send_personal(websocket, {
+        "type": "subscribed",
+        "robots": [robot_state(robot) for robot in robots],
+        "unknown_robot_ids": [
+            str(rid) for rid in dict.fromkeys(command.robot_ids) if rid not in found
+        ],
+        "filters": _describe_filters(command),
+    })
+
+
+def _unsubscribe_stream(websocket: WebSocket, command: StreamCommand) -> None:
+    """Remove a stream's subscriptions."""
+    for robot_id in command.robot_ids:
+        manager.unsubscribe(websocket, robot_id)
+    for stream_filter in command.filters:
+        manager.unsubscribe_filter(websocket, stream_filter.key)
+
+    manager.send_personal(websocket, {
+        "type": "unsubscribed",
+        "robot_ids": [str(rid) for rid in command.robot_ids],
+        "filters": _describe_filters(command),
+    })
+
+
+@router.websocket("/ws/stream")
+async def multiplexed_stream(websocket: WebSocket) -> None:
+    """
+    WebSocket endpoint for watching many robots over one connection.
+
+    Messages from client:
+    - {"type": "subscribe", "robot_ids": [...], "filters": [{"status": "active"}]}
+    - {"type": "unsubscribe", "robot_ids": [...], "filters": [...]}
+
+    A filter sets exactly one of ``status``, ``robot_type`` or
+    ``bbox`` ([min_x, min_y, max_x, max_y]). Filtered subscribers also get
+    the update that takes a robot out of the filter.
+
+    Messages sent to client:
+    - {"type": "subscribed", "robots": [...], "unknown_robot_ids": [...], ...}
+    - {"type": "unsubscribed", "robot_ids": [...], "filters": [...]}
+    - {"event": "status_update", "robot_id": "...", "robot": {...}}
+    """
+    await websocket.accept()
+    manager.register(websocket)
+
     try:
         while True:
-            # Keep connection alive and handle incoming messages
             data = await websocket.receive_json()
-            
-            # Client can send ping to keep alive
+            manager.touch(websocket)
             if data.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                manager.send_personal(websocket, {"type": "pong"})
+                continue
+
+            try:
+                command = StreamCommand.model_validate(data)
+            except ValidationError as exc:
+                manager.send_personal(websocket, {
+                    "type": "error",
+                    "message": exc.errors(include_url=False)[0]["msg"],
+                })
+                continue
+
+            if command.type == "subscribe":
+                await _subscribe_stream(websocket, command)
+            else:
+                _unsubscribe_stream(websocket, command)
 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
 
-@router.websocket("/ws/fleet")
-async def fleet_status_stream(websocket: WebSocket) -> None:
+@router.get("/ws/stats")
+async def websocket_stats(current_user: AdminUser) -> dict[str, Any]:
+    """Live connections, evictions, and per-connection queue and idle stats."""
+    return manager.get_stats()
+
+
+async def _check_credentials(
+    websocket: WebSocket,
+) -> Principal | RobotAgent | tuple[int, str]:
     """
-    WebSocket endpoint for fleet-wide updates.
-    
-    Connect to receive updates for ALL robots in the fleet.
+    Validate a robot API key or the ``token`` query parameter.
+
+    The key may be sent as an ``X-API-Key`` header or ``api_key`` query
+    parameter. Returns the close code and reason if rejected.
     """
-    await websocket.accept()
-    
-    # Get all robots for initial state
+    api_key = websocket.headers.get("x-api-key") or websocket.query_params.get(
+        "api_key"
+    )
+    if api_key:
+        async with async_session_maker() as session:
+            agent = await api_key_cache.verify(api_key, session)
+        return (4401, "Invalid API key") if agent is None else agent
+
+    payload = decode_token(websocket.query_params.get("token", ""))
+    if payload is None or payload.get("sub") is None:
+        return 4401, "Could not validate credentials"
+
+    try:
+        user_id = UUID(payload["sub"])
+    except ValueError:
+        return 4401, "Could not validate credentials"
+
     async with async_session_maker() as session:
-        result = await session.execute(select(Robot))
-        robots = result.scalars().all()
-        
-        await websocket.send_json({
-            "event": "connected",
-            "fleet_size": len(robots),
-            "robots": [
+        user = await principal_cache.get(user_id, session)
+
+    if user is None or not user.is_active:
+        return 4401, "Could not validate credentials"
+    if user.role not in (UserRole.OPERATOR, UserRole.ADMIN):
+        return 4403, "Operator access required"
+    return user
+
+
+async def _authenticate_writer(
+    websocket: WebSocket,
+) -> Principal | RobotAgent | None:
+    """Check a writer's credentials, closing the socket if rejected."""
+    client = await _check_credentials(websocket)
+    if isinstance(client, tuple):
+        code, reason = client
+        await websocket.close(code=code, reason=reason)
+        return None
+    return client
+
+
+async def _apply_ingest_batches(
+    websocket: WebSocket, queue: asyncio.Queue[TelemetryFrame]
+) -> None:
+    """Apply queued frames in micro-batches and acknowledge each batch."""
+    while True:
+        frames = await collect_batch(
+            queue,
+            settings.ingest_batch_max_frames,
+            settings.ingest_batch_max_delay_seconds,
+        )
+        updates = merge_frames(frames)
+
+        # Stop writing once the key is revoked (or its robot deleted), the
+        # token expires or the user loses access; cache hits keep this cheap
+        client = await _check_credentials(websocket)
+        if isinstance(client, tuple):
+            code, reason = client
+            await websocket.close(code=code, reason=reason)
+            # Keep draining so the reader never blocks on a full queue
+            while True:
+                await queue.get()
+
+        try:
+            async with async_session_maker() as session:
+                rows = await ingest_status_updates(session, updates)
+                await session.commit()
+        except Exception:
+            await websocket.send_json({
+                "type": "nack",
+                "first_seq": frames[0].seq,
+                "seq": frames[-1].seq,
+                "message": "Failed to apply batch",
+            })
+            continue
+
+        for row in rows:
+            await event_bus.broadcast_robot_update(
+                row.id,
                 {
-                    "id": str(r.id),
-                    "name": r.name,
-                    "status": r.status.value,
-                    "battery_level": r.battery_level,
-                }
-                for r in robots
-            ],
+                    "event": "status_update",
+                    "robot_id": str(row.id),
+                    "robot": robot_state(row),
+                },
+            )
+
+        applied = {row.id for row in rows}
+        await websocket.send_json({
+            "type": "ack",
+            "seq": frames[-1].seq,
+            "frames": len(frames),
+            "unknown_robots": [str(rid) for rid in updates if rid not in applied],
         })
 
-    # For fleet-wide, we subscribe to a special "fleet" channel
-    # by using UUID(int=0) as a sentinel
-    from uuid import UUID as UUIDType
-    fleet_id = UUIDType(int=0)
-    
-    if fleet_id not in manager._connections:
-        manager._connections[fleet_id] = set()
-    manager._connections[fleet_id].add(websocket)
-    manager._subscriptions[websocket] = {fleet_id}
+
+@router.websocket("/ws/ingest")
+async def telemetry_ingest_stream(websocket: WebSocket) -> None:
+    """
+    WebSocket endpoint for robot agents streaming telemetry.
+
+    Authenticate once with ``?token=<jwt>`` (operator or admin) or a robot
+    API key (``X-API-Key`` header or ``?api_key=``; own robot only), then send
+    frames like {"seq": 1, "robot_id": "...", "status": "active", ...}.
+    Frames are applied in micro-batches; after each batch the server sends
+    {"type": "ack", "seq": <last seq applied>, ...}. On failure it sends
+    {"type": "nack", "first_seq": ..., "seq": ...} so the agent can resend.
+    Credentials are re-checked per batch: a revoked key, deleted robot or
+    expired token closes the connection (4401) without applying the batch.
+    """
+    client = await _authenticate_writer(websocket)
+    if client is None:
+        return
+    await websocket.accept()
+
+    queue: asyncio.Queue[TelemetryFrame] = asyncio.Queue(
+        maxsize=settings.ingest_queue_size
+    )
+    writer = asyncio.create_task(_apply_ingest_batches(websocket, queue))
 
     try:
         while True:
             data = await websocket.receive_json()
             if data.get("type") == "ping":
                 await websocket.send_json({"type": "pong"})
+                continue
+
+            try:
+                frame = TelemetryFrame.model_validate(data)
+            except ValidationError as exc:
+                await websocket.send_json({
+                    "type": "error",
+                    "seq": data.get("seq"),
+                    "message": exc.errors(include_url=False)[0]["msg"],
+                })
+                continue
+
+            if isinstance(client, RobotAgent) and frame.robot_id != client.robot_id:
+                await websocket.send_json({
+                    "type": "error",
+                    "seq": frame.seq,
+                    "message": "API key is not valid for this robot",
+                })
+                continue
+
+            # Blocks when the writer falls behind, pushing back on the agent
+            await queue.put(frame)
+
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        writer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await writer
@@ -0,0 +1,160 @@
+"""Robot agent API keys: generation and cached verification."""
+
+import asyncio
+import contextlib
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pubsub import listen
+from app.models.api_key import RobotApiKey
+
+logger = logging.getLogger(__name__)
+
+# Keys look like ``om_<prefix>_<secret>``
+KEY_SCHEME = "om"
+
+
+@dataclass(frozen=True)
+class RobotAgent:
+    """A robot authenticated by one of its API keys."""
+
+    robot_id: UUID
+    key_id: UUID
+
+
+def hash_api_key(key: str) -> str:
+    """SHA-256 hex digest of a key (keys are random, so no salt or bcrypt)."""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def generate_api_key() -> tuple[str, str]:
+    """Create a new key. Returns (key, prefix); only the hash is stored."""
+    prefix = secrets.token_hex(6)
+    return f"{KEY_SCHEME}_{prefix}_{secrets.token_urlsafe(32)}", prefix
+
+
+def _key_prefix(key: str) -> str | None:
+    scheme, _, rest = key.partition("_")
+    prefix, _, secret = rest.partition("_")
+    if scheme != KEY_SCHEME or not prefix or not secret:
+        return None
+    return prefix
+
+
+@dataclass
+class ApiKeyCache:
+    """
+    Verifies robot API keys, caching successful lookups for ``ttl`` seconds.
+
+    A hit costs one SHA-256 and a dict lookup. Misses fetch the key row by
+    its public prefix and compare digests in constant time. ``revoke``
+    drops a key here and, with Redis enabled, in every other worker.
+    """
+
+    ttl: float = 60.0
+    max_entries: int = 100_000
+    redis_url: str = ""
+    redis_enabled: bool = False
+    channel: str = "openmotiv:api-key-revocations"
+
+    # key digest -> (expires at, agent), least recently used first
+    _entries: OrderedDict[str, tuple[float, RobotAgent]] = field(
+        default_factory=OrderedDict
+    )
+    # key id -> key digest, so revocations can find the entry
+    _digests: dict[UUID, str] = field(default_factory=dict)
+    _redis: aioredis.Redis | None = None
+    _task: asyncio.Task[None] | None = None
+
+    def _store(self, digest: str, agent: RobotAgent) -> None:
+        self._entries[digest] = (time.monotonic() + self.ttl, agent)
+        self._entries.move_to_end(digest)
+        self._digests[agent.key_id] = digest
+        while len(self._entries) > self.max_entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._digests.pop(evicted.key_id, None)
+
+    async def verify(self, key: str, session: AsyncSession) -> RobotAgent | None:
+        """Return the robot a key belongs to, or None if invalid or revoked."""
+        digest = hash_api_key(key)
+        entry = self._entries.get(digest)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(digest)
+            return entry[1]
+
+        prefix = _key_prefix(key)
+        if prefix is None:
+            return None
+        result = await session.execute(
+            select(RobotApiKey.id, RobotApiKey.robot_id, RobotApiKey.key_hash).where(
+                RobotApiKey.prefix == prefix, RobotApiKey.revoked_at.is_(None)
+            )
+        )
+        row = result.one_or_none()
+        if row is None or not hmac.compare_digest(row.key_hash, digest):
+            return None
+
+        agent = RobotAgent(robot_id=row.robot_id, key_id=row.id)
+        self._store(digest, agent)
+        return agent
+
+    def _forget(self, key_id: str) -> None:
+        digest = self._digests.pop(UUID(key_id), None)
+        if digest is not None:
+            self._entries.pop(digest, None)
+
+    def clear(self) -> None:
+        """Drop every cached key."""
+        self._entries.clear()
+        self._digests.clear()
+
+    async def revoke(self, key_id: UUID) -> None:
+        """Stop accepting a key in every worker (call after committing)."""
+        self._forget(str(key_id))
+        if not self.redis_enabled:
+            return
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(self.redis_url, decode_responses=True)
+        try:
+            await self._redis.publish(self.channel, str(key_id))
+        except redis.RedisError:
+            # Other workers fall back to their local TTL
+            logger.exception("Failed to broadcast API key revocation")
+
+    async def start(self) -> None:
+        """Start listening for revocations from other workers."""
+        if self.redis_enabled and self._task is None:
+            self._task = asyncio.create_task(
+                listen(self.redis_url, self.channel, self._forget, self.clear)
+            )
+
+    async def stop(self) -> None:
+        """Stop the listener and close the Redis connection."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+# Global instance
+api_key_cache = ApiKeyCache(
+    ttl=settings.api_key_cache_ttl_seconds,
+    redis_url=settings.redis_url,
+    redis_enabled=settings.api_key_cache_redis_enabled,
+)
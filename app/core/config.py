@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -25,6 +27,70 @@ class Settings(BaseSettings):
     secret_key: str = "CHANGE-ME-IN-PRODUCTION-USE-OPENSSL-RAND"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 32
+    api_key_cache_ttl_seconds: float = 60.0
+    api_key_cache_redis_enabled: bool = False
+    principal_cache_ttl_seconds: float = 30.0
+    principal_cache_max_entries: int = 10_000
+    principal_cache_redis_enabled: bool = False
+    principal_cache_redis_ttl_seconds: int = 300
+
+    # Telemetry
+    status_batch_max_size: int = 1000
+    status_write_behind: bool = False
+    status_flush_interval_seconds: float = 1.0
+    status_flush_max_batch: int = 1000
+    telemetry_history_enabled: bool = True
+    telemetry_flush_interval_seconds: float = 2.0
+    telemetry_flush_max_batch: int = 5000
+    telemetry_max_pending: int = 100_000
+    telemetry_retention_days: int = 30
+    telemetry_partitions_ahead_days: int = 3
+    ingest_batch_max_frames: int = 500
+    ingest_batch_max_delay_seconds: float = 0.05
+    ingest_queue_size: int = 5000
+
+    # Fleet health
+    robot_offline_timeout_seconds: float = 300.0
+    heartbeat_check_interval_seconds: float = 5.0
+    heartbeat_redis_enabled: bool = False
+    heartbeat_redis_key: str = "openmotiv:robot-deadlines"
+    heartbeat_expire_batch: int = 1000
+    low_battery_threshold: float = 20.0
+    fleet_health_retention_days: int = 90
+    fleet_health_shards: int = 4
+    fleet_health_lease_seconds: float = 55.0
+
+    # Missions
+    scheduler_batch_size: int = 200
+    scheduler_robots_per_mission: int = 4
+    assignment_max_optimal: int = 2000
+    assignment_priority_weight: float = 1000.0
+    assignment_battery_weight: float = 100.0
+    assignment_min_battery: float = 20.0
+
+    # Spatial index
+    spatial_cell_size: float = 50.0
+    spatial_refresh_seconds: float = 60.0
+
+    # WebSocket
+    ws_send_timeout_seconds: float = 5.0
+    ws_ping_interval_seconds: float = 20.0
+    ws_ping_timeout_seconds: float = 20.0
+    ws_pubsub_enabled: bool = False
+    ws_pubsub_channel: str = "openmotiv:robot-events"
+    ws_queue_size: int = 256
+    ws_fleet_default_hz: float = 2.0
+    ws_fleet_max_hz: float = 20.0
+    ws_snapshot_chunk_size: int = 500
+    ws_stream_max_subscriptions: int = 1000
+    ws_replay_robot_events: int = 16
+    ws_replay_fleet_events: int = 1024
+    ws_replay_max_robots: int = 10_000
+    ws_overflow_policy: Literal[
+        "drop_oldest", "latest_per_robot", "disconnect"
+    ] = "latest_per_robot"
 
     # CORS
     cors_origins: list[str] = ["http://localhost:3000", "http://localhost:5173"]
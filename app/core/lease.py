@@ -0,0 +1,40 @@
+"""Expiring Redis leases so only one worker runs a piece of work at a time."""
+
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+import redis
+
+# Delete the key only while it still holds our token, so a lease that
+# expired and was taken over is never released by its previous holder
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class Lease:
+    """
+    A lock on ``key`` that expires after ``ttl`` seconds.
+
+    The ttl bounds how long a crashed holder can block others; keep it
+    longer than the work normally takes.
+    """
+
+    client: redis.Redis
+    key: str
+    ttl: float
+    token: str = field(default_factory=lambda: uuid4().hex)
+
+    def acquire(self) -> bool:
+        """Take the lease if nobody holds it."""
+        return bool(
+            self.client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000))
+        )
+
+    def release(self) -> None:
+        """Give the lease back if we still hold it."""
+        self.client.eval(RELEASE_SCRIPT, 1, self.key, self.token)
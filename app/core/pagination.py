@@ -0,0 +1,54 @@
+"""Keyset (cursor) pagination over ``(created_at, id)``."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Select, literal, tuple_
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode a row's sort key as an opaque, URL-safe cursor."""
+    raw = json.dumps([created_at.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor from ``encode_cursor``; raises ValueError if invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, TypeError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def keyset_page(
+    stmt: Select[Any], model: Any, cursor: str | None, skip: int, limit: int
+) -> Select[Any]:
+    """
+    Order ``stmt`` by ``(created_at, id)`` and select one page.
+
+    With a cursor, rows after it are found through the composite index;
+    otherwise falls back to ``skip`` for backward compatibility.
+    """
+    stmt = stmt.order_by(model.created_at, model.id).limit(limit)
+    if cursor is None:
+        return stmt.offset(skip)
+    created_at, row_id = decode_cursor(cursor)
+    key = tuple_(model.created_at, model.id)
+    return stmt.where(key > tuple_(literal(created_at), literal(row_id)))
+
+
+def next_cursor(rows: list[Any], limit: int) -> str | None:
+    """Cursor for the page after ``rows``, or None if this is the last one."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,179 @@
+"""Cache of authenticated principals so auth checks skip the users table."""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pubsub import listen
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The fields of a user that authentication and RBAC checks need."""
+
+    id: UUID
+    email: str
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id, email=user.email, role=user.role, is_active=user.is_active
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"email": self.email, "role": self.role.value, "is_active": self.is_active}
+        )
+
+    @classmethod
+    def from_json(cls, user_id: UUID, data: str) -> "Principal":
+        fields = json.loads(data)
+        return cls(
+            id=user_id,
+            email=fields["email"],
+            role=UserRole(fields["role"]),
+            is_active=fields["is_active"],
+        )
+
+
+@dataclass
+class PrincipalCache:
+    """
+    TTL/LRU cache of principals keyed by user id.
+
+    Lookups try the in-process tier, then (if enabled) a Redis tier shared
+    by all workers, then the database. ``invalidate`` must be called after
+    a user's role or active flag changes; with Redis enabled it also clears
+    the in-process tier of every other worker via pub/sub.
+    """
+
+    ttl: float = 30.0
+    max_entries: int = 10_000
+    redis_url: str = ""
+    redis_ttl: int = 300
+    redis_enabled: bool = False
+    channel: str = "openmotiv:principal-invalidations"
+
+    # Counters
+    hits: int = 0
+    misses: int = 0
+
+    # user_id -> (expires at, principal), least recently used first
+    _entries: OrderedDict[UUID, tuple[float, Principal]] = field(
+        default_factory=OrderedDict
+    )
+    _redis: aioredis.Redis | None = None
+    _task: asyncio.Task[None] | None = None
+
+    def _key(self, user_id: UUID) -> str:
+        return f"principal:{user_id}"
+
+    def _client(self) -> aioredis.Redis:
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    def _store(self, principal: Principal) -> None:
+        self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, user_id: UUID, session: AsyncSession) -> Principal | None:
+        """Get a user's principal, loading it with ``session`` on a miss."""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        if self.redis_enabled:
+            try:
+                cached = await self._client().get(self._key(user_id))
+            except redis.RedisError:
+                logger.exception("Principal cache lookup failed")
+                cached = None
+            if cached is not None:
+                principal = Principal.from_json(user_id, cached)
+                self._store(principal)
+                return principal
+
+        result = await session.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+
+        principal = Principal.from_user(user)
+        self._store(principal)
+        if self.redis_enabled:
+            with contextlib.suppress(redis.RedisError):
+                await self._client().set(
+                    self._key(user_id), principal.to_json(), ex=self.redis_ttl
+                )
+        return principal
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """Forget a user everywhere so the next request reloads it."""
+        self._entries.pop(user_id, None)
+        if not self.redis_enabled:
+            return
+        try:
+            client = self._client()
+            await client.delete(self._key(user_id))
+            await client.publish(self.channel, str(user_id))
+        except redis.RedisError:
+            # Other workers fall back to their local TTL
+            logger.exception("Failed to broadcast principal invalidation")
+
+    def clear(self) -> None:
+        """Drop every in-process entry."""
+        self._entries.clear()
+
+    def _forget(self, user_id: str) -> None:
+        self._entries.pop(UUID(user_id), None)
+
+    async def start(self) -> None:
+        """Start listening for invalidations from other workers."""
+        if self.redis_enabled and self._task is None:
+            # Anything cached while disconnected may have missed a message
+            self._task = asyncio.create_task(
+                listen(self.redis_url, self.channel, self._forget, self.clear)
+            )
+
+    async def stop(self) -> None:
+        """Stop the listener and close the Redis connection."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+# Global instance
+principal_cache = PrincipalCache(
+    ttl=settings.principal_cache_ttl_seconds,
+    max_entries=settings.principal_cache_max_entries,
+    redis_url=settings.redis_url,
+    redis_ttl=settings.principal_cache_redis_ttl_seconds,
+    redis_enabled=settings.principal_cache_redis_enabled,
+)
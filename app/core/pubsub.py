@@ -0,0 +1,218 @@
+"""Cross-process fan-out of WebSocket events over Redis pub/sub."""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, cast
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.websocket import ConnectionManager, encode_message, manager
+
+logger = logging.getLogger(__name__)
+
+
+# Assigns the next sequence number and publishes in one round trip, so
+# every process sees the same seq for an event, in publish order.
+PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', KEYS[2], seq .. '|' .. ARGV[1])
+return seq
+"""
+
+# Robot fields framed ahead of the JSON body, enough to match filter
+# subscriptions and feed observers without decoding it
+STATE_FIELDS = ("status", "robot_type", "location_x", "location_y")
+LOCATION_FIELDS = ("location_x", "location_y")
+
+
+async def listen(
+    redis_url: str,
+    channel: str,
+    handle: Callable[[str], None],
+    on_subscribe: Callable[[], None] | None = None,
+) -> None:
+    """
+    Call ``handle`` with every message on a channel until cancelled.
+
+    Reconnects if the connection drops; ``on_subscribe`` runs after every
+    (re)subscribe, e.g. to drop state that may have missed messages.
+    """
+    while True:
+        client = aioredis.Redis.from_url(redis_url, decode_responses=True)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(channel)
+                if on_subscribe is not None:
+                    on_subscribe()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        handle(message["data"])
+                    except ValueError:
+                        logger.warning("Dropping malformed message on %s", channel)
+        except (redis.RedisError, OSError):
+            logger.exception("Lost Redis pub/sub connection, retrying")
+            await asyncio.sleep(1.0)
+        finally:
+            await client.aclose()
+
+
+def encode_state(robot: dict[str, Any] | None) -> str:
+    """Encode a robot's filterable fields as ``status,robot_type,x,y``."""
+    if not robot:
+        return ""
+    return ",".join(
+        "" if robot.get(name) is None else str(robot[name]) for name in STATE_FIELDS
+    )
+
+
+def decode_state(header: str) -> dict[str, Any]:
+    """Decode a header from ``encode_state``, leaving out missing fields."""
+    if not header:
+        return {}
+    return {
+        name: float(value) if name in LOCATION_FIELDS else value
+        for name, value in zip(STATE_FIELDS, header.split(","))
+        if value
+    }
+
+
+def encode_event(robot_id: UUID | None, data: dict[str, Any]) -> str:
+    """
+    Frame an event as ``<robot_id>|<state>|<json>``, or ``|<json>`` for
+    fleet events.
+
+    The id and ``encode_state`` prefix let listeners route events without
+    parsing the JSON body. Redis prepends ``<seq>|`` when publishing.
+    """
+    if robot_id is None:
+        return f"|{encode_message(data)}"
+    return f"{robot_id}|{encode_state(data.get('robot'))}|{encode_message(data)}"
+
+
+@dataclass
+class EventBus:
+    """
+    Publishes robot events to Redis and relays them to local subscribers.
+
+    Every API process runs a listener that delivers incoming events to its
+    own ConnectionManager, so an update handled by one worker (or a Celery
+    task) reaches subscribers connected to any worker. When disabled,
+    events go straight to the local manager.
+    """
+
+    manager: ConnectionManager
+    redis_url: str
+    channel: str
+    enabled: bool = False
+
+    _redis: aioredis.Redis | None = None
+    _sync_redis: redis.Redis | None = None
+    _task: asyncio.Task[None] | None = None
+
+    async def broadcast_robot_update(
+        self, robot_id: UUID, data: dict[str, Any]
+    ) -> None:
+        """Send a robot update to its subscribers in every process."""
+        if not self.enabled:
+            await self.manager.broadcast_robot_update(robot_id, data)
+            return
+        await self._publish(encode_event(robot_id, data))
+
+    async def broadcast_fleet_update(self, data: dict[str, Any]) -> None:
+        """Send a fleet-wide event to every connection in every process."""
+        if not self.enabled:
+            await self.manager.broadcast_fleet_update(data)
+            return
+        await self._publish(encode_event(None, data))
+
+    def publish_robot_update(self, robot_id: UUID, data: dict[str, Any]) -> None:
+        """Publish a robot update from synchronous code (Celery tasks)."""
+        self._publish_sync(encode_event(robot_id, data))
+
+    def publish_fleet_update(self, data: dict[str, Any]) -> None:
+        """Publish a fleet-wide event from synchronous code (Celery tasks)."""
+        self._publish_sync(encode_event(None, data))
+
+    @property
+    def _keys(self) -> list[str]:
+        return [f"{self.channel}:seq", self.channel]
+
+    async def _publish(self, event: str) -> None:
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(self.redis_url, decode_responses=True)
+        try:
+            await cast(
+                Awaitable[int], self._redis.eval(PUBLISH_SCRIPT, 2, *self._keys, event)
+            )
+        except redis.RedisError:
+            # Keep local subscribers working while Redis is unavailable. A
+            # local seq could collide with Redis ones, so send it without.
+            logger.exception("Failed to publish event, delivering locally only")
+            self.dispatch(f"|{event}", replayable=False)
+
+    def _publish_sync(self, event: str) -> None:
+        if not self.enabled:
+            return
+        if self._sync_redis is None:
+            self._sync_redis = redis.Redis.from_url(
+                self.redis_url, decode_responses=True
+            )
+        try:
+            self._sync_redis.eval(PUBLISH_SCRIPT, 2, *self._keys, event)
+        except redis.RedisError:
+            logger.exception("Failed to publish event")
+
+    def dispatch(self, frame: str, replayable: bool = True) -> None:
+        """
+        Deliver a ``<seq>|<event>`` frame (see ``encode_event``) to local
+        subscribers.
+
+        An empty seq gets a local one unless the event isn't ``replayable``;
+        an empty robot id marks a fleet event.
+        """
+        seq_part, _, event = frame.partition("|")
+        robot_part, _, rest = event.partition("|")
+        seq = int(seq_part) if seq_part else None
+        if not robot_part:
+            self.manager.deliver_fleet_message(rest, seq, replayable)
+            return
+
+        header, _, message = rest.partition("|")
+        self.manager.deliver_robot_message(
+            UUID(robot_part), message, decode_state(header), seq, replayable
+        )
+
+    async def start(self) -> None:
+        """Start relaying events published by other processes."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(
+                listen(self.redis_url, self.channel, self.dispatch)
+            )
+
+    async def stop(self) -> None:
+        """Stop the listener and close Redis connections."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+# Global instance
+event_bus = EventBus(
+    manager=manager,
+    redis_url=settings.redis_url,
+    channel=settings.ws_pubsub_channel,
+    enabled=settings.ws_pubsub_enabled,
+)
@@ -1,10 +1,22 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import Any, TypeVar
 
 import bcrypt
 from jose import jwt
 
 from app.core.config import settings
 
+T = TypeVar("T")
+
+
+class HashingPoolBusyError(Exception):
+    """Raised when too many password hashes are already queued."""
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -22,6 +34,91 @@ def hash_password(password: str) -> str:
     ).decode("utf-8")
 
 
+@dataclass
+class HashingPool:
+    """
+    Bounded thread pool for bcrypt, keeping it off the event loop.
+
+    At most ``max_workers`` hashes run at once and ``max_queue`` more may
+    wait; beyond that ``run`` raises HashingPoolBusyError instead of piling up.
+    """
+
+    max_workers: int = 4
+    max_queue: int = 32
+
+    # Metrics
+    completed: int = 0
+    rejected: int = 0
+    queue_seconds_total: float = 0.0
+    queue_seconds_max: float = 0.0
+
+    _executor: ThreadPoolExecutor | None = None
+    _in_flight: int = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` in the pool, recording how long it queued."""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HashingPoolBusyError
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bcrypt"
+            )
+
+        submitted = time.monotonic()
+
+        def job() -> tuple[float, T]:
+            return time.monotonic() - submitted, fn(*args)
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            waited, result = await loop.run_in_executor(self._executor, job)
+        finally:
+            self._in_flight -= 1
+
+        self.completed += 1
+        self.queue_seconds_total += waited
+        self.queue_seconds_max = max(self.queue_seconds_max, waited)
+        return result
+
+    def get_stats(self) -> dict[str, Any]:
+        """Pool saturation and queue-time metrics."""
+        return {
+            "in_flight": self._in_flight,
+            "capacity": self.max_workers + self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_seconds_avg": (
+                self.queue_seconds_total / self.completed if self.completed else 0.0
+            ),
+            "queue_seconds_max": self.queue_seconds_max,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+hashing_pool = HashingPool(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool. Raises HashingPoolBusyError."""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hashing pool. Raises HashingPoolBusyError."""
+    return await hashing_pool.run(hash_password, password)
+
+
 def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token."""
     if expires_delta:
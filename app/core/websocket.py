@@ -1,21 +1,424 @@
+import asyncio
+import contextlib
+import enum
+import itertools
+import json
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable, Hashable, Iterable
 from dataclasses import dataclass, field
+from typing import Any
 from uuid import UUID
 
 from fastapi import WebSocket
 
+from app.core.config import settings
+
+# Sentinel channel id used by fleet-wide subscribers
+FLEET_CHANNEL = UUID(int=0)
+
+# Unique queue keys for messages that must never be conflated
+_message_ids = itertools.count()
+# Queue key of a fleet subscriber's unsent fleet_delta, merged in place
+FLEET_DELTA_KEY = "fleet_delta"
+
+# Server-initiated heartbeat; a client message or a completed send answers it
+PING_MESSAGE = '{"type":"ping"}'
+
+# Close codes and reasons for connections the server drops
+SLOW_CONSUMER = (1008, "Slow consumer")
+SEND_TIMEOUT = (1013, "Send timed out")
+SNAPSHOT_STALE = (1013, "Snapshot fell behind, reconnect")
+HEARTBEAT_TIMEOUT = (4408, "Heartbeat timeout")
+
+
+def encode_message(data: dict[str, Any]) -> str:
+    """Encode an event the same way ``WebSocket.send_json`` would."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def stamp_seq(message: str, seq: int) -> str:
+    """Prepend a ``seq`` field to an encoded JSON object without re-encoding."""
+    rest = message[1:]
+    return f'{{"seq":{seq}{"," if rest != "}" else ""}{rest}'
+
+
+def encode_fleet_delta(messages: Iterable[str]) -> str:
+    """Wrap already-encoded robot updates in one ``fleet_delta`` message."""
+    return '{"event":"fleet_delta","updates":[' + ",".join(messages) + "]}"
+
+
+class OverflowPolicy(str, enum.Enum):
+    """What to do when a subscriber's outbound queue is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    LATEST_PER_ROBOT = "latest_per_robot"
+    DISCONNECT = "disconnect"
+
+
+@dataclass(eq=False)
+class Subscriber:
+    """
+    Bounded outbound queue and writer task for one WebSocket connection.
+
+    Broadcasts only enqueue pre-encoded messages; the writer task does the
+    actual sends, so a stalled client never blocks the producer.
+    """
+
+    websocket: WebSocket
+    on_close: Callable[[WebSocket], None]
+    max_queue: int = 256
+    policy: OverflowPolicy = OverflowPolicy.LATEST_PER_ROBOT
+    send_timeout: float = 5.0
+
+    # Counters
+    sent: int = 0
+    dropped: int = 0
+    # Monotonic time the client last sent anything or took a message
+    last_seen: float = field(default_factory=time.monotonic)
+    # Why the server is closing the connection, if it is
+    closing: tuple[int, str] | None = None
+
+    # key -> encoded message, oldest first
+    _queue: OrderedDict[Any, str] = field(default_factory=OrderedDict)
+    _ready: asyncio.Event = field(default_factory=asyncio.Event)
+    _task: asyncio.Task[None] | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def evict(self, close: tuple[int, str]) -> None:
+        """Have the writer close the connection instead of sending more."""
+        if self.closing is None:
+            self.closing = close
+            self._ready.set()
+
+    def start(self) -> None:
+        """Start the writer task."""
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """Cancel the writer task."""
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def has_queued(self, key: Hashable) -> bool:
+        """Whether a keyed message is still waiting to be sent."""
+        return key in self._queue
+
+    def enqueue(self, message: str, key: Hashable | None = None) -> None:
+        """
+        Queue a message, applying the overflow policy if the queue is full.
+
+        A ``FLEET_DELTA_KEY`` message replaces the queued one (the caller
+        has merged them) and is never the one dropped for space.
+        """
+        if self.closing is not None:
+            return
+
+        if key == FLEET_DELTA_KEY and key in self._queue:
+            self._queue[key] = message
+            return
+
+        conflate = key == FLEET_DELTA_KEY or (
+            key is not None and self.policy == OverflowPolicy.LATEST_PER_ROBOT
+        )
+        if conflate and key in self._queue:
+            # Replace the stale update in place, keeping its position
+            self._queue[key] = message
+            self.dropped += 1
+            return
+
+        if len(self._queue) >= self.max_queue:
+            if self.policy == OverflowPolicy.DISCONNECT:
+                self.evict(SLOW_CONSUMER)
+                return
+            self._drop_oldest()
+
+        self._queue[key if conflate else next(_message_ids)] = message
+        self._ready.set()
+
+    def _drop_oldest(self) -> None:
+        """Drop the oldest message, sparing a queued fleet_delta."""
+        key, message = self._queue.popitem(last=False)
+        if key == FLEET_DELTA_KEY and self._queue:
+            self._queue.popitem(last=False)
+            self._queue[key] = message
+            self._queue.move_to_end(key, last=False)
+        self.dropped += 1
+
+    async def _close(self, code: int, reason: str) -> None:
+        """Close the socket without waiting on a client that isn't reading."""
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(
+                self.websocket.close(code=code, reason=reason), self.send_timeout
+            )
+
+    async def _run(self) -> None:
+        """Send queued messages in order until the connection fails."""
+        try:
+            while True:
+                await self._ready.wait()
+                if self.closing is not None:
+                    await self._close(*self.closing)
+                    return
+                if not self._queue:
+                    self._ready.clear()
+                    continue
+
+                _, message = self._queue.popitem(last=False)
+                try:
+                    await asyncio.wait_for(
+                        self.websocket.send_text(message), self.send_timeout
+                    )
+                except TimeoutError:
+                    # Keep the reason if the sweep evicted us mid-send
+                    if self.closing is None:
+                        self.closing = SEND_TIMEOUT
+                    await self._close(*self.closing)
+                    return
+                except Exception:
+                    return
+                self.sent += 1
+                self.last_seen = time.monotonic()
+        finally:
+            self.on_close(self.websocket)
+
+
+@dataclass
+class ReplayBuffer:
+    """Most recent events of one stream, for clients resuming after a drop."""
+
+    maxlen: int
+    # Every event with a higher seq is still buffered
+    complete_after: int
+    # (seq, robot_id or None for fleet events, encoded message)
+    _events: deque[tuple[int, UUID | None, str]] = field(default_factory=deque)
+
+    @property
+    def last_seq(self) -> int:
+        return self._events[-1][0] if self._events else self.complete_after
+
+    def append(self, seq: int, robot_id: UUID | None, message: str) -> None:
+        if len(self._events) >= self.maxlen:
+            self.complete_after = self._events.popleft()[0]
+        self._events.append((seq, robot_id, message))
+
+    def since(self, seq: int) -> list[tuple[int, UUID | None, str]] | None:
+        """Events after ``seq``, or None if some of them were evicted."""
+        if seq < self.complete_after:
+            return None
+        return [event for event in self._events if event[0] > seq]
+
+
+@dataclass
+class EventHistory:
+    """
+    Sequence numbers and replay buffers for every event this process sees.
+
+    Each event gets a monotonically increasing ``seq`` (assigned by Redis
+    when pub/sub is enabled, so it is shared by all processes; otherwise a
+    local counter seeded from the clock so it keeps rising across restarts).
+    The last events are kept per robot and for the fleet channel.
+    """
+
+    robot_events: int = 16
+    fleet_events: int = 1024
+    # Robots with a buffer; the least recently updated is evicted first
+    max_robots: int = 10_000
+
+    # Highest seq seen so far
+    seq: int | None = None
+    # Events after this seq were all recorded (None until the first event)
+    _floor: int | None = None
+    # Seq just before the first event recorded
+    _start: int | None = None
+    _robots: OrderedDict[UUID, ReplayBuffer] = field(default_factory=OrderedDict)
+    _fleet: ReplayBuffer | None = None
+
+    def next_seq(self, seq: int | None = None) -> int:
+        """Observe an assigned seq, or assign the next local one."""
+        if seq is None:
+            seq = (self.seq or time.time_ns() // 1000) + 1
+        if self._floor is None:
+            self._floor = self._start = seq - 1
+        self.seq = seq if self.seq is None else max(self.seq, seq)
+        return seq
+
+    def skip(self) -> None:
+        """
+        Note an event delivered without a seq (Redis was unavailable).
+
+        No client can resume past it, so the replay buffers are dropped and
+        resuming from before the next event needs a fresh snapshot.
+        """
+        self._robots.clear()
+        self._fleet = None
+        if self.seq is not None:
+            self._floor = self._start = self.seq + 1
+
+    def record(self, seq: int, robot_id: UUID | None, message: str) -> None:
+        """Buffer a stamped event for its robot and for the fleet channel."""
+        floor = seq - 1 if self._floor is None else self._floor
+        if self._fleet is None:
+            self._fleet = ReplayBuffer(self.fleet_events, floor)
+        self._fleet.append(seq, robot_id, message)
+        if robot_id is None:
+            return
+
+        buffer = self._robots.get(robot_id)
+        if buffer is None:
+            buffer = self._robots[robot_id] = ReplayBuffer(self.robot_events, floor)
+            if len(self._robots) > self.max_robots:
+                # Robots without a buffer are only complete after this point
+                _, evicted = self._robots.popitem(last=False)
+                self._floor = max(floor, evicted.last_seq)
+        else:
+            self._robots.move_to_end(robot_id)
+        buffer.append(seq, robot_id, message)
+
+    def since(
+        self, robot_id: UUID | None, seq: int | None
+    ) -> list[tuple[int, UUID | None, str]] | None:
+        """
+        Events for a robot (or the fleet if None) after ``seq``.
+
+        A ``seq`` of None (no event seen yet when it was read) means every
+        event. Returns None when they can't all be replayed and the client
+        needs a fresh snapshot.
+        """
+        if seq is None:
+            if self._start is None:
+                return []
+            seq = self._start
+        if self.seq is None or self._floor is None or seq > self.seq:
+            return None
+        buffer = self._fleet if robot_id is None else self._robots.get(robot_id)
+        if buffer is None:
+            # No events at all for this robot since the floor
+            return [] if seq >= self._floor else None
+        return buffer.since(seq)
+
+
+@dataclass(eq=False)
+class FleetDelta:
+    """
+    Conflates robot updates for one fleet subscriber.
+
+    Only the latest update per robot is kept; at most once per ``interval``
+    the changed robots are flushed to the subscriber as one message, so
+    cost scales with robots that changed rather than with event volume.
+    A flush while the previous delta is still queued merges into it, so a
+    backed-up client never loses a robot's latest state.
+    """
+
+    subscriber: Subscriber
+    interval: float
+
+    # robot_id -> latest encoded update since the last flush
+    _pending: dict[UUID, str] = field(default_factory=dict)
+    # robot_id -> encoded update in the delta still waiting in the queue
+    _queued: dict[UUID, str] = field(default_factory=dict)
+    _ready: asyncio.Event = field(default_factory=asyncio.Event)
+    _task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the flush task."""
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """Cancel the flush task, discarding pending updates."""
+        if self._task is not None:
+            self._task.cancel()
+
+    def add(self, robot_id: UUID, message: str) -> None:
+        """Record the latest update for a robot."""
+        self._pending[robot_id] = message
+        self._ready.set()
+
+    async def _run(self) -> None:
+        """Flush pending updates, then wait out the interval."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            self.flush()
+            await asyncio.sleep(self.interval)
+
+    def flush(self) -> None:
+        """Queue the pending updates as one fleet_delta."""
+        if not self.subscriber.has_queued(FLEET_DELTA_KEY):
+            self._queued = {}
+        self._queued.update(self._pending)
+        self._pending = {}
+        self.subscriber.enqueue(
+            encode_fleet_delta(self._queued.values()), key=FLEET_DELTA_KEY
+        )
+
 
 @dataclass
 class ConnectionManager:
     """Manages WebSocket connections for real-time robot updates."""
 
+    # Seconds a single send may take before the subscriber is dropped
+    send_timeout: float = 5.0
+    # Per-connection outbound queue bound and what to do when it fills up
+    max_queue: int = 256
+    overflow_policy: OverflowPolicy = OverflowPolicy.LATEST_PER_ROBOT
+    # Recent events for clients reconnecting with ?since=
+    history: EventHistory = field(default_factory=EventHistory)
+    # Ping connections idle this long; evict if still silent after the timeout
+    ping_interval: float = 20.0
+    ping_timeout: float = 20.0
+
+    # Connections the server closed, by reason
+    evictions: Counter[str] = field(default_factory=Counter)
+    _heartbeat_task: asyncio.Task[None] | None = None
+
     # robot_id -> set of connected websockets
     _connections: dict[UUID, set[WebSocket]] = field(default_factory=dict)
     # websocket -> set of robot_ids it's subscribed to
     _subscriptions: dict[WebSocket, set[UUID]] = field(default_factory=dict)
+    # websocket -> outbound queue and writer
+    _clients: dict[WebSocket, Subscriber] = field(default_factory=dict)
+    # websocket -> conflated robot updates for fleet subscribers
+    _fleet: dict[WebSocket, FleetDelta] = field(default_factory=dict)
+    # filter key, e.g. ("status", "active") -> websockets (multiplexed streams)
+    _filters: dict[tuple[str, Any], set[WebSocket]] = field(default_factory=dict)
+    # websocket -> filter keys it's subscribed to
+    _client_filters: dict[WebSocket, set[tuple[str, Any]]] = field(
+        default_factory=dict
+    )
+    # Bounding boxes with at least one subscriber, scanned per update
+    _bboxes: set[tuple[float, float, float, float]] = field(default_factory=set)
+    # robot_id -> filterable fields from its last update
+    _last_state: dict[UUID, dict[str, Any]] = field(default_factory=dict)
+    # Callbacks fed every robot state delivered here (e.g. in-memory indexes)
+    _observers: list[Callable[[UUID, dict[str, Any]], None]] = field(
+        default_factory=list
+    )
 
     async def connect(self, websocket: WebSocket, robot_id: UUID) -> None:
         """Accept connection and subscribe to robot updates."""
         await websocket.accept()
+        self.subscribe(websocket, robot_id)
+
+    def register(self, websocket: WebSocket) -> None:
+        """Give an accepted connection its outbound queue and writer."""
+        if websocket not in self._clients:
+            subscriber = Subscriber(
+                websocket=websocket,
+                on_close=self.disconnect,
+                max_queue=self.max_queue,
+                policy=self.overflow_policy,
+                send_timeout=self.send_timeout,
+            )
+            subscriber.start()
+            self._clients[websocket] = subscriber
+
+    def subscribe(self, websocket: WebSocket, robot_id: UUID) -> None:
+        """Subscribe an accepted connection to a robot (or the fleet channel)."""
+        self.register(websocket)
 
         if robot_id not in self._connections:
             self._connections[robot_id] = set()
@@ -25,6 +428,50 @@ class ConnectionManager:
             self._subscriptions[websocket] = set()
         self._subscriptions[websocket].add(robot_id)
 
+    def subscribe_fleet(self, websocket: WebSocket, max_hz: float) -> None:
+        """Subscribe to fleet events and conflated robot updates."""
+        self.subscribe(websocket, FLEET_CHANNEL)
+        if websocket not in self._fleet:
+            delta = FleetDelta(subscriber=self._clients[websocket], interval=1 / max_hz)
+            delta.start()
+            self._fleet[websocket] = delta
+
+    def unsubscribe(self, websocket: WebSocket, robot_id: UUID) -> None:
+        """Stop sending a robot's updates to a connection."""
+        if robot_id in self._connections:
+            self._connections[robot_id].discard(websocket)
+            if not self._connections[robot_id]:
+                del self._connections[robot_id]
+        if websocket in self._subscriptions:
+            self._subscriptions[websocket].discard(robot_id)
+
+    def subscribe_filter(self, websocket: WebSocket, key: tuple[str, Any]) -> None:
+        """Subscribe a connection to every robot matching a filter."""
+        self.register(websocket)
+        self._filters.setdefault(key, set()).add(websocket)
+        self._client_filters.setdefault(websocket, set()).add(key)
+        if key[0] == "bbox":
+            self._bboxes.add(key[1])
+
+    def unsubscribe_filter(self, websocket: WebSocket, key: tuple[str, Any]) -> None:
+        """Remove one filter subscription from a connection."""
+        if key in self._filters:
+            self._filters[key].discard(websocket)
+            if not self._filters[key]:
+                del self._filters[key]
+                if key[0] == "bbox":
+                    self._bboxes.discard(key[1])
+        if websocket in self._client_filters:
+            self._client_filters[websocket].discard(key)
+        if not self._filters:
+            self._last_state.clear()
+
+    def subscription_count(self, websocket: WebSocket) -> int:
+        """Number of robots and filters a connection is subscribed to."""
+        return len(self._subscriptions.get(websocket, ())) + len(
+            self._client_filters.get(websocket, ())
+        )
+
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove connection and all its subscriptions."""
         if websocket in self._subscriptions:
@@ -35,37 +482,245 @@ class ConnectionManager:
                         del self._connections[robot_id]
             del self._subscriptions[websocket]
 
-    async def broadcast_robot_update(self, robot_id: UUID, data: dict) -> None:
-        """Send update to all clients subscribed to this robot."""
-        if robot_id not in self._connections:
+        for key in self._client_filters.pop(websocket, set()):
+            self.unsubscribe_filter(websocket, key)
+
+        subscriber = self._clients.pop(websocket, None)
+        if subscriber is not None:
+            subscriber.stop()
+            if subscriber.closing is not None:
+                self.evictions[subscriber.closing[1]] += 1
+
+        delta = self._fleet.pop(websocket, None)
+        if delta is not None:
+            delta.stop()
+
+    def touch(self, websocket: WebSocket) -> None:
+        """Record that the client is alive (it sent us something)."""
+        subscriber = self._clients.get(websocket)
+        if subscriber is not None:
+            subscriber.last_seen = time.monotonic()
+
+    def sweep(self) -> int:
+        """
+        Ping idle connections and evict those silent past the timeout.
+
+        A send that completes counts as a sign of life, so listen-only
+        clients stay connected; half-open sockets whose sends stall are
+        caught instead of staying subscribed forever. Returns the number of
+        connections evicted.
+        """
+        now = time.monotonic()
+        evicted = 0
+        for subscriber in list(self._clients.values()):
+            if subscriber.closing is not None:
+                continue
+            idle = now - subscriber.last_seen
+            if idle > self.ping_interval + self.ping_timeout:
+                subscriber.evict(HEARTBEAT_TIMEOUT)
+                evicted += 1
+            elif idle >= self.ping_interval:
+                subscriber.enqueue(PING_MESSAGE)
+        return evicted
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.ping_interval, self.ping_timeout) / 2)
+            self.sweep()
+
+    def add_observer(self, observer: Callable[[UUID, dict[str, Any]], None]) -> None:
+        """Call ``observer(robot_id, state)`` for every robot update delivered."""
+        self._observers.append(observer)
+
+    def remove_observer(
+        self, observer: Callable[[UUID, dict[str, Any]], None]
+    ) -> None:
+        """Stop calling a previously added observer."""
+        with contextlib.suppress(ValueError):
+            self._observers.remove(observer)
+
+    def start(self) -> None:
+        """Start the heartbeat sweep."""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self) -> None:
+        """Stop the heartbeat sweep."""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._heartbeat_task
+            self._heartbeat_task = None
+
+    def send_personal(self, websocket: WebSocket, data: dict[str, Any]) -> None:
+        """Queue a message for a single connection (replies, snapshots)."""
+        subscriber = self._clients.get(websocket)
+        if subscriber is not None:
+            subscriber.enqueue(encode_message(data))
+
+    def _send_all(
+        self, websockets: Iterable[WebSocket], message: str, key: UUID | None = None
+    ) -> None:
+        """Queue an already-encoded message for every websocket."""
+        for websocket in websockets:
+            subscriber = self._clients.get(websocket)
+            if subscriber is not None:
+                subscriber.enqueue(message, key)
+
+    def _filter_targets(self, state: dict[str, Any]) -> set[WebSocket]:
+        """Connections with a filter matching a robot's state."""
+        targets: set[WebSocket] = set()
+        for name in ("status", "robot_type"):
+            targets.update(self._filters.get((name, state.get(name)), ()))
+
+        x, y = state.get("location_x"), state.get("location_y")
+        if x is not None and y is not None:
+            for box in self._bboxes:
+                min_x, min_y, max_x, max_y = box
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    targets.update(self._filters[("bbox", box)])
+        return targets
+
+    def deliver_robot_message(
+        self,
+        robot_id: UUID,
+        message: str,
+        state: dict[str, Any],
+        seq: int | None = None,
+        replayable: bool = True,
+    ) -> None:
+        """
+        Stamp, record and queue an encoded robot update for its subscribers.
+
+        ``state`` holds the robot's filterable fields, already decoded by
+        the publisher, for matching filter subscriptions and feeding
+        observers. ``seq`` is the sequence number assigned by the
+        publisher, if any. Updates that aren't ``replayable`` go out
+        without a seq. Updates for robots nobody here is watching are only
+        recorded and observed.
+        """
+        message = self._stamp(robot_id, message, seq, replayable)
+
+        for observer in self._observers:
+            observer(robot_id, state)
+
+        targets = self._connections.get(robot_id, set())
+        if not (targets or self._filters or self._fleet):
             return
 
-        dead_connections = []
-        for websocket in self._connections[robot_id]:
-            try:
-                await websocket.send_json(data)
-            except Exception:
-                dead_connections.append(websocket)
+        if self._filters:
+            # Also notify filters the robot matched before, so clients see
+            # it leave (e.g. a status change or moving out of a bbox)
+            previous = self._last_state.get(robot_id)
+            targets = targets | self._filter_targets(state)
+            if previous is not None:
+                targets |= self._filter_targets(previous)
+            self._last_state[robot_id] = {
+                name: state.get(name)
+                for name in ("status", "robot_type", "location_x", "location_y")
+            }
 
-        # Clean up dead connections
-        for websocket in dead_connections:
-            self.disconnect(websocket)
+        # Keyed by robot so slow clients can conflate to the latest update
+        self._send_all(targets, message, key=robot_id)
 
-    async def broadcast_fleet_update(self, data: dict) -> None:
-        """Send update to ALL connected clients (fleet-wide events)."""
-        all_websockets = set()
-        for websocket_set in self._connections.values():
-            all_websockets.update(websocket_set)
+        for delta in self._fleet.values():
+            delta.add(robot_id, message)
+
+    def deliver_fleet_message(
+        self, message: str, seq: int | None = None, replayable: bool = True
+    ) -> None:
+        """Stamp, record and queue an encoded fleet-wide event for everyone."""
+        message = self._stamp(None, message, seq, replayable)
+        self._send_all(self._clients, message)
+
+    def _stamp(
+        self, robot_id: UUID | None, message: str, seq: int | None, replayable: bool
+    ) -> str:
+        if not replayable:
+            self.history.skip()
+            return message
+        seq = self.history.next_seq(seq)
+        message = stamp_seq(message, seq)
+        self.history.record(seq, robot_id, message)
+        return message
+
+    def resume(self, websocket: WebSocket, robot_id: UUID | None, since: int) -> bool:
+        """
+        Queue the events a reconnecting client missed since ``since``.
 
-        dead_connections = []
-        for websocket in all_websockets:
-            try:
-                await websocket.send_json(data)
-            except Exception:
-                dead_connections.append(websocket)
+        Covers one robot, or the fleet channel if ``robot_id`` is None (robot
+        updates then arrive conflated as one fleet_delta). Returns False,
+        queuing nothing, when they're no longer buffered.
+        """
+        missed = self.history.since(robot_id, since)
+        if missed is None:
+            return False
 
-        for websocket in dead_connections:
-            self.disconnect(websocket)
+        self.register(websocket)
+        self.send_personal(websocket, {
+            "event": "resumed",
+            "robot_id": str(robot_id) if robot_id else None,
+            "seq": self.history.seq,
+            "missed": len(missed),
+        })
+        self._replay(websocket, robot_id, missed)
+        return True
+
+    def catch_up(self, websocket: WebSocket, since: int | None) -> bool:
+        """
+        Queue the fleet events recorded after a snapshot was taken at ``since``.
+
+        For a client that just subscribed after a paged snapshot, so nothing
+        that happened while the pages were sent is lost. When those events
+        are no longer buffered, the connection is closed so the client
+        reconnects for a fresh snapshot, and False is returned.
+        """
+        missed = self.history.since(None, since)
+        if missed is None:
+            self._clients[websocket].evict(SNAPSHOT_STALE)
+            return False
+        self._replay(websocket, None, missed)
+        return True
+
+    def _replay(
+        self,
+        websocket: WebSocket,
+        robot_id: UUID | None,
+        missed: list[tuple[int, UUID | None, str]],
+    ) -> None:
+        """Queue buffered events, conflating robot updates on the fleet channel."""
+        subscriber = self._clients[websocket]
+        if robot_id is not None:
+            for _, _, message in missed:
+                subscriber.enqueue(message)
+            return
+
+        updates: dict[UUID, str] = {}
+        for _, event_robot_id, message in missed:
+            if event_robot_id is None:
+                subscriber.enqueue(message)
+            else:
+                updates.pop(event_robot_id, None)
+                updates[event_robot_id] = message
+        if not updates:
+            return
+        delta = self._fleet.get(websocket)
+        if delta is None:
+            subscriber.enqueue(encode_fleet_delta(updates.values()))
+            return
+        # Merged with live updates so a later flush can't drop them
+        for event_robot_id, message in updates.items():
+            delta.add(event_robot_id, message)
+
+    async def broadcast_robot_update(self, robot_id: UUID, data: dict) -> None:
+        """Send update to all clients subscribed to this robot."""
+        self.deliver_robot_message(
+            robot_id, encode_message(data), data.get("robot") or {}
+        )
+
+    async def broadcast_fleet_update(self, data: dict) -> None:
+        """Send update to ALL connected clients (fleet-wide events)."""
+        self.deliver_fleet_message(encode_message(data))
 
     def get_connection_count(self, robot_id: UUID | None = None) -> int:
         """Get number of active connections."""
@@ -73,6 +728,41 @@ class ConnectionManager:
             return len(self._connections.get(robot_id, set()))
         return sum(len(s) for s in self._connections.values())
 
+    def get_stats(self) -> dict[str, Any]:
+        """Queue depth, drop counters and idle time for every live connection."""
+        now = time.monotonic()
+        connections = [
+            {
+                "client": f"{ws.client.host}:{ws.client.port}" if ws.client else None,
+                "queue_depth": subscriber.queue_depth,
+                "sent": subscriber.sent,
+                "dropped": subscriber.dropped,
+                "idle_seconds": round(now - subscriber.last_seen, 1),
+            }
+            for ws, subscriber in self._clients.items()
+        ]
+        return {
+            "connections": len(connections),
+            "evictions": dict(self.evictions),
+            "fleet_subscribers": len(self._fleet),
+            "filters": len(self._filters),
+            "seq": self.history.seq,
+            "queued": sum(c["queue_depth"] for c in connections),
+            "dropped": sum(c["dropped"] for c in connections),
+            "clients": connections,
+        }
+
 
 # Global instance
-manager = ConnectionManager()
+manager = ConnectionManager(
+    send_timeout=settings.ws_send_timeout_seconds,
+    max_queue=settings.ws_queue_size,
+    overflow_policy=OverflowPolicy(settings.ws_overflow_policy),
+    ping_interval=settings.ws_ping_interval_seconds,
+    ping_timeout=settings.ws_ping_timeout_seconds,
+    history=EventHistory(
+        robot_events=settings.ws_replay_robot_events,
+        fleet_events=settings.ws_replay_fleet_events,
+        max_robots=settings.ws_replay_max_robots,
+    ),
+)
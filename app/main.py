@@ -4,8 +4,18 @@ from collections.abc import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1 import auth, missions, robots, tasks, websocket
+from app.api.v1 import auth, fleet, missions, robots, tasks, users, websocket
+from app.core.api_keys import api_key_cache
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.principals import principal_cache
+from app.core.pubsub import event_bus
+from app.core.security import hashing_pool
+from app.core.websocket import manager
+from app.services.heartbeats import heartbeat_tracker
+from app.services.spatial import spatial_index
+from app.services.status_buffer import status_buffer
+from app.services.telemetry import telemetry_recorder
 
 
 @asynccontextmanager
@@ -13,8 +23,30 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan handler."""
     # Startup
     print(f"🚀 Starting {settings.app_name}")
+    await event_bus.start()
+    await principal_cache.start()
+    await api_key_cache.start()
+    manager.start()
+    manager.add_observer(spatial_index.observe)
+    spatial_index.start()
+    if settings.status_write_behind:
+        status_buffer.start()
+    if settings.telemetry_history_enabled:
+        telemetry_recorder.start()
     yield
     # Shutdown
+    await event_bus.stop()
+    await principal_cache.stop()
+    await api_key_cache.stop()
+    await manager.stop()
+    manager.remove_observer(spatial_index.observe)
+    await spatial_index.stop()
+    await heartbeat_tracker.close()
+    hashing_pool.shutdown()
+    if settings.status_write_behind:
+        await status_buffer.stop()
+    if settings.telemetry_history_enabled:
+        await telemetry_recorder.stop()
     print(f"👋 Shutting down {settings.app_name}")
 
 
@@ -34,13 +66,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the keyset pagination cursor
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Routes
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(robots.router, prefix="/api/v1")
 app.include_router(missions.router, prefix="/api/v1")
+app.include_router(fleet.router, prefix="/api/v1")
 app.include_router(tasks.router, prefix="/api/v1")
+app.include_router(users.router, prefix="/api/v1")
 app.include_router(websocket.router)
 
 
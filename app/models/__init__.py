@@ -1,5 +1,8 @@
+from app.models.api_key import RobotApiKey
+from app.models.fleet_health import FleetHealth
 from app.models.mission import Mission
 from app.models.robot import Robot
+from app.models.telemetry import RobotTelemetry
 from app.models.user import User
 
-__all__ = ["Robot", "Mission", "User"]
+__all__ = ["Robot", "RobotApiKey", "Mission", "RobotTelemetry", "FleetHealth", "User"]
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class FleetHealth(Base):
+    """
+    Statistics from one fleet health check, kept as a trend history.
+
+    One narrow row per run: robot counts per status, low-battery robots and
+    how many robots the run marked offline.
+    """
+
+    __tablename__ = "fleet_health"
+
+    recorded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+
+    total: Mapped[int] = mapped_column(Integer, nullable=False)
+    idle: Mapped[int] = mapped_column(Integer, nullable=False)
+    active: Mapped[int] = mapped_column(Integer, nullable=False)
+    charging: Mapped[int] = mapped_column(Integer, nullable=False)
+    maintenance: Mapped[int] = mapped_column(Integer, nullable=False)
+    offline: Mapped[int] = mapped_column(Integer, nullable=False)
+    error: Mapped[int] = mapped_column(Integer, nullable=False)
+    low_battery: Mapped[int] = mapped_column(Integer, nullable=False)
+    marked_offline: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<FleetHealth {self.recorded_at}: {self.total} robots>"
@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, Float, ForeignKey, String, Text
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, Index, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -33,6 +33,12 @@ class Mission(Base, TimestampMixin):
     """Mission/task to be executed by a robot."""
 
     __tablename__ = "missions"
+    # Keyset pagination order, unfiltered and per list filter
+    __table_args__ = (
+        Index("ix_missions_created_at_id", "created_at", "id"),
+        Index("ix_missions_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_missions_robot_id_created_at_id", "robot_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -1,7 +1,8 @@
 import enum
 import uuid
+from datetime import datetime
 
-from sqlalchemy import Enum, Float, String, Text
+from sqlalchemy import DateTime, Enum, Float, Index, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -33,6 +34,16 @@ class Robot(Base, TimestampMixin):
     """Robot entity in the fleet."""
 
     __tablename__ = "robots"
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_robots_created_at_id", "created_at", "id"),
+        # Offline sweeps only look at robots that can still go offline
+        Index(
+            "ix_robots_last_seen_at_live",
+            "last_seen_at",
+            postgresql_where=text("status NOT IN ('OFFLINE', 'MAINTENANCE')"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -61,9 +72,17 @@ class Robot(Base, TimestampMixin):
     battery_level: Mapped[float | None] = mapped_column(Float, nullable=True)  # 0-100
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    # Relationships
+    # Last heartbeat or status update from the robot itself; unlike
+    # updated_at, metadata edits don't touch it
+    last_seen_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    # Relationships. Mission history can be long, so it is never loaded
+    # implicitly: use selectinload() or the /robots/{id}/missions endpoint.
+    # The database unlinks missions on delete (ON DELETE SET NULL).
     missions: Mapped[list["Mission"]] = relationship(  # noqa: F821
-        "Mission", back_populates="robot", lazy="selectin"
+        "Mission", back_populates="robot", lazy="raise", passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Connection, DateTime, Enum, Float, Table, event, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.robot import RobotStatus
+
+
+class RobotTelemetry(Base):
+    """
+    Append-only history of robot telemetry samples.
+
+    Range-partitioned by day on ``recorded_at``; a default partition catches
+    rows for days whose partition has not been created yet.
+    """
+
+    __tablename__ = "robot_telemetry"
+    __table_args__ = {"postgresql_partition_by": "RANGE (recorded_at)"}
+
+    robot_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    recorded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+
+    status: Mapped[RobotStatus | None] = mapped_column(
+        Enum(RobotStatus), nullable=True
+    )
+    location_x: Mapped[float | None] = mapped_column(Float, nullable=True)
+    location_y: Mapped[float | None] = mapped_column(Float, nullable=True)
+    location_z: Mapped[float | None] = mapped_column(Float, nullable=True)
+    heading: Mapped[float | None] = mapped_column(Float, nullable=True)
+    battery_level: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<RobotTelemetry {self.robot_id} @ {self.recorded_at}>"
+
+
+@event.listens_for(RobotTelemetry.__table__, "after_create")
+def create_default_partition(target: Table, connection: Connection, **kw: Any) -> None:
+    """Create the default partition along with the table (e.g. in tests)."""
+    connection.execute(
+        text(
+            "CREATE TABLE robot_telemetry_default "
+            "PARTITION OF robot_telemetry DEFAULT"
+        )
+    )
@@ -1,25 +1,48 @@
+from app.schemas.fleet import FleetHealthPoint
 from app.schemas.mission import (
     MissionCreate,
     MissionRead,
     MissionUpdate,
 )
 from app.schemas.robot import (
+    RobotApiKeyCreate,
+    RobotApiKeyCreated,
+    RobotApiKeyRead,
     RobotCreate,
+    RobotDetail,
+    RobotNearby,
     RobotRead,
+    RobotStatusBatchResult,
     RobotStatusUpdate,
     RobotUpdate,
+    StreamCommand,
+    StreamFilter,
+    TelemetryFrame,
+    TelemetryPoint,
 )
-from app.schemas.user import Token, UserCreate, UserRead
+from app.schemas.user import Token, UserCreate, UserRead, UserUpdate
 
 __all__ = [
+    "FleetHealthPoint",
+    "RobotApiKeyCreate",
+    "RobotApiKeyCreated",
+    "RobotApiKeyRead",
     "RobotCreate",
+    "RobotDetail",
+    "RobotNearby",
     "RobotRead",
     "RobotUpdate",
     "RobotStatusUpdate",
+    "RobotStatusBatchResult",
+    "StreamCommand",
+    "StreamFilter",
+    "TelemetryFrame",
+    "TelemetryPoint",
     "MissionCreate",
     "MissionRead",
     "MissionUpdate",
     "UserCreate",
     "UserRead",
+    "UserUpdate",
     "Token",
 ]
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class FleetHealthPoint(BaseModel):
+    """One downsampled bucket of fleet health history (counts averaged)."""
+
+    recorded_at: datetime
+    samples: int
+    total: float
+    idle: float
+    active: float
+    charging: float
+    maintenance: float
+    offline: float
+    error: float
+    low_battery: float
+    # Summed over the bucket
+    marked_offline: int
@@ -1,9 +1,11 @@
 from datetime import datetime
+from typing import Any, Literal
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from app.models.robot import RobotStatus, RobotType
+from app.schemas.mission import MissionRead
 
 
 class RobotBase(BaseModel):
@@ -54,5 +56,104 @@ class RobotRead(RobotBase):
     heading: float | None
     firmware_version: str | None
     battery_level: float | None
+    last_seen_at: datetime | None
     created_at: datetime
     updated_at: datetime
+
+
+class RobotDetail(RobotRead):
+    """Robot data with its missions embedded (``?include=missions``)."""
+
+    missions: list[MissionRead]
+
+
+class RobotNearby(RobotRead):
+    """Robot data with its distance from a query point."""
+
+    distance: float
+
+
+class RobotStatusBatchResult(BaseModel):
+    """Per-robot outcome of a batch status update."""
+
+    robot_id: UUID
+    updated: bool
+    robot: RobotRead | None = None
+
+
+class TelemetryPoint(BaseModel):
+    """One downsampled bucket of robot telemetry history."""
+
+    recorded_at: datetime
+    samples: int
+    location_x: float | None
+    location_y: float | None
+    location_z: float | None
+    heading: float | None
+    battery_level: float | None
+
+
+class TelemetryFrame(RobotStatusUpdate):
+    """One status/telemetry sample streamed by a robot agent."""
+
+    seq: int = Field(..., ge=0)
+    robot_id: UUID
+
+
+class StreamFilter(BaseModel):
+    """Subscribe to robots matching one criterion (exactly one field set)."""
+
+    status: RobotStatus | None = None
+    robot_type: RobotType | None = None
+    # min_x, min_y, max_x, max_y
+    bbox: tuple[float, float, float, float] | None = None
+
+    @model_validator(mode="after")
+    def check_single_criterion(self) -> "StreamFilter":
+        if len(self.model_dump(exclude_none=True)) != 1:
+            raise ValueError("Set exactly one of status, robot_type or bbox")
+        if self.bbox and (self.bbox[0] > self.bbox[2] or self.bbox[1] > self.bbox[3]):
+            raise ValueError("bbox must be [min_x, min_y, max_x, max_y]")
+        return self
+
+    @property
+    def key(self) -> tuple[str, Any]:
+        """Index key used by the connection manager."""
+        if self.status is not None:
+            return ("status", self.status.value)
+        if self.robot_type is not None:
+            return ("robot_type", self.robot_type.value)
+        return ("bbox", self.bbox)
+
+
+class StreamCommand(BaseModel):
+    """Subscribe/unsubscribe message on the multiplexed stream."""
+
+    type: Literal["subscribe", "unsubscribe"]
+    robot_ids: list[UUID] = Field(default_factory=list, max_length=1000)
+    filters: list[StreamFilter] = Field(default_factory=list, max_length=100)
+
+
+class RobotApiKeyCreate(BaseModel):
+    """Schema for issuing a robot API key."""
+
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class RobotApiKeyRead(BaseModel):
+    """Schema for reading a robot API key (never includes the secret)."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    robot_id: UUID
+    name: str
+    prefix: str
+    created_at: datetime
+    revoked_at: datetime | None
+
+
+class RobotApiKeyCreated(RobotApiKeyRead):
+    """A newly issued key; the only time the full key is returned."""
+
+    key: str
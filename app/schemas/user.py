@@ -1,7 +1,8 @@
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 from app.models.user import UserRole
 
@@ -30,6 +31,22 @@ class UserRead(UserBase):
     created_at: datetime
 
 
+class UserUpdate(BaseModel):
+    """Schema for an admin updating a user's account."""
+
+    full_name: str | None = None
+    role: UserRole | None = None
+    is_active: bool | None = None
+
+    @field_validator("role", "is_active")
+    @classmethod
+    def check_not_null(cls, value: Any) -> Any:
+        # Omit a field to keep it; only full_name can be cleared with null
+        if value is None:
+            raise ValueError("Omit the field instead of sending null")
+        return value
+
+
 class Token(BaseModel):
     """JWT token response."""
 
@@ -0,0 +1,168 @@
+"""Batch assignment of missions to robots by minimum total cost."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from app.core.config import settings
+from app.models.mission import MissionPriority
+
+# Priority levels; each level is worth ``priority_weight`` in cost
+PRIORITY_LEVELS = {
+    MissionPriority.LOW: 0,
+    MissionPriority.NORMAL: 1,
+    MissionPriority.HIGH: 2,
+    MissionPriority.CRITICAL: 3,
+}
+
+
+def _points(rows: Sequence[Any], prefix: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stack ``<prefix>_x/y/z`` of every row into an (n, 3) array.
+
+    Returns the points and a mask of rows with a known x/y. Unknown
+    points are zeroed; a missing z counts as ground level.
+    """
+    points = np.array(
+        [[getattr(row, f"{prefix}_{axis}") for axis in "xyz"] for row in rows],
+        dtype=float,
+    ).reshape(len(rows), 3)
+    known = ~np.isnan(points[:, :2]).any(axis=1)
+    return np.nan_to_num(points, nan=0.0), known
+
+
+def distances(
+    targets: np.ndarray,
+    targets_known: np.ndarray,
+    locations: np.ndarray,
+    robots_known: np.ndarray,
+) -> np.ndarray:
+    """
+    Euclidean distances from every target to every robot, (m, r).
+
+    Missions without a target are 0 from every robot; robots without a
+    location get the row's largest known distance, so they are picked last.
+    """
+    # |a - b|^2 = |a|^2 + |b|^2 - 2ab, without an (m, r, 3) temporary
+    squared = (
+        (targets**2).sum(axis=1)[:, None]
+        + (locations**2).sum(axis=1)[None, :]
+        - 2.0 * (targets @ locations.T)
+    )
+    result: np.ndarray = np.sqrt(np.clip(squared, 0.0, None))
+    result[~targets_known, :] = 0.0
+    if not robots_known.all():
+        known = result[:, robots_known]
+        fill = known.max(axis=1) if known.shape[1] else np.zeros(len(result))
+        result[:, ~robots_known] = fill[:, None]
+    return result
+
+
+@dataclass
+class AssignmentSolver:
+    """
+    Pairs missions with robots, minimizing distance and battery drain.
+
+    The cost of a robot doing a mission is its distance to the mission
+    target, plus ``battery_weight`` scaled by how empty its battery is,
+    minus ``priority_weight`` per priority level of the mission. The
+    priority term makes the more urgent missions win when robots run out.
+    Batches with at most ``max_optimal`` missions and robots are solved
+    exactly (Hungarian method); larger ones use a greedy pass that never
+    builds the full matrix.
+    """
+
+    priority_weight: float = 1000.0
+    battery_weight: float = 100.0
+    max_optimal: int = 2000
+
+    def _arrays(
+        self, missions: Sequence[Any], robots: Sequence[Any]
+    ) -> tuple[np.ndarray, ...]:
+        targets, targets_known = _points(missions, "target")
+        locations, robots_known = _points(robots, "location")
+        battery = np.array(
+            [robot.battery_level for robot in robots], dtype=float
+        ).reshape(len(robots))
+        # Unknown charge counts as empty
+        robot_cost = self.battery_weight * (1.0 - np.nan_to_num(battery) / 100.0)
+        bonus = self.priority_weight * np.array(
+            [PRIORITY_LEVELS[mission.priority] for mission in missions],
+            dtype=float,
+        ).reshape(len(missions))
+        return targets, targets_known, locations, robots_known, robot_cost, bonus
+
+    def cost_matrix(self, missions: Sequence[Any], robots: Sequence[Any]) -> np.ndarray:
+        """Build the (missions, robots) cost matrix in one vectorized pass."""
+        targets, targets_known, locations, robots_known, robot_cost, bonus = (
+            self._arrays(missions, robots)
+        )
+        matrix = distances(targets, targets_known, locations, robots_known)
+        matrix += robot_cost[None, :]
+        matrix -= bonus[:, None]
+        return matrix
+
+    def solve_optimal(
+        self, missions: Sequence[Any], robots: Sequence[Any]
+    ) -> list[tuple[int, int]]:
+        """Minimum-cost matching as (mission index, robot index) pairs."""
+        rows, cols = linear_sum_assignment(self.cost_matrix(missions, robots))
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def solve_greedy(
+        self, missions: Sequence[Any], robots: Sequence[Any], block: int = 256
+    ) -> list[tuple[int, int]]:
+        """
+        Give each mission, most urgent first, its cheapest free robot.
+
+        Costs are built ``block`` missions at a time, so memory stays
+        O(block * robots) however large the batch is.
+        """
+        targets, targets_known, locations, robots_known, robot_cost, bonus = (
+            self._arrays(missions, robots)
+        )
+        order = np.argsort(-bonus, kind="stable")[: len(robots)]
+        # 0 for free robots, inf once taken
+        taken = np.zeros(len(robots))
+        pairs = []
+        for start in range(0, len(order), block):
+            rows = order[start : start + block]
+            costs = distances(
+                targets[rows], targets_known[rows], locations, robots_known
+            )
+            costs += robot_cost[None, :]
+            for i, row in zip(rows.tolist(), costs):
+                j = int(np.argmin(row + taken))
+                taken[j] = np.inf
+                pairs.append((i, j))
+        return pairs
+
+    def assign(
+        self, missions: Sequence[Any], robots: Sequence[Any]
+    ) -> list[tuple[UUID, UUID]]:
+        """
+        Pair missions with robots as (mission id, robot id).
+
+        Missions need ``id``, ``priority`` and ``target_x/y/z``; robots need
+        ``id``, ``location_x/y/z`` and ``battery_level``. Every robot is
+        used at most once; surplus missions or robots are left out.
+        """
+        if not missions or not robots:
+            return []
+        if max(len(missions), len(robots)) <= self.max_optimal:
+            pairs = self.solve_optimal(missions, robots)
+        else:
+            pairs = self.solve_greedy(missions, robots)
+        return [(missions[i].id, robots[j].id) for i, j in pairs]
+
+
+# Global instance
+assignment_solver = AssignmentSolver(
+    priority_weight=settings.assignment_priority_weight,
+    battery_weight=settings.assignment_battery_weight,
+    max_optimal=settings.assignment_max_optimal,
+)
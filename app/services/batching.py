@@ -0,0 +1,64 @@
+"""Shared plumbing for in-memory buffers that write to the database in batches."""
+
+import asyncio
+import contextlib
+import logging
+from dataclasses import dataclass, field
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.session import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicFlusher:
+    """
+    Base class for buffers flushed on an interval or size threshold.
+
+    Subclasses implement ``flush`` and call ``_wake`` once enough work has
+    accumulated to justify flushing before the next tick.
+    """
+
+    flush_interval: float = 1.0
+    max_batch: int = 1000
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker
+
+    _wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    _task: asyncio.Task[None] | None = None
+
+    async def flush(self) -> int:
+        """Write buffered data to the database. Returns items written."""
+        raise NotImplementedError
+
+    def _wake(self) -> None:
+        """Request an early flush."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        """Flush on every interval tick or when the size threshold is hit."""
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.flush_interval
+                )
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush %s", type(self).__name__)
+
+    def start(self) -> None:
+        """Start the background flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
@@ -0,0 +1,156 @@
+"""Set-based fleet health statistics and their history."""
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.fleet_health import FleetHealth
+from app.models.robot import Robot, RobotStatus
+
+# Counts stored per run, averaged when downsampling history
+COUNT_COLUMNS = (
+    "total",
+    *(status.value for status in RobotStatus),
+    "low_battery",
+)
+
+
+# Top-level stats that add up across shards
+SUMMED_STATS = ("total", "online", "offline", "low_battery", "marked_offline")
+
+# Half-open robot id range [low, high) covered by one shard
+ShardBounds = tuple[UUID, UUID | None]
+
+
+def shard_bounds(shard: int, shards: int) -> ShardBounds:
+    """
+    Split the id space into ``shards`` equal ranges and return one.
+
+    Robot ids are random (uuid4), so equal id ranges hold about as many
+    robots each, and every shard is a primary key range scan.
+    """
+    space = 1 << 128
+    low = UUID(int=space * shard // shards)
+    high = UUID(int=space * (shard + 1) // shards) if shard + 1 < shards else None
+    return low, high
+
+
+def in_shard(column: Any, bounds: ShardBounds | None) -> list[ColumnElement[bool]]:
+    """Criteria restricting ``column`` (a robot id) to a shard."""
+    if bounds is None:
+        return []
+    low, high = bounds
+    criteria = [column >= low]
+    if high is not None:
+        criteria.append(column < high)
+    return criteria
+
+
+def fleet_stats(
+    session: Session, low_battery: float, bounds: ShardBounds | None = None
+) -> dict[str, Any]:
+    """
+    Count robots per status and with low battery in one aggregate query.
+
+    Runs ``GROUP BY status`` with ``count(*) FILTER (WHERE battery_level <
+    low_battery)``, so only one row per status leaves the database.
+    ``bounds`` limits the count to one shard of the fleet.
+    """
+    result = session.execute(
+        select(
+            Robot.status,
+            func.count(),
+            func.count().filter(Robot.battery_level < low_battery),
+        )
+        .where(*in_shard(Robot.id, bounds))
+        .group_by(Robot.status)
+    )
+    by_status = {status.value: 0 for status in RobotStatus}
+    low = 0
+    for robot_status, count, low_count in result.all():
+        by_status[robot_status.value] = count
+        low += low_count
+
+    total = sum(by_status.values())
+    return {
+        "total": total,
+        "online": total - by_status[RobotStatus.OFFLINE.value],
+        "offline": by_status[RobotStatus.OFFLINE.value],
+        "low_battery": low,
+        "by_status": by_status,
+    }
+
+
+def merge_stats(parts: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Add up per-shard stats into one fleet summary."""
+    merged = dict.fromkeys(SUMMED_STATS, 0)
+    by_status = {status.value: 0 for status in RobotStatus}
+    for part in parts:
+        for name in SUMMED_STATS:
+            merged[name] += part[name]
+        for name, count in part["by_status"].items():
+            by_status[name] += count
+    return {**merged, "by_status": by_status}
+
+
+def record_fleet_health(
+    session: Session, now: datetime, stats: dict[str, Any]
+) -> None:
+    """Append a run's stats to the history and drop rows past retention."""
+    session.execute(
+        insert(FleetHealth).values(
+            recorded_at=now,
+            total=stats["total"],
+            low_battery=stats["low_battery"],
+            marked_offline=stats["marked_offline"],
+            **stats["by_status"],
+        )
+    )
+    cutoff = now - timedelta(days=settings.fleet_health_retention_days)
+    session.execute(delete(FleetHealth).where(FleetHealth.recorded_at < cutoff))
+
+
+async def fleet_health_history(
+    session: AsyncSession,
+    start: datetime,
+    end: datetime,
+    max_points: int,
+) -> list[dict[str, Any]]:
+    """
+    Average recorded health checks into at most ``max_points`` time buckets.
+
+    Counts are averaged per bucket; ``marked_offline`` is summed.
+    """
+    width = max((end - start).total_seconds() / max_points, 1e-6)
+    offset = func.extract("epoch", FleetHealth.recorded_at) - start.timestamp()
+    bucket = func.floor(offset / width).label("bucket")
+    columns = FleetHealth.__table__.c
+
+    stmt = (
+        select(
+            bucket,
+            func.count().label("samples"),
+            *(func.avg(columns[name]).label(name) for name in COUNT_COLUMNS),
+            func.sum(FleetHealth.marked_offline).label("marked_offline"),
+        )
+        .where(FleetHealth.recorded_at >= start, FleetHealth.recorded_at < end)
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    result = await session.execute(stmt)
+
+    return [
+        {
+            "recorded_at": start + timedelta(seconds=row.bucket * width),
+            "samples": row.samples,
+            **{name: float(getattr(row, name)) for name in COUNT_COLUMNS},
+            "marked_offline": int(row.marked_offline),
+        }
+        for row in result.all()
+    ]
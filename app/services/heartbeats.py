@@ -0,0 +1,191 @@
+"""Heartbeat deadlines and offline detection for robots."""
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, cast
+from uuid import UUID
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import Row, Table, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.robot import Robot, RobotStatus
+from app.services.fleet_health import ShardBounds, in_shard
+
+logger = logging.getLogger(__name__)
+
+robots_table = cast(Table, Robot.__table__)
+
+# Statuses a missed heartbeat never changes
+SETTLED_STATUSES = (RobotStatus.OFFLINE, RobotStatus.MAINTENANCE)
+
+# Atomically take up to ARGV[2] members whose deadline is at or before
+# ARGV[1], so a heartbeat landing in between is never lost
+POP_EXPIRED_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+return due
+"""
+
+
+@dataclass
+class HeartbeatTracker:
+    """
+    Redis sorted set of robot heartbeat deadlines.
+
+    Each heartbeat moves the robot's deadline to ``timeout`` seconds from
+    now. The expiry task pops only the robots whose deadline has passed,
+    so a run costs O(expired) however large the fleet is. When disabled,
+    offline detection falls back to an indexed ``last_seen_at`` query.
+    """
+
+    redis_url: str
+    key: str = "openmotiv:robot-deadlines"
+    timeout: float = 30.0
+    enabled: bool = False
+
+    _redis: aioredis.Redis | None = None
+    _sync_redis: redis.Redis | None = None
+
+    def _deadlines(
+        self, seen: Iterable[tuple[UUID, datetime]]
+    ) -> dict[str, float]:
+        return {
+            str(robot_id): last_seen.timestamp() + self.timeout
+            for robot_id, last_seen in seen
+        }
+
+    async def beat(self, robot_ids: Iterable[UUID], now: datetime) -> None:
+        """Push back the deadline of robots seen at ``now``."""
+        if not self.enabled:
+            return
+        mapping = self._deadlines((robot_id, now) for robot_id in robot_ids)
+        if not mapping:
+            return
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(self.redis_url, decode_responses=True)
+        try:
+            await self._redis.zadd(self.key, mapping)
+        except redis.RedisError:
+            # The periodic last_seen_at sweep still catches these robots
+            logger.exception("Failed to record heartbeats")
+
+    async def forget(self, robot_id: UUID) -> None:
+        """Stop tracking a deleted robot."""
+        if not self.enabled:
+            return
+        if self._redis is None:
+            self._redis = aioredis.Redis.from_url(self.redis_url, decode_responses=True)
+        try:
+            await self._redis.zrem(self.key, str(robot_id))
+        except redis.RedisError:
+            logger.exception("Failed to forget robot heartbeat")
+
+    def _sync(self) -> redis.Redis:
+        if self._sync_redis is None:
+            self._sync_redis = redis.Redis.from_url(
+                self.redis_url, decode_responses=True
+            )
+        return self._sync_redis
+
+    def pop_expired(self, now: datetime, limit: int) -> list[UUID]:
+        """Remove and return up to ``limit`` robots past their deadline."""
+        due = cast(
+            list[str],
+            self._sync().eval(POP_EXPIRED_SCRIPT, 1, self.key, now.timestamp(), limit),
+        )
+        return [UUID(robot_id) for robot_id in due]
+
+    def track(self, seen: Iterable[tuple[UUID, datetime]]) -> None:
+        """
+        Set deadlines from (robot id, last seen) pairs (from synchronous code).
+
+        Never moves a deadline earlier, so a heartbeat recorded meanwhile wins.
+        """
+        if mapping := self._deadlines(seen):
+            self._sync().zadd(self.key, mapping, gt=True)
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+def mark_offline(
+    session: Session,
+    now: datetime,
+    timeout: float,
+    robot_ids: list[UUID] | None = None,
+    bounds: ShardBounds | None = None,
+) -> list[Row[Any]]:
+    """
+    Mark robots not seen for ``timeout`` seconds offline in one UPDATE.
+
+    Limited to ``robot_ids`` when given; otherwise a range scan of the
+    partial ``last_seen_at`` index, optionally within one shard's id
+    ``bounds``. Robots that never reported are left alone. Returns the
+    rows of the robots that went offline.
+    """
+    stmt = (
+        update(robots_table)
+        .where(
+            robots_table.c.status.not_in(SETTLED_STATUSES),
+            robots_table.c.last_seen_at < now - timedelta(seconds=timeout),
+            *in_shard(robots_table.c.id, bounds),
+        )
+        .values(status=RobotStatus.OFFLINE, updated_at=now)
+        .returning(*robots_table.c)
+    )
+    if robot_ids is not None:
+        stmt = stmt.where(robots_table.c.id.in_(robot_ids))
+    return list(session.execute(stmt).all())
+
+
+def expire_robots(
+    session: Session,
+    now: datetime,
+    tracker: HeartbeatTracker,
+    limit: int,
+) -> tuple[list[Row[Any]], int]:
+    """
+    Mark one batch of robots whose heartbeat deadline passed offline.
+
+    Returns the robots that went offline and how many deadlines were
+    popped. Popped robots that turn out to have been seen since (e.g. a
+    heartbeat written by a worker with a lagging clock) are tracked again.
+    """
+    due = tracker.pop_expired(now, limit)
+    if not due:
+        return [], 0
+    rows = mark_offline(session, now, tracker.timeout, due)
+    expired = {row.id for row in rows}
+    if len(expired) < len(due):
+        result = session.execute(
+            select(Robot.id, Robot.last_seen_at).where(
+                Robot.id.in_(list(set(due) - expired)),
+                Robot.status.not_in(SETTLED_STATUSES),
+                Robot.last_seen_at.is_not(None),
+            )
+        )
+        tracker.track(
+            (robot_id, last_seen)
+            for robot_id, last_seen in result
+            if last_seen is not None
+        )
+    return rows, len(due)
+
+
+# Global instance
+heartbeat_tracker = HeartbeatTracker(
+    redis_url=settings.redis_url,
+    key=settings.heartbeat_redis_key,
+    timeout=settings.robot_offline_timeout_seconds,
+    enabled=settings.heartbeat_redis_enabled,
+)
@@ -0,0 +1,90 @@
+"""Shared write path for high-rate robot status ingestion."""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.robot import Robot, RobotStatus
+from app.schemas.robot import TelemetryFrame
+from app.services.heartbeats import heartbeat_tracker
+from app.services.robots import apply_status_updates
+from app.services.status_buffer import status_buffer
+from app.services.telemetry import telemetry_recorder
+
+
+async def ingest_status_updates(
+    session: AsyncSession,
+    updates: dict[UUID, dict[str, Any]],
+) -> list[Any]:
+    """
+    Apply status updates for many robots and record them in history.
+
+    Honours write-behind mode and counts as a heartbeat for every robot,
+    so offline robots come back as idle.
+    Returns the resulting state of every robot that exists; unknown ids
+    are skipped.
+    """
+    now = datetime.now(timezone.utc)
+    if settings.status_write_behind:
+        result = await session.execute(select(Robot).where(Robot.id.in_(updates)))
+        rows = []
+        for robot in result.scalars().all():
+            data = updates[robot.id]
+            # Revive offline robots now, as the flush would, so reads agree
+            if robot.status == RobotStatus.OFFLINE and data.get("status") is None:
+                data = {**data, "status": RobotStatus.IDLE}
+            status_buffer.add(robot.id, data)
+            rows.append(status_buffer.apply(robot))
+    else:
+        rows = await apply_status_updates(session, updates)
+    await heartbeat_tracker.beat((row.id for row in rows), now)
+
+    if settings.telemetry_history_enabled:
+        for row in rows:
+            telemetry_recorder.record(row)
+
+    return rows
+
+
+def merge_frames(frames: list[TelemetryFrame]) -> dict[UUID, dict[str, Any]]:
+    """Coalesce frames per robot in arrival order (last write wins)."""
+    updates: dict[UUID, dict[str, Any]] = {}
+    for frame in frames:
+        updates.setdefault(frame.robot_id, {}).update(
+            frame.model_dump(exclude_unset=True, exclude={"seq", "robot_id"})
+        )
+    return updates
+
+
+async def collect_batch(
+    queue: asyncio.Queue[TelemetryFrame],
+    max_frames: int,
+    max_delay: float,
+) -> list[TelemetryFrame]:
+    """
+    Wait for at least one frame, then gather more for up to ``max_delay``.
+
+    Returns early once ``max_frames`` frames have been collected.
+    """
+    batch = [await queue.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_delay
+
+    while len(batch) < max_frames:
+        # Drain whatever is already queued without waiting
+        while len(batch) < max_frames and not queue.empty():
+            batch.append(queue.get_nowait())
+        remaining = deadline - loop.time()
+        if len(batch) >= max_frames or remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+        except TimeoutError:
+            break
+
+    return batch
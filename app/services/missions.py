@@ -0,0 +1,125 @@
+"""Atomic mission lifecycle transitions."""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.mission import Mission, MissionStatus
+from app.models.robot import Robot, RobotStatus
+
+
+@dataclass(frozen=True)
+class Transition:
+    """A lifecycle action and the robot status change that goes with it."""
+
+    target: MissionStatus
+    sources: tuple[MissionStatus, ...]
+    robot_status: RobotStatus
+    # Only robots currently in one of these states are changed (None: any)
+    robot_sources: tuple[RobotStatus, ...] | None = None
+
+
+# Starting needs a robot that can work (not offline, charging or in
+# maintenance); finishing frees it unless it has moved on (e.g. charging)
+TRANSITIONS = {
+    "start": Transition(
+        MissionStatus.IN_PROGRESS,
+        (MissionStatus.ASSIGNED,),
+        RobotStatus.ACTIVE,
+        (RobotStatus.IDLE, RobotStatus.ACTIVE),
+    ),
+    "complete": Transition(
+        MissionStatus.COMPLETED,
+        (MissionStatus.IN_PROGRESS,),
+        RobotStatus.IDLE,
+        (RobotStatus.ACTIVE,),
+    ),
+    "fail": Transition(
+        MissionStatus.FAILED,
+        (MissionStatus.ASSIGNED, MissionStatus.IN_PROGRESS),
+        RobotStatus.IDLE,
+        (RobotStatus.ACTIVE,),
+    ),
+    "cancel": Transition(
+        MissionStatus.CANCELLED,
+        (MissionStatus.PENDING, MissionStatus.ASSIGNED, MissionStatus.IN_PROGRESS),
+        RobotStatus.IDLE,
+        (RobotStatus.ACTIVE,),
+    ),
+}
+
+
+def transition_statement(mission_id: UUID, transition: Transition) -> Select[Any]:
+    """
+    Build one statement that moves a mission and its robot to a new state.
+
+    Both UPDATEs run in data-modifying CTEs guarded by the allowed source
+    states, so concurrent callers serialize on the row lock and only the
+    first wins; the rest see no row. A mission only starts if its robot
+    is in one of the allowed states. Selects ``(Mission, Robot | None)``.
+    """
+    now = datetime.now(timezone.utc)
+    # updated_at is set explicitly: two onupdate defaults can't share one
+    # statement
+    values = {"status": transition.target, "updated_at": now}
+    criteria = [Mission.id == mission_id, Mission.status.in_(transition.sources)]
+    if transition.target == MissionStatus.IN_PROGRESS:
+        values["started_at"] = func.coalesce(Mission.started_at, now)
+        criteria.append(Mission.robot_id.is_not(None))
+        if transition.robot_sources is not None:
+            criteria.append(
+                select(Robot.id)
+                .where(
+                    Robot.id == Mission.robot_id,
+                    Robot.status.in_(transition.robot_sources),
+                )
+                .exists()
+            )
+    elif transition.target in (MissionStatus.COMPLETED, MissionStatus.FAILED):
+        values["completed_at"] = now
+    if transition.target == MissionStatus.COMPLETED:
+        values["progress"] = 100.0
+
+    mission_cte = (
+        update(Mission)
+        .where(*criteria)
+        .values(**values)
+        .returning(*Mission.__table__.c)
+        .cte("mission")
+    )
+    robot_update = update(Robot).where(Robot.id == mission_cte.c.robot_id)
+    if transition.robot_sources is not None:
+        robot_update = robot_update.where(Robot.status.in_(transition.robot_sources))
+    robot_cte = (
+        robot_update.values(status=transition.robot_status, updated_at=now)
+        .returning(*Robot.__table__.c)
+        .cte("robot")
+    )
+
+    mission = aliased(Mission, mission_cte)
+    robot = aliased(Robot, robot_cte)
+    return (
+        select(mission, robot)
+        .outerjoin(robot, robot.id == mission.robot_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def transition_mission(
+    session: AsyncSession, mission_id: UUID, action: str
+) -> tuple[Mission, Robot | None] | None:
+    """
+    Apply a lifecycle action in one round trip.
+
+    Returns the mission and the robot if its status changed, or None when
+    the mission doesn't exist, isn't in an allowed source state or (for
+    start) its robot can't take it.
+    """
+    stmt = transition_statement(mission_id, TRANSITIONS[action])
+    row = (await session.execute(stmt)).one_or_none()
+    return None if row is None else (row[0], row[1])
@@ -0,0 +1,165 @@
+"""Set-based data access helpers for robot state."""
+
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from typing import Any, cast
+from uuid import UUID
+
+from sqlalchemy import (
+    Row,
+    Table,
+    Uuid,
+    case,
+    column,
+    func,
+    literal,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pubsub import event_bus
+from app.models.robot import Robot, RobotStatus
+
+robots_table = cast(Table, Robot.__table__)
+
+# Telemetry columns a status update may touch
+STATUS_FIELDS = (
+    "status",
+    "location_x",
+    "location_y",
+    "location_z",
+    "heading",
+    "battery_level",
+)
+
+
+def robot_state(robot: Any) -> dict[str, Any]:
+    """Serialize a robot (ORM object or result row) for WebSocket events."""
+    return {
+        "id": str(robot.id),
+        "name": robot.name,
+        "serial_number": robot.serial_number,
+        "robot_type": robot.robot_type.value,
+        "status": robot.status.value,
+        "location_x": robot.location_x,
+        "location_y": robot.location_y,
+        "location_z": robot.location_z,
+        "heading": robot.heading,
+        "battery_level": robot.battery_level,
+    }
+
+
+# Columns sent in the fleet snapshot
+SNAPSHOT_COLUMNS = (Robot.id, Robot.name, Robot.status, Robot.battery_level)
+
+
+async def fleet_snapshot_page(
+    session: AsyncSession, after: UUID | None, limit: int
+) -> list[Row[Any]]:
+    """
+    Fetch one page of the fleet snapshot, ordered by id.
+
+    Selects only the snapshot columns (no ORM objects or relationships) and
+    pages by keyset: pass the last id of the previous page as ``after``.
+    """
+    stmt = select(*SNAPSHOT_COLUMNS).order_by(Robot.id).limit(limit)
+    if after is not None:
+        stmt = stmt.where(Robot.id > after)
+    result = await session.execute(stmt)
+    return list(result.all())
+
+
+def publish_status_updates(robots: Iterable[Any]) -> None:
+    """Publish committed status changes from synchronous code (Celery tasks)."""
+    for robot in robots:
+        event_bus.publish_robot_update(
+            robot.id,
+            {
+                "event": "status_update",
+                "robot_id": str(robot.id),
+                "robot": robot_state(robot),
+            },
+        )
+
+
+async def apply_status_updates(
+    session: AsyncSession,
+    updates: dict[UUID, dict[str, Any]],
+) -> list[Row[Any]]:
+    """
+    Apply status/telemetry updates for many robots in one statement.
+
+    Runs a single ``UPDATE robots ... FROM (VALUES ...) RETURNING *``.
+    Fields that are missing or None leave the stored value untouched.
+    An ``updated_at`` entry is written as-is (used by deferred writes);
+    otherwise the row is stamped with the current time. Every update also
+    counts as a heartbeat and sets ``last_seen_at`` the same way, and
+    brings an offline robot back as idle unless it sets a status itself.
+    Returns one row per robot that exists; unknown ids are skipped.
+    """
+    if not updates:
+        return []
+    now = datetime.now(timezone.utc)
+
+    # Only carry columns that at least one update actually sets, so every
+    # VALUES column has a typed parameter Postgres can infer from.
+    fields = [
+        name
+        for name in (*STATUS_FIELDS, "updated_at")
+        if any(data.get(name) is not None for data in updates.values())
+    ]
+
+    rows = [
+        (
+            robot_id,
+            *(data.get(name) for name in fields),
+            data.get("last_seen_at") or now,
+        )
+        for robot_id, data in updates.items()
+    ]
+    incoming = values(
+        column("id", Uuid()),
+        *(column(name, robots_table.c[name].type) for name in fields),
+        column("last_seen_at", robots_table.c.last_seen_at.type),
+        name="incoming",
+    ).data(rows)
+
+    # Like a heartbeat, any update revives a robot marked offline
+    current_status = case(
+        (
+            robots_table.c.status == RobotStatus.OFFLINE,
+            literal(RobotStatus.IDLE, robots_table.c.status.type),
+        ),
+        else_=robots_table.c.status,
+    )
+    stmt = (
+        update(robots_table)
+        .where(robots_table.c.id == incoming.c.id)
+        .values(
+            {
+                name: func.coalesce(
+                    incoming.c[name],
+                    func.now() if name == "updated_at" else robots_table.c[name],
+                )
+                for name in fields
+            }
+            | {
+                "status": (
+                    func.coalesce(incoming.c.status, current_status)
+                    if "status" in fields
+                    else current_status
+                )
+            }
+            | {
+                # Deferred writes may land after a newer heartbeat
+                "last_seen_at": func.greatest(
+                    incoming.c.last_seen_at, robots_table.c.last_seen_at
+                )
+            }
+        )
+        .returning(*robots_table.c)
+    )
+    result = await session.execute(stmt)
+    return list(result.all())
@@ -0,0 +1,285 @@
+"""Claim-based scheduling of due missions onto robots."""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, cast
+from uuid import UUID
+
+from sqlalchemy import (
+    Row,
+    Table,
+    Uuid,
+    and_,
+    column,
+    exists,
+    func,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.mission import Mission, MissionStatus
+from app.models.robot import Robot, RobotStatus
+from app.services.assignment import AssignmentSolver, assignment_solver
+from app.services.spatial import SpatialIndex
+
+missions_table = cast(Table, Mission.__table__)
+robots_table = cast(Table, Robot.__table__)
+
+# Missions holding on to their robot
+BUSY_STATUSES = (MissionStatus.ASSIGNED, MissionStatus.IN_PROGRESS)
+
+
+@dataclass
+class ScheduleBatch:
+    """Outcome of one scheduling batch."""
+
+    claimed: int = 0
+    started: int = 0
+    auto_assigned: int = 0
+    # Last mission claimed, where the next batch of the run picks up
+    last: Row[Any] | None = None
+    # False once auto-assignment ran out of eligible idle robots
+    robots_left: bool = True
+    # Robots that became active, for broadcasting once committed
+    robots: list[Row[Any]] = field(default_factory=list)
+
+
+def claim_due_missions(
+    session: Session,
+    now: datetime,
+    limit: int,
+    after: Row[Any] | None = None,
+    include_pending: bool = True,
+) -> list[Row[Any]]:
+    """
+    Lock up to ``limit`` due missions, most urgent first.
+
+    Assigned missions are only due once their robot is idle, so missions
+    that cannot start yet never crowd out pending ones. ``after`` resumes
+    from the last mission of a previous batch in the same run; without
+    ``include_pending`` only assigned missions are claimed. ``SKIP
+    LOCKED`` hands missions already claimed by a concurrent scheduler to
+    that scheduler instead of waiting for it.
+    """
+    robot_idle = exists().where(
+        Robot.id == Mission.robot_id, Robot.status == RobotStatus.IDLE
+    )
+    startable = and_(Mission.status == MissionStatus.ASSIGNED, robot_idle)
+    if include_pending:
+        startable = or_(Mission.status == MissionStatus.PENDING, startable)
+    stmt = (
+        select(
+            Mission.id,
+            Mission.status,
+            Mission.robot_id,
+            Mission.priority,
+            Mission.scheduled_at,
+            Mission.target_x,
+            Mission.target_y,
+            Mission.target_z,
+        )
+        .where(Mission.scheduled_at <= now, startable)
+        .order_by(Mission.priority.desc(), Mission.scheduled_at, Mission.id)
+        .limit(limit)
+        .with_for_update(of=Mission, skip_locked=True)
+    )
+    if after is not None:
+        stmt = stmt.where(
+            or_(
+                Mission.priority < after.priority,
+                and_(
+                    Mission.priority == after.priority,
+                    tuple_(Mission.scheduled_at, Mission.id)
+                    > tuple_(after.scheduled_at, after.id),
+                ),
+            )
+        )
+    return list(session.execute(stmt).all())
+
+
+def claim_idle_robots(
+    session: Session,
+    limit: int,
+    robot_ids: list[UUID] | None = None,
+    near: list[UUID] | None = None,
+    exclude: Iterable[UUID] = (),
+) -> list[Row[Any]]:
+    """
+    Lock up to ``limit`` idle robots, skipping any another scheduler holds.
+
+    Without ``robot_ids``, only robots that no other mission is holding on
+    to and that have enough charge are eligible for auto-assignment;
+    ``near`` narrows those to the given candidates and ``exclude`` skips
+    robots already claimed.
+    """
+    if limit <= 0:
+        return []
+    stmt = select(
+        Robot.id,
+        Robot.location_x,
+        Robot.location_y,
+        Robot.location_z,
+        Robot.battery_level,
+    ).where(Robot.status == RobotStatus.IDLE)
+    if robot_ids is not None:
+        stmt = stmt.where(Robot.id.in_(robot_ids))
+    else:
+        stmt = stmt.where(
+            ~exists().where(
+                Mission.robot_id == Robot.id, Mission.status.in_(BUSY_STATUSES)
+            ),
+            or_(
+                Robot.battery_level.is_(None),
+                Robot.battery_level >= settings.assignment_min_battery,
+            ),
+        )
+        if near is not None:
+            stmt = stmt.where(Robot.id.in_(near))
+        if exclude := list(exclude):
+            stmt = stmt.where(Robot.id.not_in(exclude))
+    result = session.execute(
+        stmt.order_by(Robot.id).limit(limit).with_for_update(skip_locked=True)
+    )
+    return list(result.all())
+
+
+def idle_robot_index(session: Session) -> SpatialIndex:
+    """Build a spatial index of the idle robots with a known location."""
+    result = session.execute(
+        select(Robot.id, Robot.location_x, Robot.location_y, Robot.status).where(
+            Robot.status == RobotStatus.IDLE,
+            Robot.location_x.is_not(None),
+            Robot.location_y.is_not(None),
+        )
+    )
+    index = SpatialIndex(cell_size=settings.spatial_cell_size)
+    index.add_rows(result.all())
+    return index
+
+
+def nearby_robot_ids(
+    index: SpatialIndex, missions: Sequence[Any], per_mission: int
+) -> list[UUID]:
+    """The ``per_mission`` idle robots nearest each mission target, deduplicated."""
+    ids: dict[UUID, None] = {}
+    for mission in missions:
+        if mission.target_x is None or mission.target_y is None:
+            continue
+        for robot_id, _ in index.nearest(
+            mission.target_x, mission.target_y, per_mission, [RobotStatus.IDLE]
+        ):
+            ids[robot_id] = None
+    return list(ids)
+
+
+def start_missions(
+    session: Session, assignments: dict[UUID, UUID], now: datetime
+) -> list[Row[Any]]:
+    """
+    Start missions on the given robots with two set-based UPDATEs.
+
+    ``assignments`` maps mission id to robot id. Returns the robots' rows.
+    """
+    if not assignments:
+        return []
+
+    incoming = values(
+        column("id", Uuid()),
+        column("robot_id", Uuid()),
+        name="incoming",
+    ).data(list(assignments.items()))
+    session.execute(
+        update(missions_table)
+        .where(missions_table.c.id == incoming.c.id)
+        .values(
+            robot_id=incoming.c.robot_id,
+            status=MissionStatus.IN_PROGRESS,
+            started_at=func.coalesce(missions_table.c.started_at, now),
+            updated_at=now,
+        )
+    )
+    result = session.execute(
+        update(robots_table)
+        .where(robots_table.c.id.in_(list(assignments.values())))
+        .values(status=RobotStatus.ACTIVE, updated_at=now)
+        .returning(*robots_table.c)
+    )
+    return list(result.all())
+
+
+def schedule_batch(
+    session: Session,
+    now: datetime,
+    limit: int,
+    solver: AssignmentSolver = assignment_solver,
+    index: SpatialIndex | None = None,
+    after: Row[Any] | None = None,
+    include_pending: bool = True,
+) -> ScheduleBatch:
+    """
+    Claim one batch of due missions and start as many as robots allow.
+
+    Assigned missions start on their own robot once it is idle. Pending
+    ones are matched by ``solver`` (distance, battery, priority) against
+    ``scheduler_robots_per_mission`` claimed idle robots each; leaving the
+    rest unclaimed lets parallel schedulers find robots too. With an
+    ``index`` of idle robots, the candidates are the ones nearest each
+    target, topped up from the rest of the fleet. Missions left
+    over stay due for a later run; passing the previous batch's ``last``
+    as ``after`` moves on past them within a run. Once ``robots_left`` comes
+    back False, pass ``include_pending=False`` to only start assigned
+    missions for the rest of the run. Locks are held until the caller
+    commits, so several schedulers can run at once without double-booking
+    a mission or a robot.
+    """
+    missions = claim_due_missions(session, now, limit, after, include_pending)
+    batch = ScheduleBatch(
+        claimed=len(missions), last=missions[-1] if missions else after
+    )
+
+    assigned = {
+        m.id: m.robot_id
+        for m in missions
+        if m.status == MissionStatus.ASSIGNED and m.robot_id
+    }
+    pending = [m for m in missions if m.status == MissionStatus.PENDING]
+
+    ready = {
+        robot.id
+        for robot in claim_idle_robots(
+            session, len(assigned), list(assigned.values())
+        )
+    }
+    assignments = {}
+    for mission_id, robot_id in assigned.items():
+        # A robot assigned several due missions starts only one of them
+        if robot_id in ready:
+            ready.discard(robot_id)
+            assignments[mission_id] = robot_id
+
+    if pending:
+        per_mission = max(settings.scheduler_robots_per_mission, 1)
+        candidates = len(pending) * per_mission
+        robots = []
+        if index is not None:
+            near = nearby_robot_ids(index, pending, per_mission)
+            robots = claim_idle_robots(session, candidates, near=near)
+        if len(robots) < candidates:
+            robots += claim_idle_robots(
+                session, candidates - len(robots), exclude=[r.id for r in robots]
+            )
+            # Even the whole fleet couldn't fill the request
+            batch.robots_left = len(robots) == candidates
+        matched = solver.assign(pending, robots)
+        assignments.update(matched)
+        batch.auto_assigned = len(matched)
+
+    batch.robots = start_missions(session, assignments, now)
+    batch.started = len(assignments)
+    return batch
@@ -0,0 +1,277 @@
+"""In-memory uniform-grid spatial index of robot locations."""
+
+import asyncio
+import contextlib
+import heapq
+import logging
+import math
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models.robot import Robot, RobotStatus
+
+logger = logging.getLogger(__name__)
+
+Cell = tuple[int, int]
+# cell -> robot id -> (x, y)
+Grid = dict[Cell, dict[UUID, tuple[float, float]]]
+
+
+def _ring(cx: int, cy: int, r: int) -> Iterator[Cell]:
+    """Cells at Chebyshev distance exactly ``r`` from ``(cx, cy)``."""
+    if r == 0:
+        yield cx, cy
+        return
+    for dx in range(-r, r + 1):
+        yield cx + dx, cy - r
+        yield cx + dx, cy + r
+    for dy in range(-r + 1, r):
+        yield cx - r, cy + dy
+        yield cx + r, cy + dy
+
+
+@dataclass
+class SpatialIndex:
+    """
+    Uniform grid of robot x/y positions, one grid per robot status.
+
+    Robots are bucketed into square cells of ``cell_size`` meters, so a
+    nearest or bounding-box query only looks at the cells around the query
+    instead of the whole fleet. Updates move a robot between cells in O(1).
+    Robots without a known x/y are not indexed.
+    """
+
+    cell_size: float = 50.0
+    refresh_interval: float = 60.0
+    session_factory: async_sessionmaker[AsyncSession] = async_session_maker
+
+    loaded: bool = False
+    _grids: dict[RobotStatus, Grid] = field(default_factory=dict)
+    # robot id -> (status, cell)
+    _robots: dict[UUID, tuple[RobotStatus, Cell]] = field(default_factory=dict)
+    _load_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    _task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._robots)
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def update(
+        self, robot_id: UUID, x: float | None, y: float | None, status: RobotStatus
+    ) -> None:
+        """Insert or move a robot; a missing x/y removes it."""
+        if x is None or y is None:
+            self.remove(robot_id)
+            return
+        cell = self._cell(x, y)
+        if self._robots.get(robot_id) != (status, cell):
+            self.remove(robot_id)
+            self._robots[robot_id] = (status, cell)
+        self._grids.setdefault(status, {}).setdefault(cell, {})[robot_id] = (x, y)
+
+    def remove(self, robot_id: UUID) -> None:
+        """Drop a robot from the index if present."""
+        entry = self._robots.pop(robot_id, None)
+        if entry is None:
+            return
+        status, cell = entry
+        grid = self._grids[status]
+        grid[cell].pop(robot_id, None)
+        if not grid[cell]:
+            del grid[cell]
+
+    def add_rows(self, rows: Iterable[Any]) -> None:
+        """Index rows with ``id``, ``location_x``, ``location_y`` and ``status``."""
+        for row in rows:
+            self.update(row.id, row.location_x, row.location_y, row.status)
+
+    def clear(self) -> None:
+        """Forget every robot and mark the index as not loaded."""
+        self._grids = {}
+        self._robots = {}
+        self.loaded = False
+
+    def observe(self, robot_id: UUID, state: dict[str, Any]) -> None:
+        """Apply a robot state from a status_update event."""
+        if "status" in state:
+            self.update(
+                robot_id,
+                state.get("location_x"),
+                state.get("location_y"),
+                RobotStatus(state["status"]),
+            )
+
+    def _selected(self, statuses: Iterable[RobotStatus] | None) -> list[Grid]:
+        if statuses is None:
+            return list(self._grids.values())
+        return [self._grids[s] for s in statuses if s in self._grids]
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        k: int = 1,
+        statuses: Iterable[RobotStatus] | None = None,
+    ) -> list[tuple[UUID, float]]:
+        """
+        The ``k`` robots closest to ``(x, y)`` as (id, distance), closest first.
+
+        Searches rings of cells outward from the query's cell and stops once
+        no unvisited cell can hold anything closer than the k-th best.
+        """
+        grids = self._selected(statuses)
+        occupied = sum(len(grid) for grid in grids)
+        if k <= 0 or not occupied:
+            return []
+
+        # Max-heap of the best k as (-distance, id)
+        best: list[tuple[float, UUID]] = []
+
+        def visit(cell: Cell) -> None:
+            for grid in grids:
+                for robot_id, (px, py) in grid.get(cell, {}).items():
+                    item = (-math.hypot(px - x, py - y), robot_id)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+
+        cx, cy = self._cell(x, y)
+        visited = 0
+        r = 0
+        while visited < occupied:
+            if 8 * r > occupied:
+                # Sparse around the query: walk the remaining occupied
+                # cells by distance instead of mostly empty rings
+                self._scan_cells(grids, x, y, cx, cy, r, best, visit, k)
+                break
+            for cell in _ring(cx, cy, r):
+                if any(cell in grid for grid in grids):
+                    visited += 1
+                    visit(cell)
+            # Anything outside rings 0..r is at least r cells away
+            if len(best) == k and -best[0][0] <= r * self.cell_size:
+                break
+            r += 1
+
+        return [(robot_id, -dist) for dist, robot_id in sorted(best, reverse=True)]
+
+    def _scan_cells(
+        self,
+        grids: list[Grid],
+        x: float,
+        y: float,
+        cx: int,
+        cy: int,
+        r: int,
+        best: list[tuple[float, UUID]],
+        visit: Any,
+        k: int,
+    ) -> None:
+        """Visit occupied cells outside ring ``r - 1`` in order of distance."""
+        size = self.cell_size
+        remaining = []
+        for cell in {cell for grid in grids for cell in grid}:
+            if max(abs(cell[0] - cx), abs(cell[1] - cy)) < r:
+                continue
+            # Distance from the query to the cell's nearest edge
+            dx = max(cell[0] * size - x, 0.0, x - (cell[0] + 1) * size)
+            dy = max(cell[1] * size - y, 0.0, y - (cell[1] + 1) * size)
+            remaining.append((math.hypot(dx, dy), cell))
+        remaining.sort()
+        for bound, cell in remaining:
+            if len(best) == k and bound > -best[0][0]:
+                break
+            visit(cell)
+
+    def within(
+        self,
+        min_x: float,
+        min_y: float,
+        max_x: float,
+        max_y: float,
+        statuses: Iterable[RobotStatus] | None = None,
+    ) -> list[UUID]:
+        """Ids of robots inside the box (edges included)."""
+        grids = self._selected(statuses)
+        (x0, y0), (x1, y1) = self._cell(min_x, min_y), self._cell(max_x, max_y)
+        span = (x1 - x0 + 1) * (y1 - y0 + 1)
+
+        if span <= sum(len(grid) for grid in grids):
+            cells = [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+        else:
+            # Box covers more cells than are occupied: check those instead
+            cells = [
+                cell
+                for grid in grids
+                for cell in grid
+                if x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1
+            ]
+
+        found = []
+        for grid in grids:
+            for cell in cells:
+                for robot_id, (px, py) in grid.get(cell, {}).items():
+                    if min_x <= px <= max_x and min_y <= py <= max_y:
+                        found.append(robot_id)
+        return found
+
+    async def load(self, session: AsyncSession) -> None:
+        """Rebuild the index from the robots table."""
+        result = await session.execute(
+            select(Robot.id, Robot.location_x, Robot.location_y, Robot.status).where(
+                Robot.location_x.is_not(None), Robot.location_y.is_not(None)
+            )
+        )
+        fresh = SpatialIndex(cell_size=self.cell_size)
+        fresh.add_rows(result.all())
+        # Swap in whole so queries never see a half-built index
+        self._grids, self._robots = fresh._grids, fresh._robots
+        self.loaded = True
+
+    async def ensure_loaded(self, session: AsyncSession) -> "SpatialIndex":
+        """Load the index on first use."""
+        if not self.loaded:
+            async with self._load_lock:
+                if not self.loaded:
+                    await self.load(session)
+        return self
+
+    async def _run(self) -> None:
+        """Reload periodically to pick up changes made without an event."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                async with self.session_factory() as session:
+                    await self.load(session)
+            except Exception:
+                logger.exception("Failed to reload spatial index")
+
+    def start(self) -> None:
+        """Start the periodic reload loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the reload loop."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+# Global instance
+spatial_index = SpatialIndex(
+    cell_size=settings.spatial_cell_size,
+    refresh_interval=settings.spatial_refresh_seconds,
+)
@@ -0,0 +1,79 @@
+"""Write-behind buffer that coalesces robot status updates in memory."""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.robot import RobotRead
+from app.services.batching import PeriodicFlusher
+from app.services.robots import apply_status_updates
+
+
+@dataclass
+class StatusBuffer(PeriodicFlusher):
+    """
+    Coalesces status updates per robot and writes them back in batches.
+
+    Updates for the same robot are merged field by field (last write wins)
+    and flushed with one set-based UPDATE every ``flush_interval`` seconds,
+    or sooner once ``max_batch`` robots are pending. The buffer is local to
+    the process, so reads only see pending values from the same worker.
+    """
+
+    # robot_id -> merged pending fields
+    _pending: dict[UUID, dict[str, Any]] = field(default_factory=dict)
+    _flush_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def add(self, robot_id: UUID, data: dict[str, Any]) -> None:
+        """Merge an update into the pending state for a robot."""
+        pending = self._pending.setdefault(robot_id, {})
+        # Nulls never overwrite stored values on flush, so don't show them
+        pending.update(
+            {key: value for key, value in data.items() if value is not None}
+        )
+        # Written back as-is, so the row reflects when the update arrived
+        pending["updated_at"] = pending["last_seen_at"] = datetime.now(timezone.utc)
+
+        if len(self._pending) >= self.max_batch:
+            self._wake()
+
+    def pending(self, robot_id: UUID) -> dict[str, Any] | None:
+        """Get the not-yet-written fields for a robot, if any."""
+        return self._pending.get(robot_id)
+
+    def apply(self, robot: Any) -> Any:
+        """Overlay pending fields on a loaded robot for reads."""
+        pending = self._pending.get(robot.id)
+        if not pending:
+            return robot
+        return RobotRead.model_validate(robot).model_copy(update=pending)
+
+    async def flush(self) -> int:
+        """Write all pending updates to the database. Returns robots written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            try:
+                async with self.session_factory() as session:
+                    await apply_status_updates(session, batch)
+                    await session.commit()
+            except Exception:
+                # Put the batch back underneath anything that arrived meanwhile
+                for robot_id, data in batch.items():
+                    newer = self._pending.get(robot_id, {})
+                    self._pending[robot_id] = {**data, **newer}
+                raise
+
+            return len(batch)
+
+
+# Global instance
+status_buffer = StatusBuffer(
+    flush_interval=settings.status_flush_interval_seconds,
+    max_batch=settings.status_flush_max_batch,
+)
@@ -0,0 +1,142 @@
+"""Telemetry history: batched recording and downsampled reads."""
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.telemetry import RobotTelemetry
+from app.services.batching import PeriodicFlusher
+
+
+@dataclass
+class TelemetryRecorder(PeriodicFlusher):
+    """
+    Buffers telemetry samples and appends them to history in batches.
+
+    Unlike the status buffer nothing is coalesced: every sample is kept.
+    At most ``max_pending`` samples are held; the oldest are dropped first
+    if the database falls behind.
+    """
+
+    max_pending: int = 100_000
+
+    _samples: deque[dict[str, Any]] = field(default_factory=deque)
+
+    def __post_init__(self) -> None:
+        self._samples = deque(maxlen=self.max_pending)
+
+    def record(self, robot: Any) -> None:
+        """Queue the current state of a robot as a history sample."""
+        self._samples.append(
+            {
+                "robot_id": robot.id,
+                "recorded_at": robot.updated_at or datetime.now(timezone.utc),
+                "status": robot.status,
+                "location_x": robot.location_x,
+                "location_y": robot.location_y,
+                "location_z": robot.location_z,
+                "heading": robot.heading,
+                "battery_level": robot.battery_level,
+            }
+        )
+        if len(self._samples) >= self.max_batch:
+            self._wake()
+
+    async def flush(self) -> int:
+        """Append buffered samples to the history table."""
+        written = 0
+        while self._samples:
+            count = min(len(self._samples), self.max_batch)
+            batch = [self._samples.popleft() for _ in range(count)]
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(
+                        insert(RobotTelemetry).on_conflict_do_nothing(), batch
+                    )
+                    await session.commit()
+            except Exception:
+                self._samples.extendleft(reversed(batch))
+                raise
+            written += count
+        return written
+
+
+async def downsample_telemetry(
+    session: AsyncSession,
+    robot_id: UUID,
+    start: datetime,
+    end: datetime,
+    max_points: int,
+) -> list[dict[str, Any]]:
+    """
+    Average telemetry into at most ``max_points`` equal time buckets.
+
+    Aggregation runs in Postgres so raw samples never leave the database.
+    Heading is averaged on the unit circle so 359° and 1° average to 0°.
+    """
+    width = max((end - start).total_seconds() / max_points, 1e-6)
+    offset = func.extract("epoch", RobotTelemetry.recorded_at) - start.timestamp()
+
+    samples = (
+        select(
+            func.floor(offset / width).label("bucket"),
+            RobotTelemetry.location_x,
+            RobotTelemetry.location_y,
+            RobotTelemetry.location_z,
+            func.radians(RobotTelemetry.heading).label("heading"),
+            RobotTelemetry.battery_level,
+        )
+        .where(
+            RobotTelemetry.robot_id == robot_id,
+            RobotTelemetry.recorded_at >= start,
+            RobotTelemetry.recorded_at < end,
+        )
+        .subquery()
+    )
+    stmt = (
+        select(
+            samples.c.bucket,
+            func.count().label("samples"),
+            func.avg(samples.c.location_x).label("location_x"),
+            func.avg(samples.c.location_y).label("location_y"),
+            func.avg(samples.c.location_z).label("location_z"),
+            func.degrees(
+                func.atan2(
+                    func.avg(func.sin(samples.c.heading)),
+                    func.avg(func.cos(samples.c.heading)),
+                )
+            ).label("heading"),
+            func.avg(samples.c.battery_level).label("battery_level"),
+        )
+        .group_by(samples.c.bucket)
+        .order_by(samples.c.bucket)
+    )
+    result = await session.execute(stmt)
+
+    return [
+        {
+            "recorded_at": start + timedelta(seconds=row.bucket * width),
+            "samples": row.samples,
+            "location_x": row.location_x,
+            "location_y": row.location_y,
+            "location_z": row.location_z,
+            "heading": row.heading % 360 if row.heading is not None else None,
+            "battery_level": row.battery_level,
+        }
+        for row in result.all()
+    ]
+
+
+# Global instance
+telemetry_recorder = TelemetryRecorder(
+    flush_interval=settings.telemetry_flush_interval_seconds,
+    max_batch=settings.telemetry_flush_max_batch,
+    max_pending=settings.telemetry_max_pending,
+)
@@ -0,0 +1,40 @@
+"""Single-round-trip writes using UPDATE ... RETURNING."""
+
+from typing import Any, Protocol, TypeVar
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class HasId(Protocol):
+    """A mapped model with an ``id`` primary key column."""
+
+    id: Any
+
+
+ModelT = TypeVar("ModelT", bound=HasId)
+
+
+async def update_returning(
+    session: AsyncSession,
+    model: type[ModelT],
+    row_id: UUID,
+    values: dict[str, Any],
+    *criteria: ColumnElement[bool],
+) -> ModelT | None:
+    """
+    Update one row by id and read it back in the same statement.
+
+    Extra ``criteria`` guard the write (e.g. an allowed status). Returns
+    None when no row matched; a copy already in the session is refreshed.
+    """
+    stmt = (
+        update(model)
+        .where(model.id == row_id, *criteria)
+        .values(**values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
@@ -1,13 +1,17 @@
 """Background tasks for mission management."""
 
+import time
 from datetime import datetime, timezone
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 
+from app.core.config import settings
 from app.db.session import get_sync_session
 from app.models.mission import Mission, MissionStatus
-from app.models.robot import Robot, RobotStatus
+from app.services.missions import TRANSITIONS, transition_statement
+from app.services.robots import publish_status_updates
+from app.services.scheduler import idle_robot_index, schedule_batch
 from app.worker import celery_app
 
 
@@ -15,59 +19,60 @@ from app.worker import celery_app
 def process_scheduled_missions() -> dict:
     """
     Periodic task: Process missions that are scheduled to start.
-    
-    - Find missions with scheduled_at in the past that are still pending
-    - Auto-assign to available robots if possible
-    - Start assigned missions
+
+    - Claim due pending/assigned missions in batches (FOR UPDATE SKIP LOCKED)
+    - Auto-assign pending ones to the claimed idle robots nearest them,
+      found with a spatial index of idle robots built once per run
+    - Start them with set-based updates, committing per batch
+
+    Overlapping runs and parallel workers split the work instead of
+    repeating it. Each batch picks up after the previous one, so missions
+    that cannot start yet are passed over until a batch comes back short.
+    Once no idle robots are left to auto-assign, only assigned missions
+    are claimed, so a backlog of pending ones isn't paged through for
+    nothing.
     """
-    stats = {
+    stats: dict[str, float] = {
         "processed": 0,
         "started": 0,
         "auto_assigned": 0,
+        "batches": 0,
     }
-    
-    now = datetime.now(timezone.utc)
-    
-    with get_sync_session() as session:
-        # Find scheduled missions ready to start
-        result = session.execute(
-            select(Mission).where(
-                Mission.scheduled_at <= now,
-                Mission.status.in_([MissionStatus.PENDING, MissionStatus.ASSIGNED]),
+    batch_size = settings.scheduler_batch_size
+    clock = time.perf_counter()
+    index = None
+    last = None
+    include_pending = True
+
+    while True:
+        now = datetime.now(timezone.utc)
+        with get_sync_session() as session:
+            if index is None:
+                index = idle_robot_index(session)
+            batch = schedule_batch(
+                session,
+                now,
+                batch_size,
+                index=index,
+                after=last,
+                include_pending=include_pending,
             )
-        )
-        missions = result.scalars().all()
-        
-        for mission in missions:
-            stats["processed"] += 1
-            
-            # If pending, try to auto-assign
-            if mission.status == MissionStatus.PENDING:
-                # Find an idle robot
-                robot_result = session.execute(
-                    select(Robot).where(Robot.status == RobotStatus.IDLE).limit(1)
-                )
-                robot = robot_result.scalar_one_or_none()
-                
-                if robot:
-                    mission.robot_id = robot.id
-                    mission.status = MissionStatus.ASSIGNED
-                    stats["auto_assigned"] += 1
-            
-            # If assigned, start the mission
-            if mission.status == MissionStatus.ASSIGNED and mission.robot_id:
-                mission.status = MissionStatus.IN_PROGRESS
-                mission.started_at = now
-                stats["started"] += 1
-                
-                # Update robot status
-                robot_result = session.execute(
-                    select(Robot).where(Robot.id == mission.robot_id)
-                )
-                robot = robot_result.scalar_one_or_none()
-                if robot:
-                    robot.status = RobotStatus.ACTIVE
-    
+        publish_status_updates(batch.robots)
+        for robot in batch.robots:
+            index.remove(robot.id)
+
+        stats["batches"] += 1
+        stats["processed"] += batch.claimed
+        stats["started"] += batch.started
+        stats["auto_assigned"] += batch.auto_assigned
+        if batch.claimed < batch_size:
+            break
+        last = batch.last
+        include_pending = include_pending and batch.robots_left
+
+    elapsed = time.perf_counter() - clock
+    stats["elapsed_seconds"] = round(elapsed, 3)
+    stats["missions_per_second"] = round(stats["started"] / elapsed, 1)
     return stats
 
 
@@ -80,37 +85,39 @@ def simulate_mission_progress(mission_id: str) -> dict:
     This task simulates a mission completing in steps.
     """
     mission_uuid = UUID(mission_id)
-    
+    freed = []
+
     with get_sync_session() as session:
+        # Conditional increment, so a concurrent cancel or fail wins cleanly
         result = session.execute(
-            select(Mission).where(Mission.id == mission_uuid)
+            update(Mission)
+            .where(
+                Mission.id == mission_uuid,
+                Mission.status == MissionStatus.IN_PROGRESS,
+            )
+            .values(progress=func.least(Mission.progress + 25.0, 100.0))
+            .returning(Mission.progress)
         )
-        mission = result.scalar_one_or_none()
-        
-        if not mission:
-            return {"success": False, "error": "Mission not found"}
-        
-        if mission.status != MissionStatus.IN_PROGRESS:
-            return {"success": False, "error": f"Mission not in progress: {mission.status}"}
-        
-        # Increment progress
-        new_progress = min(mission.progress + 25.0, 100.0)
-        mission.progress = new_progress
-        
-        # Complete if 100%
+        new_progress = result.scalar_one_or_none()
+
+        if new_progress is None:
+            mission_status = session.execute(
+                select(Mission.status).where(Mission.id == mission_uuid)
+            ).scalar_one_or_none()
+            if mission_status is None:
+                return {"success": False, "error": "Mission not found"}
+            return {"success": False, "error": f"Mission not in progress: {mission_status}"}
+
+        # Complete if 100%, setting the robot back to idle
         if new_progress >= 100.0:
-            mission.status = MissionStatus.COMPLETED
-            mission.completed_at = datetime.now(timezone.utc)
-            
-            # Set robot back to idle
-            if mission.robot_id:
-                robot_result = session.execute(
-                    select(Robot).where(Robot.id == mission.robot_id)
-                )
-                robot = robot_result.scalar_one_or_none()
-                if robot:
-                    robot.status = RobotStatus.IDLE
-    
+            row = session.execute(
+                transition_statement(mission_uuid, TRANSITIONS["complete"])
+            ).one_or_none()
+            if row is not None and row[1] is not None:
+                freed.append(row[1])
+
+    publish_status_updates(freed)
+
     return {
         "success": True,
         "mission_id": mission_id,
@@ -1,59 +1,139 @@
 """Background tasks for robot fleet management."""
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
+from typing import Any
 from uuid import UUID
 
+import redis
+from celery import chord
 from sqlalchemy import select
 
+from app.core.config import settings
+from app.core.lease import Lease
+from app.core.pubsub import event_bus
 from app.db.session import get_sync_session
 from app.models.robot import Robot, RobotStatus
+from app.services.fleet_health import (
+    fleet_stats,
+    merge_stats,
+    record_fleet_health,
+    shard_bounds,
+)
+from app.services.heartbeats import expire_robots, heartbeat_tracker, mark_offline
+from app.services.robots import publish_status_updates
 from app.worker import celery_app
 
+# Connects lazily, on the first lease taken
+lease_redis = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+
+
+@celery_app.task(name="app.tasks.robots.expire_offline_robots")
+def expire_offline_robots() -> dict[str, Any]:
+    """
+    Periodic task: Mark robots offline once their heartbeat deadline passes.
+
+    Pops only the expired deadlines from the Redis tracker, so a run costs
+    O(expired) rather than O(fleet). Without Redis it runs the indexed
+    ``last_seen_at`` sweep instead, which is also bounded by the expired.
+    """
+    stats = {"expired": 0, "marked_offline": 0}
+    now = datetime.now(timezone.utc)
+
+    if not heartbeat_tracker.enabled:
+        with get_sync_session() as session:
+            rows = mark_offline(session, now, settings.robot_offline_timeout_seconds)
+        publish_status_updates(rows)
+        stats["expired"] = stats["marked_offline"] = len(rows)
+        return stats
+
+    limit = settings.heartbeat_expire_batch
+    while True:
+        # Deadlines popped by a batch that then fails to commit are picked
+        # up by the sweep in check_fleet_health
+        with get_sync_session() as session:
+            rows, popped = expire_robots(session, now, heartbeat_tracker, limit)
+        publish_status_updates(rows)
+        stats["expired"] += popped
+        stats["marked_offline"] += len(rows)
+        if popped < limit:
+            break
+
+    return stats
+
 
 @celery_app.task(name="app.tasks.robots.check_fleet_health")
 def check_fleet_health() -> dict:
     """
     Periodic task: Check health of all robots in the fleet.
-    
-    - Mark robots as offline if no update in 5 minutes
-    - Alert on low battery levels
-    - Collect fleet statistics
+
+    Fans the check out as a chord of ``fleet_health_shards`` shard tasks,
+    which any number of workers can pick up in parallel. Each shard covers
+    one range of robot ids; ``merge_fleet_health`` then adds up the
+    shards into one fleet summary.
     """
-    stats = {
-        "total": 0,
-        "online": 0,
-        "offline": 0,
-        "low_battery": 0,
-        "marked_offline": 0,
-    }
-    
-    with get_sync_session() as session:
-        # Get all robots
-        result = session.execute(select(Robot))
-        robots = result.scalars().all()
-        
-        stats["total"] = len(robots)
-        offline_threshold = datetime.now(timezone.utc) - timedelta(minutes=5)
-        
-        for robot in robots:
-            # Check if robot should be marked offline
-            if (
-                robot.status not in (RobotStatus.OFFLINE, RobotStatus.MAINTENANCE)
-                and robot.updated_at < offline_threshold
-            ):
-                robot.status = RobotStatus.OFFLINE
-                stats["marked_offline"] += 1
-            
-            # Count statistics
-            if robot.status == RobotStatus.OFFLINE:
-                stats["offline"] += 1
-            else:
-                stats["online"] += 1
-            
-            # Check battery level
-            if robot.battery_level is not None and robot.battery_level < 20:
-                stats["low_battery"] += 1
-    
+    shards = max(settings.fleet_health_shards, 1)
+    run_at = datetime.now(timezone.utc).isoformat()
+    summary = chord(
+        check_fleet_health_shard.s(shard, shards) for shard in range(shards)
+    )(merge_fleet_health.s(run_at))
+    return {"shards": shards, "run_at": run_at, "summary_task_id": summary.id}
+
+
+@celery_app.task(name="app.tasks.robots.check_fleet_health_shard")
+def check_fleet_health_shard(shard: int, shards: int) -> dict[str, Any]:
+    """
+    Check the robots in one shard of the fleet.
+
+    - Mark robots offline if not seen for ``robot_offline_timeout_seconds``
+      (a backstop for deadlines the tracker lost, e.g. on a Redis restart)
+    - Count robots per status and with low battery in one aggregate query
+
+    Holds a Redis lease on the shard while it runs, so an overlapping beat
+    tick skips the shard instead of checking it twice.
+    """
+    lease = Lease(
+        lease_redis,
+        f"openmotiv:fleet-health:{shards}:{shard}",
+        settings.fleet_health_lease_seconds,
+    )
+    if not lease.acquire():
+        return {"shard": shard, "skipped": True}
+
+    try:
+        bounds = shard_bounds(shard, shards)
+        now = datetime.now(timezone.utc)
+        with get_sync_session() as session:
+            marked_offline = mark_offline(
+                session, now, settings.robot_offline_timeout_seconds, bounds=bounds
+            )
+            stats = fleet_stats(session, settings.low_battery_threshold, bounds)
+            stats["marked_offline"] = len(marked_offline)
+    finally:
+        lease.release()
+
+    publish_status_updates(marked_offline)
+    return {"shard": shard, "skipped": False, **stats}
+
+
+@celery_app.task(name="app.tasks.robots.merge_fleet_health")
+def merge_fleet_health(results: list[dict[str, Any]], run_at: str) -> dict[str, Any]:
+    """
+    Chord callback: merge shard stats into one fleet summary.
+
+    The summary is appended to the fleet health history only when every
+    shard was checked; a run that skipped shards still held by an earlier
+    one is published but would understate the fleet.
+    """
+    checked = [result for result in results if not result["skipped"]]
+    stats = merge_stats(checked)
+    stats["shards"] = len(results)
+    stats["skipped_shards"] = len(results) - len(checked)
+
+    if not stats["skipped_shards"]:
+        with get_sync_session() as session:
+            record_fleet_health(session, datetime.fromisoformat(run_at), stats)
+    event_bus.publish_fleet_update({"event": "fleet_health", "stats": stats})
+
     return stats
 
 
@@ -86,5 +166,7 @@ def send_robot_command(robot_id: str, command: str, payload: dict | None = None)
             message = f"Robot {robot.name} emergency stopped"
         else:
             message = f"Unknown command: {command}"
-    
+
+    publish_status_updates([robot])
+
     return {"success": True, "message": message, "robot_id": robot_id}
@@ -0,0 +1,104 @@
+"""Background tasks for telemetry history maintenance."""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import get_sync_session
+from app.worker import celery_app
+
+PARTITION_PREFIX = "robot_telemetry_p"
+
+
+def _partition_name(day: date) -> str:
+    """Name of the daily partition holding samples for ``day``."""
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _existing_partitions(session: Session) -> dict[date, str]:
+    """Map each existing daily partition to the day it covers."""
+    result = session.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = 'robot_telemetry'
+            """
+        )
+    )
+    partitions = {}
+    for (name,) in result:
+        if name.startswith(PARTITION_PREFIX):
+            day = datetime.strptime(name.removeprefix(PARTITION_PREFIX), "%Y%m%d")
+            partitions[day.date()] = name
+    return partitions
+
+
+@celery_app.task(name="app.tasks.telemetry.create_telemetry_partitions")
+def create_telemetry_partitions() -> dict[str, Any]:
+    """
+    Periodic task: Pre-create daily telemetry partitions.
+
+    Creates partitions for today and the configured number of days ahead
+    so inserts never have to fall back to the default partition.
+    """
+    stats = {"created": 0, "failed": 0}
+    today = datetime.now(timezone.utc).date()
+
+    with get_sync_session() as session:
+        existing = _existing_partitions(session)
+
+        for offset in range(settings.telemetry_partitions_ahead_days + 1):
+            day = today + timedelta(days=offset)
+            if day in existing:
+                continue
+
+            try:
+                with session.begin_nested():
+                    session.execute(
+                        text(
+                            f"CREATE TABLE {_partition_name(day)} "
+                            "PARTITION OF robot_telemetry FOR VALUES "
+                            f"FROM ('{day} 00:00+00') "
+                            f"TO ('{day + timedelta(days=1)} 00:00+00')"
+                        )
+                    )
+                stats["created"] += 1
+            except DBAPIError:
+                # Rows for this day already landed in the default partition
+                stats["failed"] += 1
+
+    return stats
+
+
+@celery_app.task(name="app.tasks.telemetry.prune_telemetry_history")
+def prune_telemetry_history() -> dict[str, Any]:
+    """
+    Periodic task: Enforce the telemetry retention window.
+
+    - Drop daily partitions that are entirely older than the cutoff
+    - Delete expired rows that ended up in the default partition
+    """
+    stats = {"dropped_partitions": 0, "deleted_rows": 0}
+    today = datetime.now(timezone.utc).date()
+    cutoff = today - timedelta(days=settings.telemetry_retention_days)
+
+    with get_sync_session() as session:
+        for day, name in sorted(_existing_partitions(session).items()):
+            if day < cutoff:
+                session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                stats["dropped_partitions"] += 1
+
+        result = session.execute(
+            text("DELETE FROM robot_telemetry_default WHERE recorded_at < :cutoff"),
+            {"cutoff": datetime.combine(cutoff, datetime.min.time(), timezone.utc)},
+        )
+        stats["deleted_rows"] = result.rowcount
+
+    return stats
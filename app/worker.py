@@ -9,7 +9,7 @@ celery_app = Celery(
     "openmotiv",
     broker=settings.redis_url,
     backend=settings.redis_url,
-    include=["app.tasks.missions", "app.tasks.robots"],
+    include=["app.tasks.missions", "app.tasks.robots", "app.tasks.telemetry"],
 )
 
 # Celery configuration
@@ -34,6 +34,10 @@ celery_app.conf.update(
     
     # Beat schedule (periodic tasks)
     beat_schedule={
+        "expire-offline-robots": {
+            "task": "app.tasks.robots.expire_offline_robots",
+            "schedule": settings.heartbeat_check_interval_seconds,
+        },
         "check-robot-health-every-minute": {
             "task": "app.tasks.robots.check_fleet_health",
             "schedule": 60.0,  # Every 60 seconds
@@ -42,5 +46,13 @@ celery_app.conf.update(
             "task": "app.tasks.missions.process_scheduled_missions",
             "schedule": 30.0,
         },
+        "create-telemetry-partitions-hourly": {
+            "task": "app.tasks.telemetry.create_telemetry_partitions",
+            "schedule": 3600.0,
+        },
+        "prune-telemetry-history-hourly": {
+            "task": "app.tasks.telemetry.prune_telemetry_history",
+            "schedule": 3600.0,
+        },
     },
 )
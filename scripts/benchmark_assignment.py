@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark the mission-to-robot assignment solver on random fleets."""
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.models.mission import MissionPriority
+from app.services.assignment import PRIORITY_LEVELS, AssignmentSolver
+
+
+def random_batch(size: int, area: float, seed: int) -> tuple[list, list]:
+    rng = random.Random(seed)
+    missions = [
+        SimpleNamespace(
+            id=uuid4(),
+            priority=rng.choice(list(MissionPriority)),
+            target_x=rng.uniform(0, area),
+            target_y=rng.uniform(0, area),
+            target_z=None,
+        )
+        for _ in range(size)
+    ]
+    robots = [
+        SimpleNamespace(
+            id=uuid4(),
+            location_x=rng.uniform(0, area),
+            location_y=rng.uniform(0, area),
+            location_z=None,
+            battery_level=rng.uniform(20, 100),
+        )
+        for _ in range(size)
+    ]
+    return missions, robots
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("sizes", nargs="*", type=int, default=[1000, 10000])
+    parser.add_argument("--area", type=float, default=1000.0, help="side in meters")
+    parser.add_argument(
+        "--optimal-max",
+        type=int,
+        default=2000,
+        help="largest size to also solve exactly (the matrix is size^2 floats)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    solver = AssignmentSolver()
+    for size in args.sizes:
+        missions, robots = random_batch(size, args.area, args.seed)
+        print(f"{size} missions x {size} robots")
+
+        greedy, greedy_s = timed(solver.solve_greedy, missions, robots)
+        print(f"  greedy:  {greedy_s:8.3f}s  {size / greedy_s:10.0f} missions/s")
+
+        if size > args.optimal_max:
+            continue
+        matrix, matrix_s = timed(solver.cost_matrix, missions, robots)
+        optimal, optimal_s = timed(solver.solve_optimal, missions, robots)
+        print(f"  matrix:  {matrix_s:8.3f}s")
+        print(f"  optimal: {optimal_s:8.3f}s  {size / optimal_s:10.0f} missions/s")
+
+        greedy_cost = sum(matrix[i, j] for i, j in greedy)
+        optimal_cost = sum(matrix[i, j] for i, j in optimal)
+        # Every mission gets a robot, so both include the same priority
+        # bonus; add it back to compare travel and battery cost only
+        bonus = solver.priority_weight * sum(
+            PRIORITY_LEVELS[mission.priority] for mission in missions
+        )
+        print(
+            "  greedy/optimal cost: "
+            f"{(greedy_cost + bonus) / (optimal_cost + bonus):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Tests for the mission-to-robot assignment solver."""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.models.mission import MissionPriority
+from app.services.assignment import AssignmentSolver
+
+
+def mission(x=None, y=None, priority=MissionPriority.NORMAL) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid4(), priority=priority, target_x=x, target_y=y, target_z=None
+    )
+
+
+def robot(x=None, y=None, battery=100.0) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid4(), location_x=x, location_y=y, location_z=None, battery_level=battery
+    )
+
+
+def test_optimal_beats_greedy() -> None:
+    """Test that the exact solver avoids the greedy trap."""
+    # Greedy gives mission 0 its nearest robot, leaving a long trip for 1
+    missions = [mission(2, 0), mission(0, 0)]
+    robots = [robot(1.9, 0), robot(4, 0)]
+    solver = AssignmentSolver()
+
+    optimal = solver.solve_optimal(missions, robots)
+    greedy = solver.solve_greedy(missions, robots)
+
+    matrix = solver.cost_matrix(missions, robots)
+    assert sorted(optimal) == [(0, 1), (1, 0)]
+    assert sum(matrix[i, j] for i, j in optimal) < sum(matrix[i, j] for i, j in greedy)
+
+
+@pytest.mark.parametrize("max_optimal", [10, 0])
+def test_priority_wins_when_robots_run_out(max_optimal: int) -> None:
+    """Test that an urgent far mission beats a routine nearby one."""
+    near = mission(1, 0, MissionPriority.LOW)
+    urgent = mission(500, 0, MissionPriority.CRITICAL)
+    only = robot(0, 0)
+
+    pairs = AssignmentSolver(max_optimal=max_optimal).assign([near, urgent], [only])
+
+    assert pairs == [(urgent.id, only.id)]
+
+
+def test_battery_breaks_distance_ties() -> None:
+    """Test that a charged robot is preferred at a similar distance."""
+    target = mission(0, 0)
+    drained = robot(10, 0, battery=25.0)
+    charged = robot(12, 0, battery=95.0)
+
+    assert AssignmentSolver().assign([target], [drained, charged]) == [
+        (target.id, charged.id)
+    ]
+
+
+def test_unknown_positions() -> None:
+    """Test missions without targets and robots without locations."""
+    anywhere = mission()
+    located = mission(0, 0)
+    lost = robot(battery=100.0)
+    close = robot(1, 1, battery=100.0)
+    solver = AssignmentSolver()
+
+    matrix = solver.cost_matrix([anywhere, located], [lost, close])
+
+    assert np.isfinite(matrix).all()
+    # The located mission gets the robot whose location is known
+    assert sorted(solver.assign([anywhere, located], [lost, close])) == sorted(
+        [(anywhere.id, lost.id), (located.id, close.id)]
+    )
+
+
+def test_greedy_fallback_on_large_batches() -> None:
+    """Test that large batches still give every robot at most one mission."""
+    rng = np.random.default_rng(7)
+    missions = [mission(*rng.uniform(0, 100, 2)) for _ in range(300)]
+    robots = [robot(*rng.uniform(0, 100, 2)) for _ in range(200)]
+
+    pairs = AssignmentSolver(max_optimal=100).assign(missions, robots)
+
+    assert len(pairs) == 200
+    assert len({robot_id for _, robot_id in pairs}) == 200
+    assert len({mission_id for mission_id, _ in pairs}) == 200
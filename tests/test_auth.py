@@ -1,8 +1,12 @@
 """Tests for authentication endpoints."""
 
+import asyncio
+import time
+
 import pytest
 from httpx import AsyncClient
 
+from app.core.security import HashingPool, HashingPoolBusyError
 from app.models.user import User
 
 
@@ -68,3 +72,24 @@ async def test_protected_endpoint_without_token(client: AsyncClient) -> None:
     response = await client.get("/api/v1/robots")
 
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_saturated() -> None:
+    """Test hashing beyond the pool's capacity fails fast instead of queuing."""
+    pool = HashingPool(max_workers=1, max_queue=1)
+    try:
+        slow = [asyncio.create_task(pool.run(time.sleep, 0.1)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(HashingPoolBusyError):
+            await pool.run(time.sleep, 0)
+
+        await asyncio.gather(*slow)
+        stats = pool.get_stats()
+        assert stats["completed"] == 2
+        assert stats["rejected"] == 1
+        # The second hash waited for the first one's thread
+        assert stats["queue_seconds_max"] >= 0.05
+    finally:
+        pool.shutdown()
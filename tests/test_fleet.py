@@ -0,0 +1,113 @@
+"""Tests for fleet health statistics and history."""
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.models.robot import Robot, RobotStatus
+from app.services.fleet_health import (
+    fleet_stats,
+    merge_stats,
+    record_fleet_health,
+    shard_bounds,
+)
+from app.services.heartbeats import mark_offline
+
+
+@pytest.mark.asyncio
+async def test_fleet_stats_and_history(
+    client: AsyncClient, auth_headers: dict, db_session
+) -> None:
+    """Test the aggregate stats and the downsampled health trend."""
+    db_session.add_all(
+        Robot(
+            name=f"Fleet {i}",
+            serial_number=f"FLEET-{uuid4().hex[:8]}",
+            status=status,
+            battery_level=battery,
+        )
+        for i, (status, battery) in enumerate(
+            [
+                (RobotStatus.IDLE, 90.0),
+                (RobotStatus.IDLE, 10.0),
+                (RobotStatus.ACTIVE, None),
+                (RobotStatus.OFFLINE, 5.0),
+            ]
+        )
+    )
+    await db_session.commit()
+
+    stats = await db_session.run_sync(fleet_stats, 20.0)
+    assert (stats["total"], stats["online"], stats["offline"]) == (4, 3, 1)
+    assert stats["low_battery"] == 2
+    assert stats["by_status"]["idle"] == 2
+    assert stats["by_status"]["error"] == 0
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for minute, marked in enumerate([0, 2, 1]):
+        run = {**stats, "marked_offline": marked}
+        run["by_status"] = {**stats["by_status"], "idle": 2 + minute}
+        await db_session.run_sync(
+            record_fleet_health, start + timedelta(minutes=minute), run
+        )
+    await db_session.commit()
+
+    response = await client.get(
+        "/api/v1/fleet/health",
+        headers=auth_headers,
+        params={
+            "from": start.isoformat(),
+            "to": (start + timedelta(minutes=4)).isoformat(),
+            "max_points": 2,
+        },
+    )
+    assert response.status_code == 200
+    first, second = response.json()
+    assert (first["samples"], first["idle"], first["marked_offline"]) == (2, 2.5, 2)
+    assert (second["samples"], second["idle"], second["marked_offline"]) == (1, 4.0, 1)
+    assert second["recorded_at"].startswith("2026-01-01T00:02:00")
+
+    response = await client.get(
+        "/api/v1/fleet/health",
+        headers=auth_headers,
+        params={"from": start.isoformat(), "to": start.isoformat()},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_sharded_stats_add_up(db_session) -> None:
+    """Test that shards partition the fleet and merge into the full stats."""
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    db_session.add_all(
+        Robot(
+            name=f"Shard {i}",
+            serial_number=f"SHARD-{uuid4().hex[:8]}",
+            status=[RobotStatus.IDLE, RobotStatus.ACTIVE, RobotStatus.ERROR][i % 3],
+            battery_level=i * 5.0,
+            last_seen_at=stale if i % 4 == 0 else None,
+        )
+        for i in range(40)
+    )
+    await db_session.commit()
+    now = datetime.now(timezone.utc)
+    shards = 3
+
+    assert shard_bounds(0, shards)[0].int == 0
+    assert shard_bounds(shards - 1, shards)[1] is None
+
+    parts = []
+    for shard in range(shards):
+        bounds = shard_bounds(shard, shards)
+        marked = await db_session.run_sync(mark_offline, now, 30.0, bounds=bounds)
+        part = await db_session.run_sync(fleet_stats, 20.0, bounds)
+        parts.append({**part, "marked_offline": len(marked)})
+    await db_session.commit()
+
+    merged = merge_stats(parts)
+    whole = await db_session.run_sync(fleet_stats, 20.0)
+    assert merged == {**whole, "marked_offline": 10}
+    assert merged["total"] == 40
+    assert merged["offline"] == 10
@@ -1,13 +1,18 @@
 """Tests for mission endpoints."""
 
+import asyncio
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 import pytest
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.models.mission import Mission, MissionPriority, MissionStatus
-from app.models.robot import Robot
+from app.models.robot import Robot, RobotStatus
+from app.services.missions import TRANSITIONS, transition_mission
+from app.services.scheduler import idle_robot_index, schedule_batch
 
 
 @pytest.mark.asyncio
@@ -98,3 +103,403 @@ async def test_delete_mission(client: AsyncClient, auth_headers: dict, db_sessio
     response = await client.delete(f"/api/v1/missions/{mission.id}", headers=auth_headers)
 
     assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_list_missions_cursor_pagination(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+) -> None:
+    """Test paging through missions with the next-page cursor."""
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    missions = [
+        Mission(
+            id=uuid4(),
+            name=f"Paged {i}",
+            status=MissionStatus.PENDING,
+            priority=MissionPriority.NORMAL,
+            # Two missions share a timestamp so the id tiebreak is exercised
+            created_at=created_at + timedelta(seconds=i // 2),
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(missions)
+    await db_session.commit()
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get("/api/v1/missions", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    expected = sorted(missions, key=lambda m: (m.created_at, m.id))
+    assert seen == [str(m.id) for m in expected]
+
+    # The offset form returns the same order
+    response = await client.get(
+        "/api/v1/missions", headers=auth_headers, params={"skip": 2, "limit": 2}
+    )
+    assert [item["id"] for item in response.json()] == seen[2:4]
+
+
+@pytest.mark.asyncio
+async def test_list_missions_invalid_cursor(client: AsyncClient, auth_headers: dict) -> None:
+    """Test that a malformed cursor is rejected."""
+    response = await client.get(
+        "/api/v1/missions", headers=auth_headers, params={"cursor": "not-a-cursor"}
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_update_mission_status_timestamps(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession
+) -> None:
+    """Test that status changes stamp start and completion times once."""
+    mission = Mission(
+        id=uuid4(),
+        name="Timed",
+        status=MissionStatus.ASSIGNED,
+        priority=MissionPriority.NORMAL,
+    )
+    db_session.add(mission)
+    await db_session.commit()
+    url = f"/api/v1/missions/{mission.id}"
+    in_progress = {"status": "in_progress"}
+
+    response = await client.patch(url, headers=auth_headers, json=in_progress)
+    assert response.status_code == 200
+    started_at = response.json()["started_at"]
+    assert started_at is not None
+
+    # Re-entering in_progress keeps the original start time
+    response = await client.patch(url, headers=auth_headers, json=in_progress)
+    assert response.json()["started_at"] == started_at
+
+    response = await client.patch(
+        url, headers=auth_headers, json={"status": "completed", "progress": 100}
+    )
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["progress"] == 100
+    assert data["completed_at"] is not None
+
+    response = await client.patch(
+        f"/api/v1/missions/{uuid4()}", headers=auth_headers, json={"name": "Missing"}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_assign_mission_rejections(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession, test_robot: Robot
+) -> None:
+    """Test the errors reported when an assignment updates nothing."""
+    pending = Mission(id=uuid4(), name="Pending", status=MissionStatus.PENDING)
+    done = Mission(id=uuid4(), name="Done", status=MissionStatus.COMPLETED)
+    db_session.add_all([pending, done])
+    await db_session.commit()
+
+    async def assign(mission_id, robot_id) -> tuple[int, str]:
+        response = await client.post(
+            f"/api/v1/missions/{mission_id}/assign",
+            headers=auth_headers,
+            json={"robot_id": str(robot_id)},
+        )
+        return response.status_code, response.json()["detail"]
+
+    assert await assign(uuid4(), test_robot.id) == (404, "Mission not found")
+    assert await assign(pending.id, uuid4()) == (404, "Robot not found")
+    assert await assign(done.id, test_robot.id) == (
+        400,
+        "Cannot assign mission with status completed",
+    )
+
+
+@pytest.mark.asyncio
+async def test_mission_lifecycle_endpoints(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession, test_robot: Robot
+) -> None:
+    """Test start/complete moving both the mission and its robot."""
+    mission = Mission(
+        id=uuid4(),
+        name="Lifecycle",
+        status=MissionStatus.ASSIGNED,
+        robot_id=test_robot.id,
+    )
+    db_session.add(mission)
+    await db_session.commit()
+    url = f"/api/v1/missions/{mission.id}"
+
+    response = await client.post(f"{url}/start", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+    assert response.json()["started_at"] is not None
+    await db_session.refresh(test_robot)
+    assert test_robot.status == RobotStatus.ACTIVE
+
+    response = await client.post(f"{url}/complete", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["progress"] == 100
+    assert data["completed_at"] is not None
+    await db_session.refresh(test_robot)
+    assert test_robot.status == RobotStatus.IDLE
+
+    # Finished missions can't move again
+    response = await client.post(f"{url}/cancel", headers=auth_headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Cannot cancel mission with status completed"
+
+    response = await client.post(f"/api/v1/missions/{uuid4()}/fail", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_start_mission_needs_an_available_robot(
+    client: AsyncClient, auth_headers: dict, db_session: AsyncSession, test_robot: Robot
+) -> None:
+    """Test a mission can't start on a robot in maintenance."""
+    test_robot.status = RobotStatus.MAINTENANCE
+    mission = Mission(
+        id=uuid4(),
+        name="Blocked",
+        status=MissionStatus.ASSIGNED,
+        robot_id=test_robot.id,
+    )
+    db_session.add(mission)
+    await db_session.commit()
+
+    response = await client.post(
+        f"/api/v1/missions/{mission.id}/start", headers=auth_headers
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Cannot start mission: robot is not available"
+
+    await db_session.refresh(mission)
+    await db_session.refresh(test_robot)
+    assert mission.status == MissionStatus.ASSIGNED
+    assert mission.started_at is None
+    assert test_robot.status == RobotStatus.MAINTENANCE
+
+
+@pytest.mark.asyncio
+async def test_mission_transitions_race(
+    db_engine, db_session: AsyncSession, test_robot: Robot
+) -> None:
+    """Test that exactly one of many concurrent transitions wins."""
+    mission = Mission(
+        id=uuid4(),
+        name="Contended",
+        status=MissionStatus.IN_PROGRESS,
+        robot_id=test_robot.id,
+    )
+    db_session.add(mission)
+    await db_session.commit()
+    session_maker = async_sessionmaker(db_engine, expire_on_commit=False)
+
+    async def attempt(action: str) -> bool:
+        async with session_maker() as session:
+            transitioned = await transition_mission(session, mission.id, action)
+            await session.commit()
+            return transitioned is not None
+
+    actions = ["complete", "fail", "cancel"] * 4
+    results = await asyncio.gather(*(attempt(action) for action in actions))
+
+    assert results.count(True) == 1
+    winner = actions[results.index(True)]
+    await db_session.refresh(mission)
+    assert mission.status == TRANSITIONS[winner].target
+
+
+async def _add_robots(db_session: AsyncSession, count: int) -> list[Robot]:
+    robots = [
+        Robot(
+            id=uuid4(),
+            name=f"Idle {i}",
+            serial_number=f"IDLE-{uuid4().hex[:8]}",
+            status=RobotStatus.IDLE,
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(robots)
+    await db_session.commit()
+    return robots
+
+
+@pytest.mark.asyncio
+async def test_schedule_batch_starts_due_missions(
+    db_session: AsyncSession, test_robot: Robot
+) -> None:
+    """Test that a batch starts assigned missions and auto-assigns by priority."""
+    idle = await _add_robots(db_session, 2)
+    now = datetime.now(timezone.utc)
+    due = now - timedelta(minutes=1)
+    assigned = Mission(
+        name="Assigned",
+        status=MissionStatus.ASSIGNED,
+        robot_id=test_robot.id,
+        scheduled_at=due,
+    )
+    urgent = [
+        Mission(name=f"Urgent {i}", priority=MissionPriority.CRITICAL, scheduled_at=due)
+        for i in range(2)
+    ]
+    low = Mission(name="Low", priority=MissionPriority.LOW, scheduled_at=due)
+    later = Mission(name="Later", scheduled_at=now + timedelta(hours=1))
+    db_session.add_all([assigned, *urgent, low, later])
+    await db_session.commit()
+
+    batch = await db_session.run_sync(schedule_batch, now, 100)
+    await db_session.commit()
+
+    assert (batch.claimed, batch.started, batch.auto_assigned) == (4, 3, 2)
+    assert batch.robots_left is False
+    assert {row.id for row in batch.robots} == {test_robot.id, *(r.id for r in idle)}
+    for mission in (assigned, *urgent, low, later):
+        await db_session.refresh(mission)
+    assert assigned.status == MissionStatus.IN_PROGRESS
+    assert {m.robot_id for m in urgent} == {r.id for r in idle}
+    assert all(m.status == MissionStatus.IN_PROGRESS for m in urgent)
+    # No robot left for the low-priority mission; the future one isn't due
+    assert (low.status, low.robot_id) == (MissionStatus.PENDING, None)
+    assert later.status == MissionStatus.PENDING
+
+
+@pytest.mark.asyncio
+async def test_schedule_batch_skips_missions_waiting_on_robots(
+    db_session: AsyncSession, test_robot: Robot
+) -> None:
+    """Test that assigned missions with a busy robot don't block pending ones."""
+    await _add_robots(db_session, 2)
+    test_robot.status = RobotStatus.ACTIVE
+    now = datetime.now(timezone.utc)
+    due = now - timedelta(minutes=1)
+    waiting = [
+        Mission(
+            name=f"Waiting {i}",
+            status=MissionStatus.ASSIGNED,
+            robot_id=test_robot.id,
+            priority=MissionPriority.CRITICAL,
+            scheduled_at=due,
+        )
+        for i in range(3)
+    ]
+    orphan = Mission(
+        name="Orphan",
+        status=MissionStatus.ASSIGNED,
+        priority=MissionPriority.CRITICAL,
+        scheduled_at=due,
+    )
+    pending = [
+        Mission(name=f"Pending {i}", priority=MissionPriority.LOW, scheduled_at=due)
+        for i in range(3)
+    ]
+    db_session.add_all([*waiting, orphan, *pending])
+    await db_session.commit()
+
+    first = await db_session.run_sync(schedule_batch, now, 2)
+    second = await db_session.run_sync(schedule_batch, now, 2, after=first.last)
+    await db_session.commit()
+
+    # Only pending missions are due; the second batch picks up after the first
+    assert (first.claimed, first.started) == (2, 2)
+    assert (second.claimed, second.started) == (1, 0)
+    for mission in (*waiting, orphan, *pending):
+        await db_session.refresh(mission)
+    assert all(m.status == MissionStatus.ASSIGNED for m in (*waiting, orphan))
+    assert sum(m.status == MissionStatus.IN_PROGRESS for m in pending) == 2
+
+
+@pytest.mark.asyncio
+async def test_schedule_batch_without_pending_claims_only_assigned(
+    db_session: AsyncSession, test_robot: Robot
+) -> None:
+    """Test a run out of idle robots stops paging through pending missions."""
+    now = datetime.now(timezone.utc)
+    due = now - timedelta(minutes=1)
+    pending = [
+        Mission(name=f"Pending {i}", priority=MissionPriority.HIGH, scheduled_at=due)
+        for i in range(3)
+    ]
+    assigned = Mission(
+        name="Assigned",
+        status=MissionStatus.ASSIGNED,
+        robot_id=test_robot.id,
+        priority=MissionPriority.LOW,
+        scheduled_at=due,
+    )
+    db_session.add_all([*pending, assigned])
+    await db_session.commit()
+
+    batch = await db_session.run_sync(schedule_batch, now, 2, include_pending=False)
+    await db_session.commit()
+
+    assert (batch.claimed, batch.started, batch.auto_assigned) == (1, 1, 0)
+    for mission in (*pending, assigned):
+        await db_session.refresh(mission)
+    assert assigned.status == MissionStatus.IN_PROGRESS
+    assert all(m.status == MissionStatus.PENDING for m in pending)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_schedulers_never_share_robots(
+    db_engine, db_session: AsyncSession
+) -> None:
+    """Test that parallel schedulers split missions and robots between them."""
+    robots = await _add_robots(db_session, 6)
+    now = datetime.now(timezone.utc)
+    db_session.add_all(
+        Mission(name=f"Due {i}", scheduled_at=now - timedelta(seconds=i))
+        for i in range(10)
+    )
+    await db_session.commit()
+    session_maker = async_sessionmaker(db_engine, expire_on_commit=False)
+
+    async def worker():
+        async with session_maker() as session:
+            batch = await session.run_sync(schedule_batch, now, 4)
+            await session.commit()
+            return batch
+
+    batches = await asyncio.gather(*(worker() for _ in range(4)))
+
+    assert sum(batch.started for batch in batches) == len(robots)
+    result = await db_session.execute(
+        select(Mission.robot_id).where(Mission.status == MissionStatus.IN_PROGRESS)
+    )
+    used = result.scalars().all()
+    assert len(used) == len(set(used)) == len(robots)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_index", [False, True])
+async def test_schedule_batch_matches_nearest_charged_robots(
+    db_session: AsyncSession, use_index: bool
+) -> None:
+    """Test that auto-assignment uses distance and skips drained robots."""
+    east, west, drained = await _add_robots(db_session, 3)
+    east.location_x, east.location_y = 100.0, 0.0
+    west.location_x, west.location_y = -100.0, 0.0
+    drained.location_x, drained.location_y, drained.battery_level = 0.0, 0.0, 5.0
+    now = datetime.now(timezone.utc)
+    to_east = Mission(name="East", target_x=90.0, target_y=0.0, scheduled_at=now)
+    to_west = Mission(name="West", target_x=-90.0, target_y=0.0, scheduled_at=now)
+    db_session.add_all([to_east, to_west])
+    await db_session.commit()
+
+    index = await db_session.run_sync(idle_robot_index) if use_index else None
+    batch = await db_session.run_sync(schedule_batch, now, 10, index=index)
+    await db_session.commit()
+
+    assert batch.auto_assigned == 2
+    await db_session.refresh(to_east)
+    await db_session.refresh(to_west)
+    assert (to_east.robot_id, to_west.robot_id) == (east.id, west.id)
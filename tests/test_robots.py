@@ -1,11 +1,26 @@
 """Tests for robot endpoints."""
 
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from app.models.robot import Robot
+from app.api.v1 import robots as robots_api
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.websocket import manager
+from app.models.mission import Mission
+from app.models.robot import Robot, RobotStatus
+from app.models.telemetry import RobotTelemetry
+from app.models.user import User
+from app.services import ingest as ingest_service
+from app.services.heartbeats import mark_offline
+from app.services.spatial import SpatialIndex
+from app.services.status_buffer import StatusBuffer
+from app.services.telemetry import TelemetryRecorder
 
 
 @pytest.mark.asyncio
@@ -79,9 +94,474 @@ async def test_update_robot_status(client: AsyncClient, auth_headers: dict, test
     assert data["battery_level"] == 75.5
 
 
+@pytest.mark.asyncio
+async def test_update_robot_status_ignores_nulls(
+    client: AsyncClient, auth_headers: dict, test_robot: Robot
+) -> None:
+    """Test null fields keep their stored value instead of failing."""
+    response = await client.patch(
+        f"/api/v1/robots/{test_robot.id}/status",
+        headers=auth_headers,
+        json={"status": None, "battery_level": 50.0},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == test_robot.status.value
+    assert data["battery_level"] == 50.0
+
+
 @pytest.mark.asyncio
 async def test_delete_robot(client: AsyncClient, auth_headers: dict, test_robot: Robot) -> None:
     """Test deleting a robot."""
     response = await client.delete(f"/api/v1/robots/{test_robot.id}", headers=auth_headers)
 
     assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_update_robot_status_batch(
+    client: AsyncClient, auth_headers: dict, test_robot: Robot
+) -> None:
+    """Test updating many robots in one request."""
+    missing_id = uuid4()
+    response = await client.patch(
+        "/api/v1/robots/status",
+        headers=auth_headers,
+        json={
+            str(test_robot.id): {"status": "active", "battery_level": 42.0},
+            str(missing_id): {"status": "idle"},
+        },
+    )
+
+    assert response.status_code == 200
+    results = {item["robot_id"]: item for item in response.json()}
+    assert results[str(test_robot.id)]["updated"] is True
+    assert results[str(test_robot.id)]["robot"]["status"] == "active"
+    assert results[str(test_robot.id)]["robot"]["battery_level"] == 42.0
+    assert results[str(missing_id)]["updated"] is False
+    assert results[str(missing_id)]["robot"] is None
+
+
+@pytest.mark.asyncio
+async def test_update_robot_status_batch_keeps_omitted_fields(
+    client: AsyncClient, auth_headers: dict, test_robot: Robot
+) -> None:
+    """Test batch updates leave fields that were not sent unchanged."""
+    response = await client.patch(
+        "/api/v1/robots/status",
+        headers=auth_headers,
+        json={str(test_robot.id): {"location_x": 1.5, "location_y": 2.5}},
+    )
+
+    assert response.status_code == 200
+    robot = response.json()[0]["robot"]
+    assert robot["status"] == "idle"
+    assert robot["battery_level"] == 100.0
+    assert robot["location_x"] == 1.5
+
+
+@pytest.mark.asyncio
+async def test_update_robot_status_batch_skips_empty_items(
+    client: AsyncClient, auth_headers: dict, test_robot: Robot
+) -> None:
+    """Test payloads that set nothing are reported as not updated."""
+    response = await client.patch(
+        "/api/v1/robots/status",
+        headers=auth_headers,
+        json={str(test_robot.id): {"status": None}, str(uuid4()): {}},
+    )
+
+    assert response.status_code == 200
+    assert [item["updated"] for item in response.json()] == [False, False]
+
+
+@pytest.mark.asyncio
+async def test_update_robot_status_write_behind(
+    client: AsyncClient,
+    auth_headers: dict,
+    test_robot: Robot,
+    db_engine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test buffered status updates are visible before and after the flush."""
+    buffer = StatusBuffer(session_factory=async_sessionmaker(db_engine))
+    monkeypatch.setattr(settings, "status_write_behind", True)
+    monkeypatch.setattr(robots_api, "status_buffer", buffer)
+    monkeypatch.setattr(ingest_service, "status_buffer", buffer)
+
+    for battery_level in (90.0, 80.0):
+        response = await client.patch(
+            f"/api/v1/robots/{test_robot.id}/status",
+            headers=auth_headers,
+            json={"status": "active", "battery_level": battery_level},
+        )
+        assert response.status_code == 200
+
+    assert response.json()["battery_level"] == 80.0
+    assert buffer.pending(test_robot.id)["battery_level"] == 80.0
+
+    response = await client.get(f"/api/v1/robots/{test_robot.id}", headers=auth_headers)
+    assert response.json()["status"] == "active"
+    assert response.json()["battery_level"] == 80.0
+
+    assert await buffer.flush() == 1
+    assert buffer.pending(test_robot.id) is None
+
+    async with async_sessionmaker(db_engine)() as session:
+        robot = await session.get(Robot, test_robot.id)
+        assert robot.status.value == "active"
+        assert robot.battery_level == 80.0
+
+
+@pytest.mark.asyncio
+async def test_get_robot_telemetry_downsampled(
+    client: AsyncClient, auth_headers: dict, test_robot: Robot, db_session
+) -> None:
+    """Test telemetry history is averaged into at most max_points buckets."""
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db_session.add_all(
+        RobotTelemetry(
+            robot_id=test_robot.id,
+            recorded_at=start + timedelta(seconds=i),
+            battery_level=100.0 - i,
+            heading=359.0 if i % 2 else 1.0,
+        )
+        for i in range(100)
+    )
+    await db_session.commit()
+
+    response = await client.get(
+        f"/api/v1/robots/{test_robot.id}/telemetry",
+        headers=auth_headers,
+        params={
+            "from": start.isoformat(),
+            "to": (start + timedelta(seconds=100)).isoformat(),
+            "max_points": 10,
+        },
+    )
+
+    assert response.status_code == 200
+    points = response.json()
+    assert len(points) == 10
+    assert sum(point["samples"] for point in points) == 100
+    assert points[0]["battery_level"] == pytest.approx(95.5)
+    assert min(points[0]["heading"], 360 - points[0]["heading"]) < 1e-6
+
+
+@pytest.mark.asyncio
+async def test_update_robot_status_records_telemetry(
+    client: AsyncClient,
+    auth_headers: dict,
+    test_robot: Robot,
+    db_engine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test status updates are appended to telemetry history in batches."""
+    recorder = TelemetryRecorder(session_factory=async_sessionmaker(db_engine))
+    monkeypatch.setattr(ingest_service, "telemetry_recorder", recorder)
+
+    for battery_level in (90.0, 80.0, 70.0):
+        await client.patch(
+            f"/api/v1/robots/{test_robot.id}/status",
+            headers=auth_headers,
+            json={"battery_level": battery_level},
+        )
+
+    assert await recorder.flush() == 3
+
+    response = await client.get(
+        f"/api/v1/robots/{test_robot.id}/telemetry", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert sum(point["samples"] for point in response.json()) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_robot_telemetry_not_found(client: AsyncClient, auth_headers: dict) -> None:
+    """Test telemetry history for a non-existent robot fails."""
+    response = await client.get(f"/api/v1/robots/{uuid4()}/telemetry", headers=auth_headers)
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_robot_api_key_updates_own_status_until_revoked(
+    client: AsyncClient, admin_user: User, test_robot: Robot
+) -> None:
+    """Test a robot API key authorizes its own robot's updates only."""
+    admin_headers = {
+        "Authorization": f"Bearer {create_access_token(str(admin_user.id))}"
+    }
+    response = await client.post(
+        f"/api/v1/robots/{test_robot.id}/api-keys",
+        headers=admin_headers,
+        json={"name": "agent"},
+    )
+    assert response.status_code == 201
+    created = response.json()
+    key_headers = {"X-API-Key": created["key"]}
+
+    response = await client.patch(
+        f"/api/v1/robots/{test_robot.id}/status",
+        headers=key_headers,
+        json={"battery_level": 42.0},
+    )
+    assert response.status_code == 200
+    assert response.json()["battery_level"] == 42.0
+
+    response = await client.patch(
+        f"/api/v1/robots/{uuid4()}/status",
+        headers=key_headers,
+        json={"battery_level": 42.0},
+    )
+    assert response.status_code == 403
+
+    response = await client.delete(
+        f"/api/v1/robots/{test_robot.id}/api-keys/{created['id']}",
+        headers=admin_headers,
+    )
+    assert response.status_code == 204
+
+    response = await client.patch(
+        "/api/v1/robots/status",
+        headers=key_headers,
+        json={str(test_robot.id): {"battery_level": 41.0}},
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_robot_endpoints_query_counts(
+    client: AsyncClient, auth_headers: dict, db_engine, db_session, test_robot: Robot
+) -> None:
+    """Test that robot endpoints never load mission history implicitly."""
+    db_session.add_all(
+        Mission(name=f"History {i}", robot_id=test_robot.id) for i in range(3)
+    )
+    await db_session.commit()
+    # Start from an empty identity map, like a fresh request session
+    db_session.expunge_all()
+    # Warm the principal cache so auth adds no queries
+    await client.get("/api/v1/robots", headers=auth_headers)
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    async def count(method: str, url: str, **kwargs) -> int:
+        statements.clear()
+        response = await client.request(method, url, headers=auth_headers, **kwargs)
+        assert response.status_code < 300, response.text
+        return len(statements)
+
+    robot_url = f"/api/v1/robots/{test_robot.id}"
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        assert await count("GET", "/api/v1/robots") == 1
+        assert await count("GET", robot_url) == 1
+        assert await count("GET", f"{robot_url}/missions") == 2
+        assert await count("PATCH", robot_url, json={"name": "Renamed"}) == 1
+        status_update = {"status": "active"}
+        assert await count("PATCH", f"{robot_url}/status", json=status_update) == 1
+        assert await count("GET", robot_url, params={"include": "missions"}) == 2
+        # Look up the robot and its API key ids (to drop cached keys), then
+        # delete it, leaving missions to the database
+        assert await count("DELETE", robot_url) == 3
+        assert statements[-1].startswith("DELETE FROM robots")
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+    result = await db_session.execute(select(Mission.robot_id))
+    assert result.scalars().all() == [None, None, None]
+
+
+@pytest.mark.asyncio
+async def test_get_robot_include_missions(
+    client: AsyncClient, auth_headers: dict, db_session, test_robot: Robot
+) -> None:
+    """Test embedding and paging a robot's missions."""
+    db_session.add_all(
+        Mission(name=f"History {i}", robot_id=test_robot.id) for i in range(3)
+    )
+    await db_session.commit()
+
+    response = await client.get(f"/api/v1/robots/{test_robot.id}", headers=auth_headers)
+    assert "missions" not in response.json()
+
+    response = await client.get(
+        f"/api/v1/robots/{test_robot.id}",
+        headers=auth_headers,
+        params={"include": "missions"},
+    )
+    assert response.status_code == 200
+    assert len(response.json()["missions"]) == 3
+
+    response = await client.get(
+        f"/api/v1/robots/{test_robot.id}/missions",
+        headers={**auth_headers, "Origin": "http://localhost:3000"},
+        params={"limit": 2},
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    cursor = response.headers["X-Next-Cursor"]
+    # Browsers only let scripts read exposed headers
+    assert "X-Next-Cursor" in response.headers["Access-Control-Expose-Headers"]
+
+    response = await client.get(
+        f"/api/v1/robots/{test_robot.id}/missions",
+        headers=auth_headers,
+        params={"limit": 2, "cursor": cursor},
+    )
+    assert [m["name"] for m in response.json()] == ["History 2"]
+
+
+@pytest.mark.asyncio
+async def test_nearest_and_bbox_robots(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test spatial queries and that status updates move robots in the index."""
+    index = SpatialIndex(cell_size=10.0)
+    monkeypatch.setattr(robots_api, "spatial_index", index)
+    manager.add_observer(index.observe)
+
+    robots = [
+        Robot(
+            name=f"Spatial {i}",
+            serial_number=f"SPATIAL-{uuid4().hex[:8]}",
+            status=status,
+            location_x=x,
+            location_y=y,
+        )
+        for i, (x, y, status) in enumerate(
+            [
+                (3.0, 4.0, RobotStatus.IDLE),
+                (30.0, 0.0, RobotStatus.ACTIVE),
+                (-100.0, -100.0, RobotStatus.IDLE),
+            ]
+        )
+    ]
+    db_session.add_all(robots)
+    db_session.add(Robot(name="Nowhere", serial_number=f"SPATIAL-{uuid4().hex[:8]}"))
+    await db_session.commit()
+
+    try:
+        response = await client.get(
+            "/api/v1/robots/nearest", headers=auth_headers, params={"x": 0, "y": 0, "k": 2}
+        )
+        assert response.status_code == 200
+        assert [r["name"] for r in response.json()] == ["Spatial 0", "Spatial 1"]
+        assert response.json()[0]["distance"] == pytest.approx(5.0)
+
+        response = await client.get(
+            "/api/v1/robots/nearest",
+            headers=auth_headers,
+            params={"x": 0, "y": 0, "k": 5, "status": "idle"},
+        )
+        assert [r["name"] for r in response.json()] == ["Spatial 0", "Spatial 2"]
+
+        response = await client.get(
+            "/api/v1/robots", headers=auth_headers, params={"bbox": "0,0,50,10"}
+        )
+        assert response.status_code == 200
+        assert {r["name"] for r in response.json()} == {"Spatial 0", "Spatial 1"}
+
+        response = await client.patch(
+            f"/api/v1/robots/{robots[2].id}/status",
+            headers=auth_headers,
+            json={"location_x": 1.0, "location_y": 1.0},
+        )
+        assert response.status_code == 200
+
+        response = await client.get(
+            "/api/v1/robots/nearest", headers=auth_headers, params={"x": 0, "y": 0, "k": 1}
+        )
+        assert [r["name"] for r in response.json()] == ["Spatial 2"]
+
+        response = await client.get(
+            "/api/v1/robots", headers=auth_headers, params={"bbox": "10,0,0,10"}
+        )
+        assert response.status_code == 400
+    finally:
+        manager.remove_observer(index.observe)
+
+
+@pytest.mark.asyncio
+async def test_heartbeats_and_offline_sweep(
+    client: AsyncClient, auth_headers: dict, db_session, test_robot: Robot
+) -> None:
+    """Test that heartbeats keep robots online and silence takes them offline."""
+    timeout = settings.robot_offline_timeout_seconds
+    now = datetime.now(timezone.utc)
+    quiet = Robot(
+        name="Quiet",
+        serial_number=f"QUIET-{uuid4().hex[:8]}",
+        status=RobotStatus.ACTIVE,
+        last_seen_at=now - timedelta(seconds=timeout + 1),
+    )
+    test_robot.status = RobotStatus.OFFLINE
+    db_session.add(quiet)
+    await db_session.commit()
+
+    response = await client.post(
+        f"/api/v1/robots/{test_robot.id}/heartbeat", headers=auth_headers
+    )
+    assert response.status_code == 204
+    response = await client.post(f"/api/v1/robots/{uuid4()}/heartbeat", headers=auth_headers)
+    assert response.status_code == 404
+
+    # Offline robots come back idle; metadata edits don't count as seen
+    response = await client.get(f"/api/v1/robots/{test_robot.id}", headers=auth_headers)
+    assert response.json()["status"] == "idle"
+    assert response.json()["last_seen_at"] is not None
+    response = await client.patch(
+        f"/api/v1/robots/{quiet.id}", headers=auth_headers, json={"name": "Renamed"}
+    )
+    last_seen_at = datetime.fromisoformat(response.json()["last_seen_at"])
+    assert last_seen_at == quiet.last_seen_at
+
+    rows = await db_session.run_sync(mark_offline, now, timeout)
+    await db_session.commit()
+    assert [row.id for row in rows] == [quiet.id]
+
+    # Any status update also brings an offline robot back
+    response = await client.patch(
+        f"/api/v1/robots/{quiet.id}/status",
+        headers=auth_headers,
+        json={"battery_level": 55.0},
+    )
+    assert response.json()["status"] == "idle"
+    assert datetime.fromisoformat(response.json()["last_seen_at"]) >= now
+    assert await db_session.run_sync(mark_offline, now, timeout) == []
+
+
+@pytest.mark.asyncio
+async def test_buffered_status_update_revives_offline_robot(
+    client: AsyncClient,
+    auth_headers: dict,
+    db_session,
+    db_engine,
+    test_robot: Robot,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test write-behind updates bring offline robots back as idle too."""
+    buffer = StatusBuffer(session_factory=async_sessionmaker(db_engine))
+    monkeypatch.setattr(settings, "status_write_behind", True)
+    monkeypatch.setattr(ingest_service, "status_buffer", buffer)
+    test_robot.status = RobotStatus.OFFLINE
+    await db_session.commit()
+
+    response = await client.patch(
+        f"/api/v1/robots/{test_robot.id}/status",
+        headers=auth_headers,
+        json={"battery_level": 55.0},
+    )
+    assert response.json()["status"] == "idle"
+
+    assert await buffer.flush() == 1
+    await db_session.refresh(test_robot)
+    assert test_robot.status == RobotStatus.IDLE
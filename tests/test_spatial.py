@@ -0,0 +1,95 @@
+"""Tests for the in-memory spatial index."""
+
+import math
+import random
+import time
+from uuid import uuid4
+
+import pytest
+
+from app.models.robot import RobotStatus
+from app.services.spatial import SpatialIndex
+
+
+def random_index(count: int, area: float, seed: int = 7) -> tuple[SpatialIndex, dict]:
+    rng = random.Random(seed)
+    index = SpatialIndex(cell_size=50.0)
+    points = {}
+    for _ in range(count):
+        robot_id = uuid4()
+        x, y = rng.uniform(-area, area), rng.uniform(-area, area)
+        status = rng.choice([RobotStatus.IDLE, RobotStatus.ACTIVE])
+        index.update(robot_id, x, y, status)
+        points[robot_id] = (x, y, status)
+    return index, points
+
+
+@pytest.mark.parametrize("query", [(0.0, 0.0), (480.0, -300.0), (5000.0, 5000.0)])
+def test_nearest_matches_brute_force(query: tuple[float, float]) -> None:
+    """Test ring search and the sparse fallback against a full scan."""
+    index, points = random_index(2000, 500.0)
+    x, y = query
+
+    idle = sorted(
+        (math.hypot(px - x, py - y), robot_id)
+        for robot_id, (px, py, status) in points.items()
+        if status == RobotStatus.IDLE
+    )
+    found = index.nearest(x, y, 10, [RobotStatus.IDLE])
+
+    assert [robot_id for robot_id, _ in found] == [r for _, r in idle[:10]]
+    assert found[0][1] == pytest.approx(idle[0][0])
+    assert len(index.nearest(x, y, 5000)) == 2000
+
+
+def test_within_matches_brute_force() -> None:
+    """Test bounding-box queries, including boxes larger than the fleet."""
+    index, points = random_index(2000, 500.0)
+
+    for box in [(-120.0, 35.0, 260.0, 90.0), (-1e6, -1e6, 1e6, 1e6)]:
+        expected = {
+            robot_id
+            for robot_id, (px, py, _) in points.items()
+            if box[0] <= px <= box[2] and box[1] <= py <= box[3]
+        }
+        assert set(index.within(*box)) == expected
+
+
+def test_updates_move_and_remove_robots() -> None:
+    """Test moving, re-statusing and removing a robot."""
+    index = SpatialIndex(cell_size=10.0)
+    robot_id = uuid4()
+
+    index.update(robot_id, 0.0, 0.0, RobotStatus.IDLE)
+    index.observe(
+        robot_id, {"status": "active", "location_x": 95.0, "location_y": 5.0}
+    )
+
+    assert index.within(-5, -5, 5, 5) == []
+    assert index.nearest(0, 0, 1, [RobotStatus.IDLE]) == []
+    assert index.nearest(100, 5, 1, [RobotStatus.ACTIVE]) == [(robot_id, 5.0)]
+
+    index.update(robot_id, None, None, RobotStatus.ACTIVE)
+    assert len(index) == 0
+    assert index.nearest(100, 5, 1) == []
+
+
+def test_queries_at_fleet_scale() -> None:
+    """Test that queries over 100k robots stay well under a millisecond."""
+    index, _ = random_index(100_000, 5000.0)
+    rng = random.Random(1)
+    queries = [(rng.uniform(-5000, 5000), rng.uniform(-5000, 5000)) for _ in range(200)]
+
+    start = time.perf_counter()
+    for x, y in queries:
+        index.nearest(x, y, 10)
+    nearest_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    for x, y in queries:
+        index.within(x, y, x + 100, y + 100)
+    within_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    # Generous bounds for slow CI machines; typically ~0.1 ms each
+    assert nearest_ms < 1.0
+    assert within_ms < 1.0
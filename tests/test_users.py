@@ -0,0 +1,73 @@
+"""Tests for user administration and the principal cache."""
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.principals import principal_cache
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_role_change_takes_effect_despite_cache(
+    client: AsyncClient, test_user: User, admin_user: User
+) -> None:
+    """Test demoting a cached user is enforced on their next request."""
+    def headers(user: User) -> dict[str, str]:
+        return {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+
+    user_headers, admin_headers = headers(test_user), headers(admin_user)
+    robot = {"name": "Cache-01", "serial_number": "SN-CACHE-01"}
+
+    response = await client.post("/api/v1/robots", headers=user_headers, json=robot)
+    assert response.status_code == 201
+    misses = principal_cache.misses
+
+    # Served from the cache this time
+    response = await client.get("/api/v1/robots", headers=user_headers)
+    assert response.status_code == 200
+    assert principal_cache.misses == misses
+
+    response = await client.patch(
+        f"/api/v1/users/{test_user.id}",
+        headers=admin_headers,
+        json={"role": "viewer"},
+    )
+    assert response.status_code == 200
+    assert response.json()["role"] == "viewer"
+
+    robot["serial_number"] = "SN-CACHE-02"
+    response = await client.post("/api/v1/robots", headers=user_headers, json=robot)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_update_user_requires_admin(
+    client: AsyncClient, auth_headers: dict[str, str], test_user: User
+) -> None:
+    """Test operators can't change user roles."""
+    response = await client.patch(
+        f"/api/v1/users/{test_user.id}",
+        headers=auth_headers,
+        json={"role": "admin"},
+    )
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_update_user_rejects_null_role_and_active_flag(
+    client: AsyncClient, test_user: User, admin_user: User
+) -> None:
+    """Test nulls are refused for required fields but clear the full name."""
+    headers = {"Authorization": f"Bearer {create_access_token(str(admin_user.id))}"}
+    url = f"/api/v1/users/{test_user.id}"
+
+    for body in ({"role": None}, {"is_active": None}):
+        response = await client.patch(url, headers=headers, json=body)
+        assert response.status_code == 422
+
+    response = await client.patch(url, headers=headers, json={"full_name": None})
+    assert response.status_code == 200
+    assert response.json()["full_name"] is None
+    assert response.json()["role"] == test_user.role.value
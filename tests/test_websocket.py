@@ -0,0 +1,510 @@
+"""Tests for WebSocket endpoints."""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1 import websocket as websocket_api
+from app.core import websocket as websocket_core
+from app.core.api_keys import api_key_cache, generate_api_key, hash_api_key
+from app.core.pubsub import EventBus, decode_state, encode_event, encode_state
+from app.core.security import create_access_token
+from app.core.websocket import (
+    FLEET_CHANNEL,
+    ConnectionManager,
+    EventHistory,
+    FleetDelta,
+    OverflowPolicy,
+    Subscriber,
+)
+from app.main import app
+from app.models.api_key import RobotApiKey
+from app.models.robot import Robot
+from app.models.user import User
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def ws_client(db_engine, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    """Create a WebSocket test client using the test database."""
+    # The test client runs the app on its own event loop, so give it an
+    # engine that doesn't pool connections across loops.
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    monkeypatch.setattr(
+        websocket_api,
+        "async_session_maker",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    return TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_ingest_stream_applies_and_acks(
+    ws_client: TestClient, test_user: User, test_robot: Robot, db_session: AsyncSession
+) -> None:
+    """Test streamed frames are applied in a batch and acknowledged by seq."""
+    token = create_access_token(str(test_user.id))
+    robot_id = test_robot.id
+
+    with ws_client.websocket_connect(f"/ws/ingest?token={token}") as ws:
+        ws.send_json({"seq": 1, "robot_id": str(robot_id), "battery_level": 60.0})
+        ws.send_json({"seq": 2, "robot_id": str(robot_id), "status": "active"})
+        acked = 0
+        while acked < 2:
+            message = ws.receive_json()
+            assert message["type"] == "ack"
+            assert message["unknown_robots"] == []
+            acked = message["seq"]
+
+    db_session.expire_all()
+    result = await db_session.execute(select(Robot).where(Robot.id == robot_id))
+    robot = result.scalar_one()
+    assert robot.battery_level == 60.0
+    assert robot.status.value == "active"
+
+
+@pytest.mark.asyncio
+async def test_ingest_stream_stops_after_key_revoked(
+    ws_client: TestClient, test_robot: Robot, db_session: AsyncSession
+) -> None:
+    """Test an agent whose key is revoked mid-stream can't write any more."""
+    key, prefix = generate_api_key()
+    api_key = RobotApiKey(
+        robot_id=test_robot.id, name="agent", prefix=prefix, key_hash=hash_api_key(key)
+    )
+    db_session.add(api_key)
+    await db_session.commit()
+    robot_id = test_robot.id
+
+    with ws_client.websocket_connect("/ws/ingest", headers={"X-API-Key": key}) as ws:
+        ws.send_json({"seq": 1, "robot_id": str(robot_id), "battery_level": 60.0})
+        assert ws.receive_json()["type"] == "ack"
+
+        api_key.revoked_at = datetime.now(timezone.utc)
+        await db_session.commit()
+        await api_key_cache.revoke(api_key.id)
+
+        ws.send_json({"seq": 2, "robot_id": str(robot_id), "battery_level": 10.0})
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            ws.receive_json()
+    assert exc_info.value.code == 4401
+
+    db_session.expire_all()
+    result = await db_session.execute(select(Robot).where(Robot.id == robot_id))
+    assert result.scalar_one().battery_level == 60.0
+
+
+@pytest.mark.asyncio
+async def test_robot_stream_resume_checks_robot_exists(ws_client: TestClient) -> None:
+    """Test resuming with since still refuses unknown robots."""
+    # A buffered event the resume could otherwise replay
+    robot_id, history = uuid4(), websocket_core.manager.history
+    seq = history.next_seq()
+    history.record(seq, robot_id, f'{{"seq":{seq}}}')
+
+    url = f"/ws/robots/{robot_id}?since={seq - 1}"
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with ws_client.websocket_connect(url) as ws:
+            ws.receive_json()
+
+    assert exc_info.value.code == 4004
+
+
+@pytest.mark.asyncio
+async def test_ingest_stream_rejects_invalid_token(ws_client: TestClient) -> None:
+    """Test the ingest stream refuses connections without a valid token."""
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with ws_client.websocket_connect("/ws/ingest?token=bogus") as ws:
+            ws.receive_json()
+
+    assert exc_info.value.code == 4401
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a connected WebSocket."""
+
+    client = None
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.sent: list[str] = []
+        self.close_code: int | None = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.close_code = code
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_and_drops_slow_clients(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a stalled subscriber can't hold up the rest of the fan-out."""
+    manager = ConnectionManager(send_timeout=0.05)
+    robot_id = uuid4()
+    fast, slow = FakeWebSocket(), FakeWebSocket(delay=10)
+    await manager.connect(fast, robot_id)
+    await manager.connect(slow, robot_id)
+
+    encoded = []
+    monkeypatch.setattr(
+        websocket_core,
+        "encode_message",
+        lambda data: encoded.append(data) or json.dumps(data),
+    )
+
+    started = time.monotonic()
+    await manager.broadcast_robot_update(robot_id, {"event": "status_update"})
+    assert time.monotonic() - started < 0.05
+    assert len(encoded) == 1
+
+    await asyncio.sleep(0.2)
+    assert json.loads(fast.sent[0])["event"] == "status_update"
+    assert slow.close_code == 1013
+    assert manager.get_connection_count(robot_id) == 1
+
+
+def test_subscriber_keeps_latest_update_per_robot() -> None:
+    """Test queued updates for the same robot collapse to the newest one."""
+    subscriber = Subscriber(websocket=FakeWebSocket(), on_close=lambda ws: None)
+    robot_a, robot_b = uuid4(), uuid4()
+
+    subscriber.enqueue("a1", robot_a)
+    subscriber.enqueue("b1", robot_b)
+    subscriber.enqueue("a2", robot_a)
+
+    assert list(subscriber._queue.values()) == ["a2", "b1"]
+    assert subscriber.dropped == 1
+
+
+def test_subscriber_drop_oldest_when_full() -> None:
+    """Test a full queue evicts its oldest message under drop_oldest."""
+    subscriber = Subscriber(
+        websocket=FakeWebSocket(),
+        on_close=lambda ws: None,
+        max_queue=2,
+        policy=OverflowPolicy.DROP_OLDEST,
+    )
+
+    for message in ("m1", "m2", "m3"):
+        subscriber.enqueue(message, uuid4())
+
+    assert list(subscriber._queue.values()) == ["m2", "m3"]
+    assert subscriber.queue_depth == 2
+    assert subscriber.dropped == 1
+
+
+def test_backed_up_fleet_deltas_merge_instead_of_dropping() -> None:
+    """Test an unsent fleet_delta absorbs later flushes and survives overflow."""
+    subscriber = Subscriber(
+        websocket=FakeWebSocket(),
+        on_close=lambda ws: None,
+        max_queue=2,
+        policy=OverflowPolicy.DROP_OLDEST,
+    )
+    delta = FleetDelta(subscriber=subscriber, interval=1.0)
+    robot_a, robot_b = uuid4(), uuid4()
+
+    delta.add(robot_a, '{"n":1}')
+    delta.flush()
+    delta.add(robot_b, '{"n":2}')
+    delta.add(robot_a, '{"n":3}')
+    delta.flush()
+    for message in ("m1", "m2"):
+        subscriber.enqueue(message)
+
+    assert subscriber.queue_depth == 2
+    merged, other = subscriber._queue.values()
+    assert json.loads(merged)["updates"] == [{"n": 3}, {"n": 2}]
+    assert other == "m2"
+
+
+@pytest.mark.asyncio
+async def test_subscriber_disconnect_policy_closes_slow_consumer() -> None:
+    """Test overflowing the queue under the disconnect policy drops the client."""
+    manager = ConnectionManager(max_queue=1, overflow_policy=OverflowPolicy.DISCONNECT)
+    robot_id = uuid4()
+    websocket = FakeWebSocket(delay=10)
+    await manager.connect(websocket, robot_id)
+
+    for _ in range(3):
+        await manager.broadcast_fleet_update({"event": "fleet_update"})
+    await asyncio.sleep(0.05)
+
+    assert websocket.close_code == 1008
+    assert manager.get_connection_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_event_bus_relays_events_with_their_published_seq() -> None:
+    """Test pub/sub frames are routed by prefix and stamped with their seq."""
+    manager = ConnectionManager()
+    bus = EventBus(manager=manager, redis_url="redis://unused", channel="test")
+    watched, unwatched = uuid4(), uuid4()
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, watched)
+    observed = []
+    manager.add_observer(lambda robot_id, state: observed.append((robot_id, state)))
+
+    # Observers get the framed state; the body itself is never decoded
+    bus.dispatch(f"7|{unwatched}|idle,,1.5,|not-json")
+    bus.dispatch(f"8|{encode_event(watched, {'event': 'status_update'})}")
+    bus.dispatch(f"9|{encode_event(None, {'event': 'fleet_health'})}")
+    await asyncio.sleep(0.05)
+
+    assert [json.loads(m) for m in websocket.sent] == [
+        {"seq": 8, "event": "status_update"},
+        {"seq": 9, "event": "fleet_health"},
+    ]
+    assert observed == [
+        (unwatched, {"status": "idle", "location_x": 1.5}),
+        (watched, {}),
+    ]
+    # Still recorded for clients resuming later
+    assert [seq for seq, _, _ in manager.history.since(unwatched, 6)] == [7]
+
+    robot = {"status": "active", "robot_type": "drone", "location_x": -2.25}
+    assert decode_state(encode_state({**robot, "location_y": None})) == robot
+
+
+@pytest.mark.asyncio
+async def test_event_bus_fallback_events_are_not_replayable() -> None:
+    """Test events delivered while Redis is down carry no seq to resume from."""
+    manager = ConnectionManager()
+    bus = EventBus(
+        manager=manager, redis_url="redis://127.0.0.1:1", channel="test", enabled=True
+    )
+    robot_id = uuid4()
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, robot_id)
+
+    bus.dispatch(f"5|{encode_event(robot_id, {'n': 1})}")
+    await bus.broadcast_robot_update(robot_id, {"n": 2})
+    # Let the writer send it before the next update can conflate it
+    await asyncio.sleep(0.01)
+    bus.dispatch(f"6|{encode_event(robot_id, {'n': 3})}")
+    await asyncio.sleep(0.05)
+    await bus.stop()
+
+    assert [json.loads(m) for m in websocket.sent] == [
+        {"seq": 5, "n": 1},
+        {"n": 2},
+        {"seq": 6, "n": 3},
+    ]
+    # Clients from before the gap need a snapshot; later ones resume
+    assert manager.history.seq == 6
+    assert manager.history.since(robot_id, 5) is None
+    assert manager.history.since(robot_id, 6) == []
+
+
+@pytest.mark.asyncio
+async def test_fleet_subscriber_gets_conflated_deltas() -> None:
+    """Test fleet updates collapse to one rate-limited delta per interval."""
+    manager = ConnectionManager()
+    bus = EventBus(manager=manager, redis_url="redis://unused", channel="test")
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, FLEET_CHANNEL)
+    manager.subscribe_fleet(websocket, max_hz=10)
+    robot_a, robot_b = uuid4(), uuid4()
+
+    # Relayed events reach fleet subscribers even without robot subscribers
+    bus.dispatch(f"|{encode_event(robot_a, {'robot_id': str(robot_a), 'n': 1})}")
+    await asyncio.sleep(0.01)
+    for n in range(2, 50):
+        update = {"robot_id": str(robot_a), "n": n}
+        await manager.broadcast_robot_update(robot_a, update)
+    await manager.broadcast_robot_update(robot_b, {"robot_id": str(robot_b), "n": 1})
+    await asyncio.sleep(0.15)
+
+    deltas = [json.loads(m) for m in websocket.sent]
+    assert all(d["event"] == "fleet_delta" for d in deltas)
+    assert len(deltas) == 2
+
+    def updates(delta: dict) -> list[tuple[str, int]]:
+        return [(u["robot_id"], u["n"]) for u in delta["updates"]]
+
+    assert updates(deltas[0]) == [(str(robot_a), 1)]
+    assert updates(deltas[1]) == [(str(robot_a), 49), (str(robot_b), 1)]
+
+
+@pytest.mark.asyncio
+async def test_fleet_stream_sends_snapshot_in_chunks(
+    ws_client: TestClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the fleet snapshot is paged into chunks followed by snapshot_end."""
+    for i in range(5):
+        db_session.add(Robot(name=f"Unit-{i}", serial_number=f"SN-FLEET-{i}"))
+    await db_session.commit()
+    monkeypatch.setattr(websocket_api.settings, "ws_snapshot_chunk_size", 2)
+
+    with ws_client.websocket_connect("/ws/fleet") as ws:
+        chunks = []
+        message = ws.receive_json()
+        while message["event"] == "snapshot_chunk":
+            chunks.append(message["robots"])
+            message = ws.receive_json()
+
+    assert message["event"] == "snapshot_end"
+    assert message["fleet_size"] == 5
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    ids = [robot["id"] for chunk in chunks for robot in chunk]
+    assert ids == sorted(ids)
+    assert set(chunks[0][0]) == {"id", "name", "status", "battery_level"}
+
+
+@pytest.mark.asyncio
+async def test_stream_subscribes_to_many_robots_at_once(
+    ws_client: TestClient, test_robot: Robot
+) -> None:
+    """Test one subscribe message covers several robots with a single reply."""
+    robot_id, missing_id = str(test_robot.id), str(uuid4())
+
+    with ws_client.websocket_connect("/ws/stream") as ws:
+        ws.send_json({"type": "subscribe", "robot_ids": [robot_id, missing_id]})
+        reply = ws.receive_json()
+        ws.send_json({"type": "subscribe", "filters": [{"status": "bogus"}]})
+        error = ws.receive_json()
+
+    assert reply["type"] == "subscribed"
+    assert [robot["id"] for robot in reply["robots"]] == [robot_id]
+    assert reply["unknown_robot_ids"] == [missing_id]
+    assert error["type"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_filter_subscriptions_route_matching_updates() -> None:
+    """Test status/bbox filters receive matching updates, including exits."""
+    manager = ConnectionManager()
+    by_status, by_area = FakeWebSocket(), FakeWebSocket()
+    manager.register(by_status)
+    manager.register(by_area)
+    manager.subscribe_filter(by_status, ("status", "active"))
+    manager.subscribe_filter(by_area, ("bbox", (0.0, 0.0, 10.0, 10.0)))
+    robot_id = uuid4()
+
+    for status, x in (("active", 50.0), ("idle", 5.0), ("idle", 6.0), ("idle", 50.0)):
+        robot = {"status": status, "location_x": x, "location_y": 1.0}
+        await manager.broadcast_robot_update(robot_id, {"robot": robot})
+        # Let the writers send before the next update could be conflated
+        await asyncio.sleep(0.01)
+
+    def xs(websocket: FakeWebSocket) -> list[float]:
+        return [json.loads(m)["robot"]["location_x"] for m in websocket.sent]
+
+    # The status filter also sees the update that made the robot idle
+    assert xs(by_status) == [50.0, 5.0]
+    assert xs(by_area) == [5.0, 6.0, 50.0]
+
+    manager.disconnect(by_area)
+    assert manager.get_stats()["filters"] == 1
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_missed_events_until_evicted() -> None:
+    """Test reconnecting with since gets only missed events while buffered."""
+    manager = ConnectionManager(history=EventHistory(robot_events=3))
+    robot_id = uuid4()
+    for n in range(5):
+        await manager.broadcast_robot_update(robot_id, {"n": n})
+    latest = manager.history.seq
+
+    websocket = FakeWebSocket()
+    assert manager.resume(websocket, robot_id, latest - 2)
+    assert not manager.resume(FakeWebSocket(), robot_id, latest - 4)
+    # Nothing happened to other robots since, so there's nothing to replay
+    assert manager.history.since(uuid4(), latest - 4) == []
+    await asyncio.sleep(0.05)
+
+    messages = [json.loads(m) for m in websocket.sent]
+    assert messages[0]["event"] == "resumed"
+    assert messages[0]["missed"] == 2
+    assert [(m["seq"], m["n"]) for m in messages[1:]] == [
+        (latest - 1, 3),
+        (latest, 4),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_catch_up_replays_events_sent_during_snapshot() -> None:
+    """Test updates made while a snapshot was paged reach the new subscriber."""
+    manager = ConnectionManager(history=EventHistory(fleet_events=4))
+    robot_id = uuid4()
+    # Snapshot taken before any event was seen
+    snapshot_seq = manager.history.seq
+    for n in range(3):
+        await manager.broadcast_robot_update(robot_id, {"n": n})
+
+    websocket = FakeWebSocket()
+    manager.subscribe_fleet(websocket, max_hz=100)
+    assert manager.catch_up(websocket, snapshot_seq)
+    await asyncio.sleep(0.05)
+
+    delta = json.loads(websocket.sent[0])
+    assert delta["event"] == "fleet_delta"
+    assert [update["n"] for update in delta["updates"]] == [2]
+
+    # Too much happened since: the client is told to reconnect
+    for n in range(5):
+        await manager.broadcast_robot_update(uuid4(), {"n": n})
+    stale = FakeWebSocket()
+    manager.subscribe_fleet(stale, max_hz=100)
+    assert not manager.catch_up(stale, snapshot_seq)
+    await asyncio.sleep(0.05)
+    assert stale.close_code == 1013
+    manager.disconnect(websocket)
+
+
+@pytest.mark.asyncio
+async def test_sweep_pings_idle_connections_and_evicts_silent_ones() -> None:
+    """Test a client that stops answering pings is closed and counted."""
+    manager = ConnectionManager(ping_interval=0.1, ping_timeout=0.1, send_timeout=0.3)
+    alive, dead = FakeWebSocket(), FakeWebSocket(delay=10)
+    await manager.connect(alive, uuid4())
+    await manager.connect(dead, uuid4())
+
+    await asyncio.sleep(0.15)
+    assert manager.sweep() == 0
+    manager.touch(alive)
+    await asyncio.sleep(0.1)
+    assert manager.sweep() == 1
+    await asyncio.sleep(0.3)
+
+    assert json.loads(alive.sent[0]) == {"type": "ping"}
+    assert dead.close_code == 4408
+    assert alive.close_code is None
+    stats = manager.get_stats()
+    assert stats["connections"] == 1
+    assert stats["evictions"] == {"Heartbeat timeout": 1}
+
+
+@pytest.mark.asyncio
+async def test_sweep_keeps_listen_only_clients() -> None:
+    """Test a client that never sends stays connected while pings go through."""
+    manager = ConnectionManager(ping_interval=0.05, ping_timeout=0.05)
+    listener = FakeWebSocket()
+    await manager.connect(listener, uuid4())
+
+    for _ in range(6):
+        await asyncio.sleep(0.05)
+        assert manager.sweep() == 0
+
+    assert listener.close_code is None
+    assert json.loads(listener.sent[0]) == {"type": "ping"}
+    assert manager.get_stats()["connections"] == 1